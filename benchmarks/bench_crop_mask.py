@@ -0,0 +1,128 @@
+"""
+Cost of the two off-crop mask renderers (mask_renderer = stipple | image) on a
+4K canvas:
+
+- image renderer, once per display refresh: the darkened copy (MASK_DIM_LUT) and
+  its PhotoImage; the Pillow part runs headless
+- per crop drag step, only when a display is available: moving the four stippled
+  rectangles versus copying the crop window out of the bright PhotoImage, each
+  followed by a full canvas redraw
+
+    python benchmarks/bench_crop_mask.py [--canvas 3840x2160] [--steps 30]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageEnhance
+
+from utils.cropper_app import MASK_COLOR, MASK_DIM_LUT, MASK_STIPPLE
+
+
+def _time_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _size(value: str) -> tuple[int, int]:
+    width, height = (int(v) for v in value.lower().split("x"))
+    return (width, height)
+
+
+def _drag_path(canvas: tuple[int, int], steps: int) -> list[tuple[int, int, int, int]]:
+    """Crop rectangles of a horizontal drag across the canvas."""
+    cw, ch = canvas
+    w, h = cw // 2, ch // 2
+    y = (ch - h) // 2
+    return [(x, y, x + w, y + h) for x in (i * (cw - w) // max(1, steps - 1) for i in range(steps))]
+
+
+def bench_mask_image(image: Image.Image, repeat: int) -> None:
+    lut = MASK_DIM_LUT * len(image.getbands())
+    dark_lut = _time_ms(lambda: image.point(lut), repeat)
+    dark_enhance = _time_ms(lambda: ImageEnhance.Brightness(image).enhance(0.5), repeat)
+
+    print(f"darkened copy per display refresh, {image.width}x{image.height}")
+    print(f"  point(MASK_DIM_LUT):            {dark_lut:8.1f} ms")
+    print(f"  ImageEnhance.Brightness(0.5):   {dark_enhance:8.1f} ms  (for comparison)")
+
+
+def bench_drag(image: Image.Image, steps: int) -> None:
+    import tkinter as tk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"crop drag on the canvas: skipped, no display ({e})")
+        return
+
+    from PIL import ImageTk
+
+    cw, ch = image.size
+    canvas = tk.Canvas(root, width=cw, height=ch, highlightthickness=0)
+    canvas.pack()
+    root.update()
+    path = _drag_path(image.size, steps)
+
+    # stipple: bright image under four stippled rectangles
+    bright_tk = ImageTk.PhotoImage(image)
+    canvas.create_image(0, 0, anchor="nw", image=bright_tk, tags="image_layer")
+    masks = [canvas.create_rectangle(0, 0, 0, 0, fill=MASK_COLOR, stipple=MASK_STIPPLE, width=0) for _ in range(4)]
+
+    def stipple_step(rect):
+        x1, y1, x2, y2 = rect
+        canvas.coords(masks[0], 0, 0, cw, y1)
+        canvas.coords(masks[1], 0, y2, cw, ch)
+        canvas.coords(masks[2], 0, y1, x1, y2)
+        canvas.coords(masks[3], x2, y1, cw, y2)
+        root.update()
+
+    stipple = statistics.median(_time_ms(lambda r=rect: stipple_step(r), 1) for rect in path)
+
+    # image: darkened image with the bright crop window copied on top
+    canvas.delete("all")
+    started = time.perf_counter()
+    dark_tk = ImageTk.PhotoImage(image.point(MASK_DIM_LUT * 3))
+    dark_build = (time.perf_counter() - started) * 1000
+    canvas.create_image(0, 0, anchor="nw", image=dark_tk)
+    window_tk = tk.PhotoImage(master=canvas)
+    window = canvas.create_image(0, 0, anchor="nw", image=window_tk)
+
+    def image_step(rect):
+        x1, y1, x2, y2 = rect
+        canvas.tk.call(str(window_tk), "copy", str(bright_tk), "-from", x1, y1, x2, y2, "-to", 0, 0, "-shrink")
+        canvas.coords(window, x1, y1)
+        root.update()
+
+    image_mask = statistics.median(_time_ms(lambda r=rect: image_step(r), 1) for rect in path)
+    root.destroy()
+
+    print(f"crop drag step on a {cw}x{ch} canvas (median of {steps})")
+    print(f"  stipple rectangles:             {stipple:8.1f} ms")
+    print(f"  image mask:                     {image_mask:8.1f} ms  (+ {dark_build:.1f} ms per display refresh)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--canvas", type=_size, default=(3840, 2160), help="canvas (display image) size")
+    parser.add_argument("--steps", type=int, default=30, help="drag steps")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    image = Image.radial_gradient("L").resize(args.canvas).convert("RGB")
+    bench_mask_image(image, args.repeat)
+    bench_drag(image, args.steps)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
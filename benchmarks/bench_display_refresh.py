@@ -0,0 +1,156 @@
+"""
+Cost of one display refresh (slider tick, resize, zoom or pan):
+
+- display image resampled from the full source versus from the mipmap pyramid
+  (DecodedImageCache.pyramid_level), and the one-time cost of building the levels
+- deep zoom viewport: first render versus an unchanged view and a pan by one tile
+  (ViewportRenderer)
+- Tk: a new ImageTk.PhotoImage per refresh versus pasting into the existing one;
+  only when a display is available
+
+The Pillow parts run headless.
+
+    python benchmarks/bench_display_refresh.py [--size 6000x4000] [--canvas 1600x1000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from utils.deep_zoom import DEEP_ZOOM_TILE_SIZE, ViewportRenderer
+from utils.image_cache import DecodedImageCache
+from utils.image_loader import fit_display_size
+
+
+def _time_ms(fn: Callable[[], object], repeat: int, setup: Callable[[], object] = lambda: None) -> float:
+    """Median wall time of fn in milliseconds; setup runs before every call, untimed."""
+    samples = []
+    for _ in range(repeat):
+        setup()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _size(value: str) -> tuple[int, int]:
+    width, height = (int(v) for v in value.lower().split("x"))
+    return (width, height)
+
+
+def bench_pyramid(source: Image.Image, path: str, canvas: tuple[int, int], repeat: int) -> None:
+    _, disp_size = fit_display_size(source.size, canvas, 1.0)
+    cache = DecodedImageCache(max_bytes=4 << 30)
+    current = {}
+
+    def fresh_entry():
+        current["entry"] = cache.put(path, source, source.size)
+
+    full = _time_ms(lambda: source.resize(disp_size, Image.Resampling.LANCZOS), repeat)
+    build = _time_ms(lambda: cache.pyramid_level(path, current["entry"], disp_size), repeat, setup=fresh_entry)
+    fresh_entry()
+    entry = current["entry"]
+    level = cache.pyramid_level(path, entry, disp_size)
+    from_level = _time_ms(lambda: cache.pyramid_level(path, entry, disp_size).resize(disp_size, Image.Resampling.LANCZOS), repeat)
+    fast = _time_ms(lambda: cache.pyramid_level(path, entry, disp_size).resize(disp_size, Image.Resampling.BILINEAR), repeat)
+
+    print(f"display image {disp_size[0]}x{disp_size[1]} from {source.size[0]}x{source.size[1]}")
+    print(f"  LANCZOS from full source:       {full:8.1f} ms")
+    print(f"  pyramid build (once per image): {build:8.1f} ms  (level {level.size[0]}x{level.size[1]})")
+    print(f"  LANCZOS from pyramid level:     {from_level:8.1f} ms")
+    print(f"  BILINEAR from pyramid level:    {fast:8.1f} ms  (during continuous resize/zoom)")
+
+
+def bench_viewport(source: Image.Image, canvas: tuple[int, int], repeat: int) -> None:
+    zoom = 3.0
+    fit_scale, _ = fit_display_size(source.size, canvas, 1.0)
+    scale = fit_scale * zoom
+    disp_size = (int(source.width * scale), int(source.height * scale))
+    offset = ((canvas[0] - disp_size[0]) // 2, (canvas[1] - disp_size[1]) // 2)
+    panned = (offset[0] - DEEP_ZOOM_TILE_SIZE, offset[1])
+    renderer = ViewportRenderer()
+    key = ("bench", source.size)
+
+    cold = _time_ms(lambda: renderer.render(key, source, disp_size, offset, canvas), repeat, setup=renderer.clear)
+    renderer.render(key, source, disp_size, offset, canvas)
+    same = _time_ms(lambda: renderer.render(key, source, disp_size, offset, canvas), repeat)
+
+    def reset_to_offset():
+        renderer.clear()
+        renderer.render(key, source, disp_size, offset, canvas)
+
+    pan = _time_ms(lambda: renderer.render(key, source, disp_size, panned, canvas), repeat, setup=reset_to_offset)
+
+    print(f"deep zoom viewport {canvas[0]}x{canvas[1]} at {zoom:.0f}x fit ({disp_size[0]}x{disp_size[1]} virtual)")
+    print(f"  first render (all tiles):       {cold:8.1f} ms")
+    print(f"  unchanged view (slider tick):   {same:8.3f} ms")
+    print(f"  pan by one tile column:         {pan:8.1f} ms")
+
+
+def bench_photoimage(canvas: tuple[int, int], repeat: int) -> None:
+    import tkinter as tk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"PhotoImage allocate vs paste: skipped, no display ({e})")
+        return
+
+    from PIL import ImageTk
+
+    root.withdraw()
+    image = Image.linear_gradient("L").resize(canvas).convert("RGB")
+    label = tk.Label(root)
+    photo = ImageTk.PhotoImage(image)
+
+    def allocate():
+        label.configure(image=ImageTk.PhotoImage(image))
+        root.update_idletasks()
+
+    def paste():
+        photo.paste(image)
+        root.update_idletasks()
+
+    label.configure(image=photo)
+    allocated = _time_ms(allocate, repeat)
+    pasted = _time_ms(paste, repeat)
+    thumb = image.resize((80, 60))
+    thumb_photo = ImageTk.PhotoImage(thumb)
+    thumb_allocated = _time_ms(lambda: ImageTk.PhotoImage(thumb), repeat * 10)
+    thumb_pasted = _time_ms(lambda: thumb_photo.paste(thumb), repeat * 10)
+    root.destroy()
+
+    print(f"PhotoImage per refresh at {canvas[0]}x{canvas[1]}")
+    print(f"  new PhotoImage:                 {allocated:8.1f} ms")
+    print(f"  paste into existing:            {pasted:8.1f} ms")
+    print("gallery thumbnail 80x60")
+    print(f"  new PhotoImage:                 {thumb_allocated:8.3f} ms")
+    print(f"  paste into pooled:              {thumb_pasted:8.3f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=_size, default=(6000, 4000), help="source image size")
+    parser.add_argument("--canvas", type=_size, default=(1600, 1000), help="canvas size")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    source = Image.radial_gradient("L").resize(args.size).convert("RGB")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "source.bin") # the cache keys entries by file signature
+        open(path, "wb").close()
+        bench_pyramid(source, path, args.canvas, args.repeat)
+    bench_viewport(source, args.canvas, args.repeat)
+    bench_photoimage(args.canvas, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
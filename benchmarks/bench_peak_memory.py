@@ -0,0 +1,195 @@
+"""
+Peak memory of one image load and one export, each measured in its own process
+against an absolute budget:
+
+- load: load_source_for_display() of a JPEG that fits the memory cap (full
+  decode), at most LOAD_BUDGET x its decoded RGB size
+- rotated load: the same for a JPEG with EXIF orientation 6, at most
+  ROTATED_LOAD_BUDGET x its decoded RGB size; the transpose needs the decoded and
+  the rotated image at once
+- export: run_conversion_job() of a ConversionJob on the loaded image, at most
+  EXPORT_BUDGET x the decoded RGB size of the crop
+- large export: run_conversion_job() in large-image mode on an uncompressed TIFF,
+  whose crop region is decoded from the file; at most LARGE_EXPORT_BUDGET x the
+  decoded RGB size of the crop, whatever the size of the file
+
+Every budget allows BUDGET_SLACK_MB on top, which does not grow with the image.
+
+tracemalloc does not see Pillow's pixel buffers, so the peak resident set size is
+measured instead: each stage runs in its own process, resets the peak
+(/proc/self/clear_refs) after its setup and reports VmHWM minus the resident size
+at that point. Linux only. Pillow stores RGB with 4 bytes per pixel, so one
+decoded image alone is 1.33x its decoded RGB size.
+Exits with status 1 if a stage exceeds its budget.
+
+    python benchmarks/bench_peak_memory.py [--size 6000x4000]
+"""
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TARGET_SIZE = (800, 480)
+PREFERENCES = {
+    "brightness": 1.1,
+    "contrast": 1.2,
+    "saturation": 1.3,
+    "enhancer_edge": False,
+    "enhancer_smooth": False,
+    "enhancer_sharpen": True,
+    "fill_mode": "white",
+    "target_device": "spectra6",
+}
+
+LOAD_BUDGET = 1.35         # x decoded RGB size of the source
+ROTATED_LOAD_BUDGET = 2.7  # x decoded RGB size of the source
+EXPORT_BUDGET = 1.0        # x decoded RGB size of the crop, which is never copied
+LARGE_EXPORT_BUDGET = 1.4  # x decoded RGB size of the crop, which is decoded once
+FULL_DECODE_CAP = 1 << 40  # memory cap that loads every test image in full
+BUDGET_SLACK_MB = 16       # output image, quantization and allocator overhead, on top of every budget
+
+
+def _status_mb(field: str) -> float:
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError(f"{field} missing from /proc/self/status")
+
+
+def _reset_peak() -> None:
+    # "5" resets the peak resident set size (VmHWM) to the current one
+    with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+        f.write("5")
+
+
+def _crop_rect(size: tuple[int, int]) -> tuple[int, int, int, int]:
+    """A centred crop with the target aspect, half as wide as the image."""
+    w, h = size
+    crop_w = min(w // 2, h * TARGET_SIZE[0] // TARGET_SIZE[1])
+    crop_h = crop_w * TARGET_SIZE[1] // TARGET_SIZE[0]
+    return ((w - crop_w) // 2, (h - crop_h) // 2, (w + crop_w) // 2, (h + crop_h) // 2)
+
+
+def _crop_mb(size: tuple[int, int]) -> float:
+    from utils.image_source import decoded_rgb_bytes
+
+    x1, y1, x2, y2 = _crop_rect(size)
+    return decoded_rgb_bytes((x2 - x1, y2 - y1)) / (1024 * 1024)
+
+
+def _job(path: str, source, source_size: tuple[int, int], memory_cap_bytes: int, export_folder: str):
+    from utils.conversion_queue import ConversionJob, snapshot_mapping
+
+    return ConversionJob(
+        source_path=path,
+        source_image=source,
+        source_size=source_size,
+        large_image=source.size != source_size,
+        memory_cap_bytes=memory_cap_bytes,
+        rect=_crop_rect(source_size),
+        target_size=TARGET_SIZE,
+        preferences=snapshot_mapping(PREFERENCES),
+        text_overlay=snapshot_mapping({"show": False}),
+        export_folder=export_folder,
+        pic_folder_on_device="pic",
+        dither_method=0,
+    )
+
+
+def _child(stage: str, path: str) -> None:
+    from utils.conversion_queue import run_conversion_job
+    from utils.image_source import load_source_for_display
+
+    export_folder = os.path.join(os.path.dirname(path), f"export-{stage}")
+    if stage in ("load", "rotated-load"):
+        def run():
+            return load_source_for_display(path, FULL_DECODE_CAP)
+    elif stage == "export":
+        # the viewer already holds the source, so it is part of the baseline
+        source, source_size = load_source_for_display(path, FULL_DECODE_CAP)
+        job = _job(path, source, source_size, FULL_DECODE_CAP, export_folder)
+        def run():
+            return run_conversion_job(job)
+    else:
+        # large-image mode: the viewer holds a proxy, the export decodes the crop region
+        proxy, source_size = load_source_for_display(path, 0)
+        job = _job(path, proxy, source_size, 0, export_folder)
+        def run():
+            return run_conversion_job(job)
+
+    gc.collect()
+    _reset_peak()
+    baseline = _status_mb("VmRSS")
+    result = run()
+    print(f"{_status_mb('VmHWM') - baseline:.1f}")
+    del result
+
+
+def _measure(stage: str, path: str) -> float:
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", stage, path],
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="6000x4000", help="size of the generated test images")
+    parser.add_argument("--child", nargs=2, metavar=("STAGE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return 0
+
+    if not os.path.exists("/proc/self/clear_refs"):
+        print("[WARN] Peak RSS needs /proc/self/clear_refs (Linux).")
+        return 0
+
+    from PIL import Image
+
+    from utils.image_source import decoded_rgb_bytes
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    decoded_mb = decoded_rgb_bytes((width, height)) / (1024 * 1024)
+    with tempfile.TemporaryDirectory() as folder:
+        jpeg_path = os.path.join(folder, "large.jpg")
+        rotated_path = os.path.join(folder, "rotated.jpg")
+        tiff_path = os.path.join(folder, "large.tif")
+        image = Image.radial_gradient("L").resize((width, height)).convert("RGB")
+        image.save(jpeg_path, quality=90)
+        image.save(tiff_path, compression="raw")
+        exif = Image.Exif()
+        exif[0x0112] = 6 # stored rotated, so the load transposes
+        image.transpose(Image.Transpose.ROTATE_90).save(rotated_path, quality=90, exif=exif)
+        del image
+
+        crop_mb = _crop_mb((width, height))
+        stages = [
+            ("load", jpeg_path, decoded_mb, LOAD_BUDGET, "source"),
+            ("rotated-load", rotated_path, decoded_mb, ROTATED_LOAD_BUDGET, "source"),
+            ("export", jpeg_path, crop_mb, EXPORT_BUDGET, "crop"),
+            ("large-export", tiff_path, crop_mb, LARGE_EXPORT_BUDGET, "crop"),
+        ]
+
+        print(f"source {width}x{height}: {decoded_mb:.1f} MB decoded RGB, crop {crop_mb:.1f} MB")
+        failed = False
+        for stage, path, reference_mb, budget, reference in stages:
+            peak = _measure(stage, path)
+            ok = peak <= reference_mb * budget + BUDGET_SLACK_MB
+            failed |= not ok
+            print(
+                f"  {stage:<13} {peak:7.1f} MB peak ({peak / reference_mb:.2f}x {reference}, "
+                f"budget {budget:.2f}x + {BUDGET_SLACK_MB} MB) {'ok' if ok else 'OVER BUDGET'}"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+from PIL import Image
+
+from utils import conversion_queue
+from utils.conversion_queue import ConversionJob, preview_job, render_job_crop, render_job_region, snapshot_mapping
+
+
+def _large_image_job() -> ConversionJob:
+    proxy = Image.new("RGB", (1024, 768), "red")
+    return ConversionJob(
+        source_path="large.png",
+        source_image=proxy,
+        source_size=(8192, 6144),
+        large_image=True,
+        memory_cap_bytes=512 << 20,
+        rect=(1000, 1000, 5000, 3400),
+        target_size=(800, 480),
+        preferences=snapshot_mapping({"fill_mode": "white"}),
+        text_overlay=snapshot_mapping({}),
+        export_folder="",
+        pic_folder_on_device="",
+        dither_method=0,
+    )
+
+
+def test_preview_renders_from_memory(monkeypatch):
+    def decode_from_file(*_args, **_kwargs):
+        raise AssertionError("previews must not decode the file")
+
+    monkeypatch.setattr(conversion_queue, "load_source_region", decode_from_file)
+    crop = render_job_crop(preview_job(_large_image_job()))
+    assert crop.size == (800, 480)
+    assert crop.getpixel((400, 240)) == (255, 0, 0)
+
+
+def test_export_decodes_the_region_from_file(monkeypatch):
+    calls = []
+
+    def decode_from_file(path, box, size, memory_cap_bytes):
+        calls.append((path, box, size, memory_cap_bytes))
+        return Image.new("RGB", size, "blue")
+
+    monkeypatch.setattr(conversion_queue, "load_source_region", decode_from_file)
+    crop = render_job_crop(_large_image_job())
+    assert calls == [("large.png", (1000, 1000, 5000, 3400), (800, 480), 512 << 20)]
+    assert crop.getpixel((400, 240)) == (0, 0, 255)
+
+
+def test_fill_modes_share_one_region_decode(monkeypatch):
+    calls = []
+
+    def decode_from_file(path, box, size, memory_cap_bytes):
+        calls.append(box)
+        return Image.new("RGB", size, "blue")
+
+    monkeypatch.setattr(conversion_queue, "load_source_region", decode_from_file)
+    job = _large_image_job()._replace(rect=(-2000, 1000, 6000, 5800)) # partly outside: fill visible
+    region = render_job_region(job)
+    for fill_mode in ("white", "black", "blur"):
+        fill_job = job._replace(preferences=snapshot_mapping({"fill_mode": fill_mode}))
+        assert render_job_crop(fill_job, region).tobytes() == render_job_crop(fill_job).tobytes()
+    assert len(calls) == 4 # one shared decode plus one per unshared render above
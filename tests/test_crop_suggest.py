@@ -0,0 +1,54 @@
+from PIL import Image, ImageDraw
+
+from utils.crop_suggest import compute_saliency_grid, suggest_crop_center
+
+
+def _image_with_subject(size: tuple[int, int], box: tuple[int, int, int, int]) -> Image.Image:
+    image = Image.new("RGB", size, (128, 128, 128))
+    draw = ImageDraw.Draw(image)
+    for offset in range(0, box[2] - box[0], 8):
+        draw.line((box[0] + offset, box[1], box[0] + offset, box[3]), fill=(255, 40, 40), width=3)
+    return image
+
+
+def _crop_fractions(size: tuple[int, int], ratio: float) -> tuple[float, float]:
+    # same rule as init_crop_rectangle with DEFAULT_CROP_SIZE = 1
+    w, h = size
+    crop_w, crop_h = w, w / ratio
+    if crop_h > h:
+        crop_w, crop_h = h * ratio, h
+    return crop_w / w, crop_h / h
+
+
+def test_centred_subject_keeps_the_centre():
+    image = _image_with_subject((400, 300), (150, 100, 250, 200))
+    fx, fy = suggest_crop_center(compute_saliency_grid(image), 1.0)
+    assert abs(fx - 0.5) < 0.05
+    assert abs(fy - 0.5) < 0.05
+
+
+def test_subject_near_the_bottom_edge_keeps_the_crop_inside():
+    size = (4000, 3000)
+    ratio = 800 / 480
+    image = _image_with_subject(size, (1500, 2600, 2500, 3000))
+    saliency = compute_saliency_grid(image.resize((400, 300)))
+
+    for image_aspect in (None, size[0] / size[1]):
+        fx, fy = suggest_crop_center(saliency, ratio, 1.0, image_aspect)
+        crop_w, crop_h = _crop_fractions(size, ratio)
+        assert fy > 0.5 # moved towards the subject
+        assert fy + crop_h / 2 <= 1.0
+        assert fy - crop_h / 2 >= 0.0
+        assert fx - crop_w / 2 >= 0.0 and fx + crop_w / 2 <= 1.0
+        assert (fy + crop_h / 2) * size[1] <= size[1]
+
+
+def test_subject_near_the_right_edge_of_a_tall_crop():
+    size = (3000, 2000)
+    ratio = 480 / 800
+    image = _image_with_subject(size, (2700, 600, 3000, 1400))
+    fx, fy = suggest_crop_center(compute_saliency_grid(image.resize((300, 200))), ratio, 1.0, size[0] / size[1])
+    crop_w, crop_h = _crop_fractions(size, ratio)
+    assert fx > 0.5
+    assert fx + crop_w / 2 <= 1.0
+    assert fy == 0.5 # the crop spans the full height
@@ -0,0 +1,28 @@
+import pytest
+from PIL import Image, ImageEnhance
+
+from utils.enhancer import apply_color
+
+FACTORS = (0.0, 0.3, 0.5, 0.7, 0.9, 1.0, 1.1, 1.2, 1.3, 1.5, 2.0, 3.0)
+
+
+@pytest.fixture(scope="module")
+def gradient() -> Image.Image:
+    image = Image.new("RGB", (256, 256))
+    image.putdata([(x, y, (x * 7 + y * 3) % 256) for y in range(256) for x in range(256)])
+    return image
+
+
+def _reference(image: Image.Image, brightness: float, contrast: float, saturation: float) -> Image.Image:
+    image = ImageEnhance.Brightness(image).enhance(brightness)
+    image = ImageEnhance.Contrast(image).enhance(contrast)
+    return ImageEnhance.Color(image).enhance(saturation)
+
+
+@pytest.mark.parametrize("brightness", FACTORS)
+@pytest.mark.parametrize("contrast", FACTORS)
+def test_apply_color_matches_image_enhance(gradient, brightness, contrast):
+    for saturation in (0.5, 1.0, 1.4):
+        preferences = {"brightness": brightness, "contrast": contrast, "saturation": saturation}
+        expected = _reference(gradient, brightness, contrast, saturation)
+        assert apply_color(gradient, preferences).tobytes() == expected.tobytes()
@@ -0,0 +1,107 @@
+from PIL import Image
+
+from utils.image_cache import DecodedImageCache
+from utils.image_source import decoded_rgb_bytes
+
+
+def _files(tmp_path, *names: str) -> list[str]:
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(b"x")
+        paths.append(str(path))
+    return paths
+
+
+def _image(size: tuple[int, int] = (100, 100)) -> Image.Image:
+    return Image.new("RGB", size)
+
+
+def test_budget_counts_images_views_and_levels(tmp_path):
+    (path,) = _files(tmp_path, "a.jpg")
+    cache = DecodedImageCache(max_bytes=1 << 30)
+
+    entry = cache.put(path, _image((1024, 768)), (1024, 768))
+    cache.add_view(path, entry, _image((300, 225)))
+    level = cache.pyramid_level(path, entry, (300, 225))
+
+    assert level.size == (512, 384)
+    assert cache._bytes == entry.nbytes() == (
+        decoded_rgb_bytes((1024, 768)) + decoded_rgb_bytes((300, 225)) + decoded_rgb_bytes((512, 384))
+    )
+
+
+def test_least_recently_used_entry_is_evicted_first(tmp_path):
+    a, b, c = _files(tmp_path, "a.jpg", "b.jpg", "c.jpg")
+    cache = DecodedImageCache(max_bytes=2 * decoded_rgb_bytes((100, 100)))
+
+    cache.put(a, _image(), (100, 100))
+    cache.put(b, _image(), (100, 100))
+    assert cache.get(a) is not None # a is now more recent than b
+    cache.put(c, _image(), (100, 100))
+
+    assert cache.get(b) is None
+    assert cache.get(a) is not None
+    assert cache.get(c) is not None
+    assert cache._bytes == 2 * decoded_rgb_bytes((100, 100))
+
+
+def test_most_recent_entry_is_kept_over_budget(tmp_path):
+    a, b = _files(tmp_path, "a.jpg", "b.jpg")
+    cache = DecodedImageCache(max_bytes=decoded_rgb_bytes((100, 100)))
+
+    cache.put(a, _image(), (100, 100))
+    entry = cache.put(b, _image((200, 200)), (200, 200))
+
+    assert cache.get(a) is None
+    assert cache.get(b) is entry
+    assert cache._bytes == decoded_rgb_bytes((200, 200))
+
+
+def test_put_of_an_existing_key_replaces_the_entry(tmp_path):
+    (path,) = _files(tmp_path, "a.jpg")
+    cache = DecodedImageCache(max_bytes=1 << 30)
+
+    first = cache.put(path, _image((400, 300)), (800, 600), complete=False)
+    cache.add_view(path, first, _image((200, 150)))
+    second = cache.put(path, _image((800, 600)), (800, 600))
+
+    assert cache.get(path) is second
+    assert cache._bytes == decoded_rgb_bytes((800, 600))
+
+
+def test_eviction_drops_the_pyramid_levels(tmp_path):
+    a, b = _files(tmp_path, "a.jpg", "b.jpg")
+    size = (1024, 1024)
+    cache = DecodedImageCache(max_bytes=decoded_rgb_bytes(size) * 3 // 2)
+
+    entry = cache.put(a, _image(size), size)
+    cache.pyramid_level(a, entry, (256, 256))
+    assert len(entry.levels) == 2
+    assert cache._bytes == decoded_rgb_bytes(size) + decoded_rgb_bytes((512, 512)) + decoded_rgb_bytes((256, 256))
+
+    cache.put(b, _image(size), size)
+    assert cache.get(a) is None
+    assert cache._bytes == decoded_rgb_bytes(size)
+
+
+def test_levels_of_an_evicted_entry_are_not_counted(tmp_path):
+    a, b = _files(tmp_path, "a.jpg", "b.jpg")
+    size = (1024, 1024)
+    cache = DecodedImageCache(max_bytes=decoded_rgb_bytes(size))
+
+    evicted = cache.put(a, _image(size), size)
+    cache.put(b, _image(size), size)
+    assert cache.pyramid_level(a, evicted, (512, 512)).size == (512, 512)
+    assert cache._bytes == decoded_rgb_bytes(size)
+
+
+def test_changed_file_is_not_served(tmp_path):
+    (path,) = _files(tmp_path, "a.jpg")
+    cache = DecodedImageCache(max_bytes=1 << 30)
+
+    cache.put(path, _image(), (100, 100))
+    (tmp_path / "a.jpg").write_bytes(b"changed")
+
+    assert cache.get(path) is None
+    assert cache._bytes == 0
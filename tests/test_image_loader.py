@@ -0,0 +1,107 @@
+import threading
+import time
+
+from PIL import Image
+
+from utils.image_cache import DecodedImageCache
+from utils.image_loader import ImageLoader
+
+
+class _Widget:
+    """Stands in for the Tk widget: after() callbacks run when pump() is called."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, _ms, callback):
+        self.callbacks.append(callback)
+
+    def winfo_exists(self):
+        return True
+
+    def pump(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class _Decoder:
+    """Decodes instantly, except for the paths in block, which wait for release()."""
+
+    def __init__(self, block=()):
+        self.block = set(block)
+        self.decoded = []
+        self.started = threading.Event()
+        self._release = threading.Event()
+
+    def __call__(self, path, _display_size_for):
+        if path in self.block:
+            self.started.set()
+            assert self._release.wait(5)
+        self.decoded.append(path)
+        return Image.new("RGB", (300, 200)), (300, 200)
+
+    def release(self):
+        self._release.set()
+
+
+def _files(tmp_path, *names):
+    for name in names:
+        (tmp_path / name).write_bytes(b"x")
+    return [str(tmp_path / name) for name in names]
+
+
+def _deliver(widget, loader, delivered, count=1):
+    deadline = time.monotonic() + 5
+    while len(delivered) < count or loader.is_pending():
+        assert time.monotonic() < deadline, "no result delivered"
+        widget.pump()
+        time.sleep(0.005)
+
+
+def test_stale_requests_are_skipped_and_dropped(tmp_path):
+    a, b, c = _files(tmp_path, "a.jpg", "b.jpg", "c.jpg")
+    widget, decoder, delivered = _Widget(), _Decoder(block={a}), []
+    loader = ImageLoader(widget, decoder, delivered.append)
+
+    loader.request(a, (150, 100), 1.0)
+    assert decoder.started.wait(5)
+    loader.request(b, (150, 100), 1.0)
+    latest = loader.request(c, (150, 100), 1.0)
+    decoder.release()
+    _deliver(widget, loader, delivered)
+
+    # a was already decoding and is dropped, b became stale before it started
+    assert decoder.decoded == [a, c]
+    assert [(result.generation, result.path) for result in delivered] == [(latest, c)]
+    assert delivered[0].display_image.size == (150, 100)
+
+
+def test_cancel_drops_the_running_request(tmp_path):
+    a, b = _files(tmp_path, "a.jpg", "b.jpg")
+    widget, decoder, delivered = _Widget(), _Decoder(block={a}), []
+    loader = ImageLoader(widget, decoder, delivered.append)
+
+    loader.request(a, (150, 100), 1.0)
+    assert decoder.started.wait(5)
+    loader.cancel()
+    assert not loader.is_pending()
+    decoder.release()
+    loader.request(b, (150, 100), 1.0)
+    _deliver(widget, loader, delivered)
+
+    assert [result.path for result in delivered] == [b]
+
+
+def test_revisit_is_served_from_the_cache(tmp_path):
+    (path,) = _files(tmp_path, "a.jpg")
+    widget, decoder, delivered = _Widget(), _Decoder(), []
+    loader = ImageLoader(widget, decoder, delivered.append, cache=DecodedImageCache(1 << 30))
+
+    loader.request(path, (150, 100), 1.0)
+    _deliver(widget, loader, delivered)
+    loader.request(path, (150, 100), 1.0)
+    _deliver(widget, loader, delivered, count=2)
+
+    assert decoder.decoded == [path]
+    assert delivered[1].display_image is delivered[0].display_image
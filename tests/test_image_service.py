@@ -0,0 +1,40 @@
+import gc
+
+from PIL import Image
+
+from utils import image_service
+from utils.image_service import ImageSourceService
+
+
+def _service() -> ImageSourceService:
+    service = ImageSourceService(None, memory_cap_bytes=1 << 30)
+    service.set_display((200, 200), 1.0)
+    return service
+
+
+def test_viewer_decode_is_shared_with_the_gallery(tmp_path, monkeypatch):
+    path = str(tmp_path / "image.png")
+    Image.new("RGB", (300, 200), "red").save(path)
+    decodes = []
+    load = image_service.load_source_for_display
+    monkeypatch.setattr(image_service, "load_source_for_display", lambda *args: decodes.append(args[0]) or load(*args))
+
+    service = _service()
+    image, _ = service.load_for_display(path)
+    thumb = service.load_for_thumbnail(path, 60)
+    assert decodes == [path]
+    assert thumb.size == (60, 40)
+    assert image.size == (300, 200)
+
+
+def test_recent_decodes_do_not_outlive_their_users(tmp_path):
+    path = str(tmp_path / "image.png")
+    Image.new("RGB", (300, 200), "red").save(path)
+
+    service = _service()
+    image, _ = service.load_for_display(path)
+    assert service._shared_result(path)[0] is image
+
+    del image
+    gc.collect()
+    assert service._shared_result(path) is None
@@ -0,0 +1,143 @@
+import io
+import struct
+import warnings
+
+import pytest
+from PIL import Image
+
+from utils.image_source import load_source_for_display, load_source_region, load_thumbnail_source, read_oriented_size
+
+
+def _pattern(size: tuple[int, int]) -> Image.Image:
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    return Image.merge("RGB", (image.getchannel(0), image.getchannel(0).transpose(Image.Transpose.ROTATE_90).resize(size), image.getchannel(0)))
+
+
+def _exif_with_preview(preview: Image.Image, orientation: int = 1) -> bytes:
+    """EXIF block with an orientation in IFD0 and a JPEG preview in IFD1 (little endian)."""
+    buffer = io.BytesIO()
+    preview.save(buffer, "JPEG", quality=95)
+    data = buffer.getvalue()
+    ifd1_offset = 8 + 18
+    data_offset = ifd1_offset + 30
+    tiff = b"II*\x00" + struct.pack("<I", 8)
+    tiff += struct.pack("<H", 1) + struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0) + struct.pack("<I", ifd1_offset)
+    tiff += struct.pack("<H", 2)
+    tiff += struct.pack("<HHII", 0x0201, 4, 1, data_offset) + struct.pack("<HHII", 0x0202, 4, 1, len(data))
+    tiff += struct.pack("<I", 0)
+    return b"Exif\x00\x00" + tiff + data
+
+
+def _close(pixel: tuple[int, ...], color: tuple[int, int, int]) -> bool:
+    return all(abs(a - b) <= 12 for a, b in zip(pixel, color))
+
+
+@pytest.fixture
+def small_pixel_limit(monkeypatch):
+    # 1000x1000 test images count as decompression bombs
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100_000)
+
+
+def test_global_bomb_limit_is_left_alone():
+    assert Image.MAX_IMAGE_PIXELS is not None
+
+
+def test_raw_tiff_region_matches_full_decode(tmp_path, monkeypatch):
+    path = str(tmp_path / "raw.tif")
+    image = _pattern((1000, 800))
+    image.save(path, compression="raw")
+
+    box, size = (120, 80, 620, 380), (250, 150)
+    # the region is decoded on its own, so the filter sees no pixels beyond the box
+    expected = image.crop(box).resize(size, Image.Resampling.LANCZOS)
+
+    # a full decode would exceed the limit, so this only passes on the raw region path
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100_000)
+    region = load_source_region(path, box, size)
+    assert region.size == size
+    assert region.tobytes() == expected.tobytes()
+
+
+def test_raw_tiff_proxy_is_built_in_bands(tmp_path, small_pixel_limit, monkeypatch):
+    monkeypatch.setattr("utils.image_source.LARGE_IMAGE_PROXY_MAX_SIDE", 200)
+    path = str(tmp_path / "raw.tif")
+    _pattern((1000, 800)).save(path, compression="raw")
+
+    proxy, source_size = load_source_for_display(path, memory_cap_bytes=1000)
+    assert source_size == (1000, 800)
+    assert proxy.size == (200, 160)
+
+
+def test_oversized_png_keeps_the_bomb_check(tmp_path, small_pixel_limit):
+    path = str(tmp_path / "large.png")
+    _pattern((1000, 800)).save(path)
+
+    assert read_oriented_size(path) == (1000, 800)
+    with pytest.raises(Image.DecompressionBombError, match="large_image_memory_mb"):
+        load_source_for_display(path, memory_cap_bytes=1000)
+    with pytest.raises(Image.DecompressionBombError):
+        load_source_region(path, (0, 0, 500, 400), (100, 80))
+
+
+@pytest.mark.parametrize("name, options", [("large.png", {}), ("large.tif", {"compression": "tiff_lzw"})])
+def test_memory_cap_raises_the_bomb_limit(tmp_path, small_pixel_limit, monkeypatch, name, options):
+    monkeypatch.setattr("utils.image_source.LARGE_IMAGE_PROXY_MAX_SIDE", 200)
+    path = str(tmp_path / name)
+    image = _pattern((1000, 800))
+    image.save(path, **options)
+    # 800k pixels: above Pillow's limit (200k here), within 4x the cap as decoded RGB
+    memory_cap_bytes = 700_000
+
+    proxy, source_size = load_source_for_display(path, memory_cap_bytes)
+    assert source_size == (1000, 800)
+    assert proxy.size == (200, 160)
+
+    box, size = (120, 80, 620, 380), (250, 150)
+    region = load_source_region(path, box, size, memory_cap_bytes)
+    assert region.tobytes() == image.resize(size, Image.Resampling.LANCZOS, box=box).tobytes()
+
+    full, source_size = load_source_for_display(path, memory_cap_bytes=4_000_000)
+    assert full.size == source_size == (1000, 800)
+
+
+def test_oversized_jpeg_proxy_decodes_a_draft(tmp_path, small_pixel_limit, monkeypatch):
+    monkeypatch.setattr("utils.image_source.LARGE_IMAGE_PROXY_MAX_SIDE", 200)
+    path = str(tmp_path / "large.jpg")
+    _pattern((1000, 800)).save(path, quality=90)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", Image.DecompressionBombWarning)
+        proxy, source_size = load_source_for_display(path, memory_cap_bytes=1000)
+    assert source_size == (1000, 800)
+    assert proxy.size == (200, 160)
+
+
+def test_embedded_preview_is_oriented_like_the_image(tmp_path):
+    path = str(tmp_path / "rotated.jpg")
+    preview = Image.new("RGB", (150, 100), "red")
+    preview.paste((0, 0, 255), (75, 0, 150, 100)) # left half red, right half blue
+    Image.new("RGB", (300, 200), "lime").save(path, quality=90, exif=_exif_with_preview(preview, orientation=6))
+
+    thumb = load_thumbnail_source(path, 100)
+    # orientation 6 turns the stored image clockwise: its left half ends up on top
+    assert thumb.size == (100, 150)
+    assert _close(thumb.getpixel((50, 20)), (255, 0, 0))
+    assert _close(thumb.getpixel((50, 130)), (0, 0, 255))
+
+
+def test_letterboxed_preview_falls_back_to_the_draft(tmp_path):
+    path = str(tmp_path / "letterboxed.jpg")
+    preview = Image.new("RGB", (160, 120), "black") # 4:3 preview of a 3:2 image
+    Image.new("RGB", (600, 400), "lime").save(path, quality=90, exif=_exif_with_preview(preview))
+
+    thumb = load_thumbnail_source(path, 100)
+    # DCT scale 1/4 is the smallest that still covers 100x100
+    assert thumb.size == (150, 100)
+    assert _close(thumb.getpixel((75, 50)), (0, 255, 0))
+
+
+def test_thumbnail_source_of_a_png_is_none(tmp_path):
+    path = str(tmp_path / "image.png")
+    Image.new("RGB", (600, 400), "lime").save(path)
+
+    assert load_thumbnail_source(path, 100) is None
@@ -0,0 +1,103 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from utils import thumbnail_cache
+from utils.thumbnail_cache import ThumbnailCache
+
+THUMB_SIZE = 64
+COLORS = {"a.jpg": (255, 0, 0), "b.jpg": (0, 255, 0), "c.jpg": (0, 0, 255), "d.jpg": (255, 255, 0)}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Last-used times of one second per tick, so LRU order does not depend on timing."""
+    now = SimpleNamespace(value=1_000)
+    monkeypatch.setattr(thumbnail_cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def _images(tmp_path, *names: str) -> list[str]:
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(name.encode())
+        paths.append(str(path))
+    return paths
+
+
+def _thumb(path: str) -> Image.Image:
+    return Image.new("RGB", (THUMB_SIZE, THUMB_SIZE * 2 // 3), COLORS[os.path.basename(path)])
+
+
+def _assert_thumbs(thumbs: dict[str, Image.Image], paths: list[str]) -> None:
+    assert sorted(thumbs) == sorted(paths)
+    for path in paths:
+        expected = COLORS[os.path.basename(path)]
+        assert all(abs(a - b) <= 8 for a, b in zip(thumbs[path].getpixel((5, 5)), expected))
+
+
+def test_changed_image_is_a_miss(tmp_path):
+    a, b = _images(tmp_path, "a.jpg", "b.jpg")
+    cache = ThumbnailCache(str(tmp_path), max_bytes=1 << 20)
+    for path in (a, b):
+        cache.put(path, _thumb(path), THUMB_SIZE)
+
+    with open(a, "ab") as f:
+        f.write(b"edited")
+
+    _assert_thumbs(cache.get_many([a, b], THUMB_SIZE), [b])
+    assert len(cache._entries) == 1
+
+
+def test_least_recently_used_thumbnails_are_evicted(tmp_path, clock):
+    a, b, c = _images(tmp_path, "a.jpg", "b.jpg", "c.jpg")
+    cache = ThumbnailCache(str(tmp_path), max_bytes=1 << 20)
+    for path in (a, b):
+        cache.put(path, _thumb(path), THUMB_SIZE)
+        clock.value += 1
+    cache.get_many([a], THUMB_SIZE) # a is now more recent than b
+    clock.value += 1
+
+    # room for two thumbnails: adding c drops b
+    cache.max_bytes = cache._live_bytes + cache._live_bytes // 4
+    cache.put(c, _thumb(c), THUMB_SIZE)
+
+    _assert_thumbs(cache.get_many([a, b, c], THUMB_SIZE), [a, c])
+    assert cache._live_bytes <= cache.max_bytes
+
+
+def test_save_compacts_a_mostly_unused_pack(tmp_path):
+    paths = _images(tmp_path, "a.jpg", "b.jpg", "c.jpg", "d.jpg")
+    cache = ThumbnailCache(str(tmp_path), max_bytes=1 << 20)
+    for path in paths:
+        cache.put(path, _thumb(path), THUMB_SIZE)
+    for path in paths[1:]:
+        with open(path, "ab") as f:
+            f.write(b"edited")
+    cache.get_many(paths, THUMB_SIZE) # drops the three changed images
+
+    assert cache.save() == cache.index_path
+    assert os.path.getsize(cache.pack_path) == cache._live_bytes
+
+    reopened = ThumbnailCache(str(tmp_path), max_bytes=1 << 20)
+    _assert_thumbs(reopened.get_many(paths, THUMB_SIZE), paths[:1])
+
+
+def test_unsaved_session_tail_is_overwritten(tmp_path):
+    a, b, c = _images(tmp_path, "a.jpg", "b.jpg", "c.jpg")
+    cache = ThumbnailCache(str(tmp_path), max_bytes=1 << 20)
+    cache.put(a, _thumb(a), THUMB_SIZE)
+    cache.save()
+    saved_size = os.path.getsize(cache.pack_path)
+    cache.put(b, _thumb(b), THUMB_SIZE) # appended, but the index is never saved
+
+    reopened = ThumbnailCache(str(tmp_path), max_bytes=1 << 20)
+    assert reopened.get_many([b], THUMB_SIZE) == {}
+    reopened.put(c, _thumb(c), THUMB_SIZE)
+
+    assert os.path.getsize(reopened.pack_path) == saved_size + reopened._entries[thumbnail_cache._key(c, THUMB_SIZE)][1]
+    _assert_thumbs(reopened.get_many([a, c], THUMB_SIZE), [a, c])
+
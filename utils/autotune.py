@@ -0,0 +1,134 @@
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Mapping
+
+from PIL import Image, ImageChops, ImageCms, ImageFilter, ImageStat
+
+from utils.converter import build_palette_image
+from utils.enhancer import apply_color, apply_filters
+
+AUTOTUNE_PROXY_SIZE = (200, 120)    # proxy of the cropped and filled image (landscape)
+AUTOTUNE_TIME_BUDGET = 0.2          # seconds
+AUTOTUNE_STEPS = (0.2, 0.1, 0.05)   # search step per refinement round
+AUTOTUNE_VALUE_RANGE = (0.1, 2.0)   # sidecar values outside 0..2 are reset on load
+AUTOTUNE_VIEWING_BLUR = 1.0         # px; the eye averages dither patterns at viewing distance
+AUTOTUNE_WORKERS = max(1, min(4, (os.cpu_count() or 1)))
+
+_SRGB_TO_LAB = ImageCms.buildTransform(
+    ImageCms.createProfile("sRGB"),
+    ImageCms.createProfile("LAB"),
+    "RGB",
+    "LAB",
+)
+
+
+def autotune_proxy_size(target_size: tuple[int, int]) -> tuple[int, int]:
+    """AUTOTUNE_PROXY_SIZE in the orientation of the target size."""
+    long_side, short_side = max(AUTOTUNE_PROXY_SIZE), min(AUTOTUNE_PROXY_SIZE)
+    return (long_side, short_side) if target_size[0] >= target_size[1] else (short_side, long_side)
+
+
+def autotune_enhancer_values(
+    proxy: Image.Image,
+    target_device: str,
+    preferences: Mapping[str, Any],
+    start_values: Mapping[str, float],
+    time_budget: float = AUTOTUNE_TIME_BUDGET,
+) -> dict[str, float]:
+    """
+    Searches brightness, contrast and saturation for the given proxy of the cropped
+    and filled image and returns the best values found within the time budget.
+
+    Every candidate is enhanced, dithered to the calibrated device palette like the
+    converter does, and scored by the RMS ΔE (CIE76) between that rendering and the
+    unenhanced proxy, both slightly blurred to mimic viewing distance. Scoring
+    against the unenhanced image keeps the search from "winning" by crushing the
+    picture to palette primaries, which would also minimise the error between a
+    candidate and its own dithering.
+    Candidates of one round are evaluated in parallel; the search is a pattern
+    search starting at start_values with the steps in AUTOTUNE_STEPS.
+
+    :param proxy: small RGB image, see autotune_proxy_size()
+    :param target_device: key of TARGET_DEVICE_MAP
+    :param preferences: image preferences (filter checkboxes are honoured)
+    :param start_values: brightness, contrast and saturation to start from
+    :param time_budget: seconds until the best result so far is returned
+    """
+    deadline = time.perf_counter() + time_budget
+    palette_image = build_palette_image(target_device)
+    filtered = apply_filters(proxy.convert("RGB"), preferences)
+    reference = _to_lab(proxy.convert("RGB").filter(ImageFilter.GaussianBlur(AUTOTUNE_VIEWING_BLUR)))
+
+    def score(values: tuple[float, float, float]) -> float:
+        candidate = dict(preferences)
+        candidate.update(zip(("brightness", "contrast", "saturation"), values))
+        enhanced = apply_color(filtered, candidate)
+        rendered = enhanced.quantize(dither=Image.Dither.FLOYDSTEINBERG, palette=palette_image).convert("RGB")
+        return _rms_delta_e(reference, _to_lab(rendered.filter(ImageFilter.GaussianBlur(AUTOTUNE_VIEWING_BLUR))))
+
+    best = tuple(_clamp(float(start_values[name])) for name in ("brightness", "contrast", "saturation"))
+    scores: dict[tuple[float, float, float], float] = {}
+
+    with ThreadPoolExecutor(max_workers=AUTOTUNE_WORKERS) as pool:
+        scores[best] = score(best)
+
+        for step in AUTOTUNE_STEPS:
+            improved = True
+            while improved and time.perf_counter() < deadline:
+                candidates = [c for c in _neighbours(best, step) if c not in scores]
+                if not candidates:
+                    break
+
+                for candidate, candidate_score in zip(candidates, pool.map(score, candidates)):
+                    scores[candidate] = candidate_score
+
+                improved = False
+                for candidate in candidates:
+                    if scores[candidate] < scores[best]:
+                        best = candidate
+                        improved = True
+
+            if time.perf_counter() >= deadline:
+                break
+
+    return dict(zip(("brightness", "contrast", "saturation"), best))
+
+
+def _neighbours(center: tuple[float, float, float], step: float) -> list[tuple[float, float, float]]:
+    result = []
+    for axis in range(3):
+        for direction in (-1, 1):
+            values = list(center)
+            values[axis] = _clamp(values[axis] + direction * step)
+            candidate = tuple(values)
+            if candidate != center:
+                result.append(candidate)
+    return result
+
+
+def _clamp(value: float) -> float:
+    value = max(AUTOTUNE_VALUE_RANGE[0], min(AUTOTUNE_VALUE_RANGE[1], value))
+    return round(round(value / 0.05) * 0.05, 2)
+
+
+def _to_lab(image: Image.Image) -> list[Image.Image]:
+    """L, a, b bands as unsigned 8-bit images (a and b shifted by 128)."""
+    lab = ImageCms.applyTransform(image, _SRGB_TO_LAB)
+    assert lab is not None
+    l_band, a_band, b_band = lab.split()
+    # a and b are stored as signed bytes; flipping the sign bit gives offset binary
+    flip = [v ^ 0x80 for v in range(256)]
+    return [l_band, a_band.point(flip), b_band.point(flip)]
+
+
+def _rms_delta_e(reference: list[Image.Image], candidate: list[Image.Image]) -> float:
+    pixels = reference[0].width * reference[0].height
+    # L is scaled to 0..255 for 0..100
+    weights = ((100 / 255) ** 2, 1.0, 1.0)
+    total = 0.0
+    for weight, ref_band, cand_band in zip(weights, reference, candidate):
+        total += weight * ImageStat.Stat(ImageChops.difference(ref_band, cand_band)).sum2[0]
+    return math.sqrt(total / max(1, pixels))
+
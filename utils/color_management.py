@@ -0,0 +1,106 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from PIL import Image, ImageCms
+
+ICC_TRANSFORM_CACHE_SIZE = 8    # distinct source profiles kept with a built transform
+ICC_RENDERING_INTENT = ImageCms.Intent.PERCEPTUAL
+
+# ICC colour space signature -> image modes the profile can be applied to
+_PROFILE_MODES = {
+    "RGB ": ("RGB",),
+    "CMYK": ("CMYK",),
+    "GRAY": ("L",),
+}
+
+
+class IccTransformCache:
+    """
+    LRU of ICC -> sRGB transforms keyed by the hash of the embedded profile.
+
+    Building a transform parses both profiles and precomputes lookup tables in
+    littlecms, which costs far more than applying it to an image, so every
+    distinct source profile is built only once per session.
+    A cached None means the profile needs no transform (already sRGB, unusable
+    or not matching the image mode).
+    """
+
+    def __init__(self, max_entries: int = ICC_TRANSFORM_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._srgb_profile = ImageCms.createProfile("sRGB")
+        self._transforms: OrderedDict[tuple[str, str], Optional[ImageCms.ImageCmsTransform]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, icc_profile: bytes, in_mode: str) -> Optional[ImageCms.ImageCmsTransform]:
+        key = (hashlib.sha1(icc_profile).hexdigest(), in_mode)
+
+        with self._lock:
+            if key in self._transforms:
+                self._transforms.move_to_end(key)
+                return self._transforms[key]
+
+        transform = self._build(icc_profile, in_mode)
+
+        with self._lock:
+            self._transforms[key] = transform
+            self._transforms.move_to_end(key)
+            while len(self._transforms) > self.max_entries:
+                self._transforms.popitem(last=False)
+
+        return transform
+
+    def _build(self, icc_profile: bytes, in_mode: str) -> Optional[ImageCms.ImageCmsTransform]:
+        try:
+            source_profile = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+            if in_mode not in _PROFILE_MODES.get(source_profile.profile.xcolor_space, ()):
+                return None
+            if "srgb" in ImageCms.getProfileDescription(source_profile).lower():
+                return None
+
+            return ImageCms.buildTransform(
+                source_profile,
+                self._srgb_profile,
+                in_mode,
+                "RGB",
+                renderingIntent=ICC_RENDERING_INTENT,
+            )
+        except (ImageCms.PyCMSError, OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unusable ICC profile: {e}")
+            return None
+
+
+icc_transform_cache = IccTransformCache()
+
+
+def convert_to_srgb(image: Image.Image, icc_profile: Optional[bytes]) -> Image.Image:
+    """
+    Converts an image to RGB, colour managed to sRGB if it carries an ICC profile.
+    Images without a (usable) profile are treated as sRGB, like before.
+
+    :param image: decoded image in any mode
+    :type image: PIL.Image.Image
+    :param icc_profile: embedded profile, usually image.info.get("icc_profile")
+    :type icc_profile: bytes | None
+    """
+    transform = None
+    in_mode = image.mode if image.mode in ("RGB", "CMYK", "L") else "RGB"
+    if icc_profile:
+        transform = icc_transform_cache.get(icc_profile, in_mode)
+
+    if transform is None:
+        return image if image.mode == "RGB" else image.convert("RGB")
+
+    if image.mode != in_mode:
+        image = image.convert(in_mode)
+
+    if in_mode == "RGB":
+        # same mode in and out: reuse the buffer instead of allocating another one
+        if image.readonly:
+            image = image.copy()
+        transform.apply_in_place(image)
+        return image
+
+    return transform.apply(image)
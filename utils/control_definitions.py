@@ -28,6 +28,12 @@ def build_cropper_control_definitions(app: Any, available_option: dict[str, tupl
             "enter_tip": "Close the app after last image in folder was\nprocessed, otherwise open the first image. (Ctrl+X)",
             "toggle_key": ("<Control-Shift-x>", "<Control-Shift-X>"),
         },
+        "device_preview": {
+            "text": "Device preview",
+            "command": lambda e=None: app.update_app_settings_checkbox("device_preview"),
+            "enter_tip": "Shows the dithered output in the device colors\nin a separate window, updated in the background\nwhile you edit. (Ctrl+Shift+P)",
+            "toggle_key": ("<Control-Shift-p>", "<Control-Shift-P>"),
+        },
     }
 
     app_button_definitions = {
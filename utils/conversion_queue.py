@@ -0,0 +1,195 @@
+import queue
+import threading
+from functools import partial
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, NamedTuple, Optional
+
+from PIL import Image
+
+from utils.converter import TARGET_DEVICE_MAP, Converter
+from utils.crop_render import ScaledRegion, compose_filled_crop, scale_crop_region
+from utils.enhancer import enhance_image
+from utils.image_source import load_source_region
+from utils.textoverlay import render_text_overlay
+
+CONVERSION_QUEUE_SIZE = 4   # confirmed images waiting for conversion before Enter blocks
+CONVERSION_POLL_MS = 50
+
+
+class ConversionJob(NamedTuple):
+    """
+    Everything needed to export one confirmed image, captured when it is confirmed.
+    The source image is only referenced: the app replaces original_img on the next
+    load instead of modifying it, so the job keeps seeing the confirmed pixels.
+    """
+    source_path: str
+    source_image: Image.Image
+    source_size: tuple[int, int]
+    large_image: bool
+    memory_cap_bytes: int   # large_image_memory_mb, sizes the decode limit of the crop region
+    rect: tuple[float, float, float, float]
+    target_size: tuple[int, int]
+    preferences: Mapping[str, Any]
+    text_overlay: Mapping[str, Any]
+    export_folder: str
+    pic_folder_on_device: str
+    dither_method: int
+
+
+def snapshot_mapping(values: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Read-only copy, so later UI changes never leak into a queued job."""
+    return MappingProxyType(dict(values))
+
+
+def preview_job(job: ConversionJob) -> ConversionJob:
+    """
+    The job as rendered by previews (device preview, variant grid): the crop is
+    resampled from the in-memory source image, i.e. the proxy or draft in
+    large-image mode, and never decoded from the file. These cover the device
+    resolution unless the crop is only a small part of the image; such crops are
+    upscaled in the preview. Only the export decodes the crop region from the file,
+    so a preview never decodes a large image again on a slider or crop change.
+    """
+    return job._replace(large_image=False) if job.large_image else job
+
+
+def render_job_region(job: ConversionJob) -> ScaledRegion:
+    """
+    The crop region of a job at the target scale, the part of render_job_crop() that
+    does not depend on the fill mode (and the one that decodes the file in large-image
+    mode). Thread-safe.
+    """
+    region_loader = (
+        partial(load_source_region, job.source_path, memory_cap_bytes=job.memory_cap_bytes)
+        if job.large_image else None
+    )
+    return scale_crop_region(
+        job.source_image,
+        job.source_size,
+        job.rect,
+        job.target_size,
+        region_loader=region_loader,
+    )
+
+
+def render_job_crop(job: ConversionJob, region: Optional[ScaledRegion] = None) -> Image.Image:
+    """
+    Crops and fills a job at the target size, before enhancements and text. Thread-safe.
+
+    :param region: result of render_job_region() for a job with the same source and
+        crop, if already rendered; it is shared, not modified
+    """
+    if region is None:
+        region = render_job_region(job)
+    return compose_filled_crop(region, job.target_size, job.preferences["fill_mode"], job.target_size[0])
+
+
+def render_job_output(job: ConversionJob, filled_crop: Optional[Image.Image] = None) -> Image.Image:
+    """
+    Crops, fills, enhances and renders the text overlay of a job: the image at the
+    target size that is handed to the converter. Thread-safe.
+
+    :param filled_crop: result of render_job_crop() for the job, if already rendered;
+        it is not modified, so several jobs can share it
+    """
+    out_img = filled_crop.copy() if filled_crop is not None else render_job_crop(job)
+    out_img = enhance_image(out_img, job.preferences)
+    return render_text_overlay(out_img, dict(job.text_overlay))
+
+
+def run_conversion_job(job: ConversionJob) -> str:
+    """
+    Crops, fills, enhances, renders the text overlay and converts one job.
+    Returns the path of the device BMP. Runs on the conversion worker thread.
+    """
+    target_device = job.preferences["target_device"]
+    if target_device not in TARGET_DEVICE_MAP:
+        # the converter would ask via messagebox, which must not happen off the Tk thread
+        raise ValueError(f"The given device ({target_device}) does not exist in config.")
+
+    return Converter().convert(
+        source_image=render_job_output(job),
+        source_path=job.source_path,
+        target_device=target_device,
+        export_folder=job.export_folder,
+        dither_method=job.dither_method,
+        pic_folder_on_device=job.pic_folder_on_device,
+    )
+
+
+class ConversionQueue:
+    """
+    Bounded queue of confirmed images, converted one after another on a worker thread.
+
+    submit() returns immediately unless CONVERSION_QUEUE_SIZE jobs are already
+    waiting; then it blocks until the worker has taken one (backpressure keeps the
+    number of referenced source images bounded).
+    Status changes are handed back to Tk through the event loop and reported via
+    on_update(job, state, detail) with state "running", "done" or "failed"; detail
+    is the BMP path or the error message.
+    """
+
+    def __init__(
+        self,
+        widget,
+        on_update: Optional[Callable[[ConversionJob, str, Optional[str]], None]] = None,
+        max_pending: int = CONVERSION_QUEUE_SIZE,
+    ):
+        self.widget = widget
+        self.on_update = on_update
+
+        self._jobs: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._events: queue.Queue = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        threading.Thread(target=self._worker, daemon=True).start()
+        self.widget.after(CONVERSION_POLL_MS, self._drain_events)
+
+    def submit(self, job: ConversionJob) -> None:
+        with self._lock:
+            self._pending += 1
+        self._jobs.put(job)
+
+    def pending(self) -> int:
+        """Jobs queued or being converted."""
+        with self._lock:
+            return self._pending
+
+    def flush(self) -> None:
+        """Blocks until every submitted job is converted and reports their status."""
+        self._jobs.join()
+        self._dispatch_events()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._jobs.get()
+            self._events.put((job, "running", None))
+            try:
+                device_path = run_conversion_job(job)
+                state, detail = "done", device_path
+            except Exception as e:
+                print(f"[WARN] Conversion failed for '{job.source_path}': {e}")
+                state, detail = "failed", str(e)
+
+            with self._lock:
+                self._pending -= 1
+            self._events.put((job, state, detail))
+            self._jobs.task_done()
+
+    def _drain_events(self) -> None:
+        self._dispatch_events()
+
+        if self.widget.winfo_exists():
+            self.widget.after(CONVERSION_POLL_MS, self._drain_events)
+
+    def _dispatch_events(self) -> None:
+        while True:
+            try:
+                job, state, detail = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+            if self.on_update is not None:
+                self.on_update(job, state, detail)
+
@@ -121,6 +121,37 @@ TARGET_DEVICE_MAP = {
     },
 }
 
+def build_palette_image(target_device: str) -> Image.Image:
+    """
+    Palette image for Image.quantize() holding the calibrated colors of the device.
+    Raises KeyError for unknown devices.
+    """
+    calibrated = TARGET_DEVICE_MAP[target_device]["calibrated_to_display"]
+    palette = (
+        tuple(
+            v for rgb in calibrated for v in rgb
+        ) + calibrated[0] * (256 - len(calibrated))
+    )
+
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette(palette)
+    return palette_image
+
+
+def quantize_to_device(
+    image: Image.Image,
+    target_device: str,
+    dither_method: int | Image.Dither = Image.Dither.FLOYDSTEINBERG,
+) -> Image.Image:
+    """
+    Quantizes an image to the calibrated colors of the device, i.e. what the panel
+    will show, and returns it as RGB. Raises KeyError for unknown devices.
+    """
+    dither = dither_method if isinstance(dither_method, Image.Dither) else Image.Dither(dither_method)
+    quant = image.convert("RGB").quantize(dither=dither, palette=build_palette_image(target_device))
+    return quant.convert("RGB")
+
+
 class Converter:
     """
     Image converter for Waveshare PhotoPainter.
@@ -177,16 +208,6 @@ class Converter:
             self._rgb_to_index = {
                 rgb: i for i, rgb in enumerate(self.target_device_map["calibrated_to_display"])
             }
-
-            # prebuild palette
-            palette = (
-                tuple(
-                    v for rgb in self.target_device_map["calibrated_to_display"] for v in rgb
-                ) + self.target_device_map["calibrated_to_display"][0] * (256 - len(self.target_device_map["calibrated_to_display"]))
-            )
-
-            self._palette_image = Image.new("P", (1, 1))
-            self._palette_image.putpalette(palette)
         except Exception as e:
             messagebox.showwarning("Target device palette error", f"The given device ({target_device}) does not exist in config.\nSkipping device target conversion.")
             self.flag=True
@@ -199,15 +220,12 @@ class Converter:
         # 1. Loading
         # -----------------------------------------
         report(1, "Loading image…")
-        img = source_image.convert("RGB")
 
         # -------------------
-        # Palette quantization
+        # Palette quantization (shared with the device preview)
         # -------------------
         report(2, "Quantizing to palette…")
-        dither = dither_method if isinstance(dither_method, Image.Dither) else Image.Dither(dither_method)
-        quant = img.quantize(dither=dither, palette=self._palette_image)
-        quant_rgb = quant.convert("RGB")
+        quant_rgb = quantize_to_device(source_image, target_device, dither_method)
 
         # -------------------
         # Build output paths and save quantized image
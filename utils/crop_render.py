@@ -0,0 +1,128 @@
+import math
+from typing import Callable, NamedTuple, Optional
+
+from PIL import Image, ImageFilter
+
+FILL_BLUR_RADIUS = 25   # px at the full target size
+
+
+class ScaledRegion(NamedTuple):
+    """The part of a crop covered by the image, resampled to the output scale."""
+    image: Optional[Image.Image]  # None if the crop lies entirely outside the image
+    offset: tuple[int, int]       # position of image in the output (may be negative)
+
+
+def render_filled_crop(
+    source: Image.Image,
+    source_size: tuple[int, int],
+    rect: tuple[float, float, float, float],
+    out_size: tuple[int, int],
+    fill_mode: str,
+    full_width: int,
+    region_loader: Optional[Callable[[tuple[int, int, int, int], tuple[int, int]], Image.Image]] = None,
+    resample: Image.Resampling = Image.Resampling.LANCZOS,
+) -> Image.Image:
+    """
+    Crops the rectangle (source space, may exceed the image) to out_size and fills
+    the uncovered area according to fill_mode. Enhancements and text are not applied.
+    Works on the passed values only, so it can run on a worker thread.
+
+    :param source: the source image or a downscaled copy of it (proxy, display image)
+    :param source_size: oriented size of the full source; rect is given in this space
+    :param rect: crop rectangle (x1, y1, x2, y2) in source space
+    :param out_size: output size
+    :param fill_mode: white | black | blur
+    :param full_width: width of the final export, keeps the blur proportional in previews
+    :param region_loader: optional callable(box, size) decoding a source region from
+        the file (large-image mode); used instead of resizing from source
+    :param resample: filter used when resizing from source
+    """
+    region = scale_crop_region(source, source_size, rect, out_size, region_loader, resample)
+    return compose_filled_crop(region, out_size, fill_mode, full_width)
+
+
+def scale_crop_region(
+    source: Image.Image,
+    source_size: tuple[int, int],
+    rect: tuple[float, float, float, float],
+    out_size: tuple[int, int],
+    region_loader: Optional[Callable[[tuple[int, int, int, int], tuple[int, int]], Image.Image]] = None,
+    resample: Image.Resampling = Image.Resampling.LANCZOS,
+) -> ScaledRegion:
+    """
+    First half of render_filled_crop(): the intersection of the crop with the image,
+    resampled (or decoded via region_loader) at the output scale. It does not depend
+    on the fill mode, so renders of several fill modes can share it.
+    """
+    x1i, y1i, x2i, y2i = rect
+
+    # 2) intersection with the original image
+    iw, ih = source_size
+    ix1 = max(0, math.floor(x1i))
+    iy1 = max(0, math.floor(y1i))
+    ix2 = min(iw, math.ceil(x2i))
+    iy2 = min(ih, math.ceil(y2i))
+
+    # 3) scala orig->target
+    sel_w_orig = x2i - x1i
+    sel_h_orig = y2i - y1i
+    sx = out_size[0] / sel_w_orig
+    sy = out_size[1] / sel_h_orig
+
+    if ix2 <= ix1 or iy2 <= iy1:
+        return ScaledRegion(None, (0, 0))
+
+    int_w_orig = ix2 - ix1
+    int_h_orig = iy2 - iy1
+    int_w_tgt = max(1, int(round(int_w_orig * sx)))
+    int_h_tgt = max(1, int(round(int_h_orig * sy)))
+    if region_loader is not None:
+        region_scaled = region_loader((ix1, iy1, ix2, iy2), (int_w_tgt, int_h_tgt))
+    else:
+        # resize straight from the source box: no full-resolution crop copy
+        ps = source.width / iw
+        box = (ix1 * ps, iy1 * ps, ix2 * ps, iy2 * ps)
+        region_scaled = source.resize((int_w_tgt, int_h_tgt), resample, box=box)
+
+    return ScaledRegion(region_scaled, (int(round((ix1 - x1i) * sx)), int(round((iy1 - y1i) * sy))))
+
+
+def compose_filled_crop(region: ScaledRegion, out_size: tuple[int, int], fill_mode: str, full_width: int) -> Image.Image:
+    """
+    Second half of render_filled_crop(): the fill background with the scaled region
+    pasted on top. The region is not modified.
+    """
+    # 4) background base (white or blur) + paste sharp part if intersection exists
+    region_scaled = region.image
+    if region_scaled is None:
+        return background_only(None, out_size, fill_mode, full_width)
+
+    out_img = background_only(region_scaled, out_size, fill_mode, full_width)
+
+    dx_tgt, dy_tgt = region.offset
+
+    src_x1 = max(0, -dx_tgt)
+    src_y1 = max(0, -dy_tgt)
+    dst_x1 = max(0, dx_tgt)
+    dst_y1 = max(0, dy_tgt)
+
+    width  = min(out_size[0] - dst_x1, region_scaled.width  - src_x1)
+    height = min(out_size[1] - dst_y1, region_scaled.height - src_y1)
+
+    if width > 0 and height > 0:
+        sub = region_scaled.crop((src_x1, src_y1, src_x1 + width, src_y1 + height))
+        out_img.paste(sub, (dst_x1, dst_y1))
+
+    return out_img
+
+
+def background_only(region_scaled_or_none: Optional[Image.Image], size: tuple[int, int], fill_mode: str, full_width: int) -> Image.Image:
+    if fill_mode == "blur":
+        if region_scaled_or_none is None:
+            # crop entirely outside the image: nothing to blur
+            return Image.new("RGB", size, "white")
+        base = region_scaled_or_none.resize(size, Image.Resampling.LANCZOS)
+        # keep the blur proportional when rendering smaller previews
+        return base.filter(ImageFilter.GaussianBlur(radius=FILL_BLUR_RADIUS * size[0] / full_width))
+    else: # white, black
+        return Image.new("RGB", size, fill_mode)
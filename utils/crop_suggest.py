@@ -0,0 +1,118 @@
+import base64
+from itertools import accumulate
+from typing import Any, Optional
+
+from PIL import Image, ImageChops, ImageFilter
+
+SALIENCY_GRID_SIZE = 32         # longest side of the stored saliency grid (cells)
+SALIENCY_SATURATION_WEIGHT = 0.5
+CROP_SUGGEST_CENTER_BIAS = 0.15 # score penalty for a window at the far edge, relative
+
+
+def compute_saliency_grid(image: Image.Image) -> dict[str, Any]:
+    """
+    Computes a coarse saliency map: edge energy plus a share of the colour saturation,
+    averaged into a grid of at most SALIENCY_GRID_SIZE cells on the longest side.
+    Any already downscaled image (thumbnail, display image) is a fine input; the
+    cost is a few filters on a proxy and stays around a millisecond per image.
+    The result is JSON-serializable for the metadata cache and independent of the
+    crop ratio, so one entry serves every target device and orientation.
+    """
+    scale = min(1.0, (SALIENCY_GRID_SIZE * 2) / max(image.size))
+    proxy_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    proxy = image if proxy_size == image.size else image.resize(proxy_size, Image.Resampling.BILINEAR)
+    if proxy.mode != "RGB":
+        proxy = proxy.convert("RGB")
+
+    edges = proxy.convert("L").filter(ImageFilter.FIND_EDGES)
+    # the filter leaves the 1 px border unfiltered; it carries no edge information
+    if edges.width > 2 and edges.height > 2:
+        inner = edges.crop((1, 1, edges.width - 1, edges.height - 1))
+        edges = Image.new("L", edges.size, 0)
+        edges.paste(inner, (1, 1))
+    saturation = proxy.convert("HSV").getchannel("S")
+    energy = ImageChops.add(edges, saturation.point(lambda v: int(v * SALIENCY_SATURATION_WEIGHT)))
+
+    grid_scale = min(1.0, SALIENCY_GRID_SIZE / max(energy.size))
+    grid_size = (max(1, round(energy.width * grid_scale)), max(1, round(energy.height * grid_scale)))
+    grid = energy.resize(grid_size, Image.Resampling.BOX)
+
+    return {
+        "size": list(grid.size),
+        # one byte per cell, base64 keeps the cache entry compact
+        "data": base64.b64encode(grid.tobytes()).decode("ascii"),
+    }
+
+
+def suggest_crop_center(
+    saliency: dict[str, Any],
+    ratio: float,
+    crop_size: float = 1.0,
+    image_aspect: Optional[float] = None,
+) -> Optional[tuple[float, float]]:
+    """
+    Finds the window of the given aspect ratio with the most saliency and returns
+    its centre as fractions (0..1) of the image width and height.
+
+    The window has the size the cropper starts with (crop_size of the largest
+    fitting rectangle), so only its position is chosen. Window sums come from a
+    summed-area table, so every position costs four lookups. The search works on
+    whole cells; the returned centre is clamped with the exact crop size, so the
+    crop never reaches past the image edges.
+
+    :param saliency: result of compute_saliency_grid()
+    :param ratio: crop width / height
+    :param crop_size: share of the largest fitting rectangle, like DEFAULT_CROP_SIZE
+    :param image_aspect: width / height of the image (default: of the grid, which is
+        rounded to whole cells)
+    """
+    try:
+        gw, gh = (int(v) for v in saliency["size"])
+        data = base64.b64decode(saliency["data"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if gw <= 0 or gh <= 0 or len(data) != gw * gh or ratio <= 0 or not any(data):
+        return None
+
+    # crop size as fractions of the image, same rule as init_crop_rectangle
+    aspect = image_aspect if image_aspect and image_aspect > 0 else gw / gh
+    crop_w = crop_size
+    crop_h = crop_size * aspect / ratio
+    if crop_h > 1.0:
+        crop_h = crop_size
+        crop_w = crop_size * ratio / aspect
+
+    # window size in whole cells
+    ww = max(1, min(gw, round(gw * crop_w)))
+    wh = max(1, min(gh, round(gh * crop_h)))
+
+    # summed-area table with a zero row/column in front
+    sat = [[0] * (gw + 1)]
+    for y in range(gh):
+        row_sums = accumulate(data[y * gw:(y + 1) * gw], initial=0)
+        above = sat[-1]
+        sat.append([a + b for a, b in zip(row_sums, above)])
+
+    max_x, max_y = gw - ww, gh - wh
+    best_score, best = -1.0, (max_x / 2, max_y / 2)
+    for y in range(max_y + 1):
+        top, bottom = sat[y], sat[y + wh]
+        # prefer the centre when the image does not say otherwise
+        bias_y = abs(y - max_y / 2) / max_y if max_y else 0.0
+        for x in range(max_x + 1):
+            total = bottom[x + ww] - bottom[x] - top[x + ww] + top[x]
+            bias_x = abs(x - max_x / 2) / max_x if max_x else 0.0
+            score = total * (1.0 - CROP_SUGGEST_CENTER_BIAS * max(bias_x, bias_y))
+            if score > best_score:
+                best_score, best = score, (x, y)
+
+    fx = (best[0] + ww / 2) / gw
+    fy = (best[1] + wh / 2) / gh
+    return (_clamp_center(fx, crop_w), _clamp_center(fy, crop_h))
+
+
+def _clamp_center(center: float, extent: float) -> float:
+    """Keeps a window of the given extent (fraction) around center inside 0..1."""
+    if extent >= 1.0:
+        return 0.5
+    return min(max(center, extent / 2), 1.0 - extent / 2)
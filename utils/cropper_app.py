@@ -4,19 +4,33 @@
 import os
 import sys
 import ast
-import math
 import time
 import re
+from functools import partial
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from typing import Any, Callable, Literal, Optional
-from PIL import Image, ImageTk, ImageFilter, ImageEnhance, ImageOps
+from PIL import Image, ImageTk
 from utils.gallery import AsyncThumbnailGallery
 from utils.textoverlay import CanvasTextOverlay
 from utils.textoverlay_defaults import TEXT_OVERLAY_DEFAULTS
 from utils.tooltip import Hovertip
-from utils.converter import Converter
+from utils.conversion_queue import ConversionJob, ConversionQueue, preview_job, snapshot_mapping
 from utils.keybinds import bind_toggle_keys
+from utils.image_source import decoded_rgb_bytes, load_source_region, read_oriented_size
+from utils.crop_render import render_filled_crop
+from utils.image_loader import ImageLoader, LoadedImage, covers_display, fit_display_size
+from utils.image_cache import DecodedImageCache
+from utils.image_service import ImageSourceService
+from utils.deep_zoom import ViewportRenderer
+from utils.device_preview import DEVICE_PREVIEW_DEBOUNCE_MS, DevicePreviewRenderer
+from utils.variant_grid import VARIANT_GRID_MAX, Variant, VariantGridRenderer
+from utils.enhancer import BRIGHTNESS, CONTRAST, SATURATION, FilterStageCache, apply_color
+from utils.image_stats import compute_image_stats, auto_levels_from_stats
+from utils.autotune import autotune_enhancer_values, autotune_proxy_size
+from utils.crop_suggest import compute_saliency_grid, suggest_crop_center
+from utils.metadata_cache import MetadataCache
+from utils.thumbnail_cache import ThumbnailCache
 from utils.control_definitions import build_cropper_control_definitions
 
 # Try to import pillow-heif for HEIC support
@@ -71,6 +85,14 @@ defaults:dict = {
     "GALLERY_SHOW_LANDSCAPE": True,
     "GALLERY_SHOW_PORTRAIT": True,
     "GALLERY_SHOW_UNPROCESSED": False,
+    "LARGE_IMAGE_MEMORY_MB": 512,
+    "IMAGE_CACHE_MB": 768,
+    "THUMBNAIL_CACHE_MB": 256,
+    "DEVICE_PREVIEW": False,
+    "MASK_RENDERER": "stipple",
+    "RESUME_SESSION": True,
+    "LAST_FOLDER": "",
+    "LAST_IMAGE": "",
 }
 
 available_option:dict = {
@@ -79,11 +101,10 @@ available_option:dict = {
     "TARGET_DEVICE": ("acep", "spectra6", "4color"),
 }
 
-FILELIST_FILENAME: str = "fileList.txt"
+MASK_RENDERERS = ("stipple", "image") # off-crop mask: stippled rectangles or a darkened image copy
+TEXT_SETTINGS = ("last_folder", "last_image") # paths: kept as written, never converted to numbers or sizes
 
-BRIGHTNESS = 1.0
-CONTRAST = 1.0
-SATURATION = 1.0
+FILELIST_FILENAME: str = "fileList.txt"
 
 ENHANCER_DEFAULTS_BY_DEVICE: dict[str, dict[str, float]] = {
     "acep": {
@@ -106,6 +127,7 @@ ENHANCER_DEFAULTS_BY_DEVICE: dict[str, dict[str, float]] = {
 DEFAULT_CROP_SIZE = 1 # between 0.1 ... 1
 MASK_COLOR = "#000000"          # mask outside crop region
 MASK_STIPPLE = "gray50"
+MASK_DIM_LUT = [v // 2 for v in range(256)] # "image" mask: darkened copy, about as dark as the 50% stipple
 CANVAS_BACKGROUND_COLOR = "#000000"
 WINDOW_BACKGROUND_COLOR = "#222222"
 BORDER_COLOR = "#333333"
@@ -119,6 +141,14 @@ SCALE_FACTOR_FAST = 1.10            # zoom step with Shift
 SCALE_FACTOR_SLOW = 1.002           # zoom step with Ctrl+Shift
 CANVAS_ZOOM_STEP = 1.10             # Ctrl+wheel zoom step for canvas image
 CANVAS_ZOOM_MIN = 0.25              # minimum relative zoom of fit-to-window scale
+DEEP_ZOOM_MAX = 8.0                 # Ctrl+wheel zoom beyond the fit scale (viewport only, not saved)
+NAVIGATION_SETTLE_MS = 150           # navigation events closer than this are coalesced (key repeat, rapid clicks)
+DISPLAY_REFINE_MS = 200             # quiet time after resize/zoom before the display image is redone with LANCZOS
+PREFETCH_NEIGHBOURS = 2             # images decoded ahead in each direction of the gallery filter order
+SLIDER_DRAFT_REDUCE = 2             # while a slider moves the preview is enhanced at 1/2 width and height (1/4 area)
+SLIDER_SETTLE_MS = 250              # quiet time after the last slider move before the full-quality render
+SLIDER_DEBOUNCE_MIN_MS = 10         # bounds of the slider debounce, which follows the measured draft render time
+SLIDER_DEBOUNCE_MAX_MS = 100
 
 LABEL_PADDINGS = (5, 5)
 DEFAULT_TOOLTIP_DELAY = 250
@@ -133,6 +163,16 @@ class CropperApp:
         # ---------- UI ----------
         self._resize_pending = False
         self._slider_update_pending = None
+        self._slider_pending_value: Optional[tuple[str, float]] = None
+        self._slider_settle_id: Optional[str] = None
+        self._draft_render_ms = float(SLIDER_DEBOUNCE_MIN_MS) # running average of draft preview renders
+        self._draft_shown = False
+        self._draft_source: Optional[Image.Image] = None
+        self._draft_proxy: Optional[Image.Image] = None
+        self._redraw_pending: Optional[str] = None # after_idle id of the coalesced canvas redraw
+        self._redraw_image = False
+        self._zoom_pending: Optional[str] = None
+        self.crop_item_ids: list[int] = [] # crop window, mask (4), edge, grid lines (4); created once, moved with coords()
         self.window = window
         
         x_lws, y_lws = self.app_settings['last_window_size']        
@@ -189,6 +229,10 @@ class CropperApp:
         self.status_count = ttk.Label(bottom_bar, text="[0/0]", anchor=tk.W)
         self.status_count.pack(padx=LABEL_PADDINGS[0], pady=LABEL_PADDINGS[1], anchor=tk.W, side=tk.LEFT)
 
+        # conversion queue depth and last job status (packed first so it keeps its place on the right)
+        self.status_queue = ttk.Label(bottom_bar, text="", anchor=tk.E)
+        self.status_queue.pack(padx=LABEL_PADDINGS[0], pady=LABEL_PADDINGS[1], anchor=tk.E, side=tk.RIGHT)
+
         # current image path
         self.status_label = ttk.Label(bottom_bar, text="Select folder with images…", anchor=tk.W)
         self.status_label.pack(padx=0, pady=LABEL_PADDINGS[1], anchor=tk.W, fill=tk.X, side=tk.LEFT)
@@ -229,6 +273,9 @@ class CropperApp:
         self.canvas.bind("<MouseWheel>", self.on_wheel)     # mac/win
         self.canvas.bind("<Button-4>", self.on_wheel_linux) # linux up
         self.canvas.bind("<Button-5>", self.on_wheel_linux) # linux down
+        for button in ("2", "3"): # Mouse Middle/Right (Right is "2" on mac): pan while deep zoomed
+            self.canvas.bind(f"<Button-{button}>", self.on_pan_start)
+            self.canvas.bind(f"<B{button}-Motion>", self.on_pan)
 
         # Keyboard events
         self.window.bind("<Escape>", self.on_skip)
@@ -246,16 +293,58 @@ class CropperApp:
         for ks in ("<minus>", "<KP_Subtract>"):
             self.window.bind(ks, self.on_minus)
         self.window.bind("<Control-a>", self.on_select_all)
+        self.window.bind("<Control-Shift-a>", self.apply_auto_levels)
+        self.window.bind("<Control-Shift-A>", self.apply_auto_levels)
+        self.window.bind("<Control-Shift-e>", self.apply_auto_tune)
+        self.window.bind("<Control-Shift-E>", self.apply_auto_tune)
+        self.window.bind("<Control-Shift-v>", self.show_variant_grid)
+        self.window.bind("<Control-Shift-V>", self.show_variant_grid)
 
         # Various
         self.window.bind("<Configure>", self.on_window_resize)
 
         # State
         self.picture_input_folder: Optional[str] = None
-        self.original_img: Optional[Image.Image] = None
+        self.metadata_cache: Optional[MetadataCache] = None
+        # gallery thumbnails of all folders, kept next to settings.ini (0 MB: disabled)
+        self.thumbnail_cache: Optional[ThumbnailCache] = (
+            ThumbnailCache(".", int(self.app_settings["thumbnail_cache_mb"]) << 20)
+            if self.app_settings["thumbnail_cache_mb"] > 0 else None
+        )
+        self.image_stats: Optional[dict[str, Any]] = None
+        self.last_conversion_status = ""
+        self.conversion_queue = ConversionQueue(self.window, on_update=self.on_conversion_update)
+        self.device_preview = DevicePreviewRenderer(self.window, self.on_device_preview_ready)
+        self._device_preview_window: Optional[tk.Toplevel] = None
+        self._device_preview_label: Optional[ttk.Label] = None
+        self._device_preview_tk: Optional[ImageTk.PhotoImage] = None
+        self._device_preview_id: Optional[str] = None
+        self.variant_grid = VariantGridRenderer(self.window, self.on_variant_ready)
+        self._variant_grid_window: Optional[tk.Toplevel] = None
+        self._variant_tiles: list[ttk.Label] = []
+        self._variant_tk: list[Optional[ImageTk.PhotoImage]] = []
+        self._variants: list[Variant] = []
+        self.image_cache = DecodedImageCache(int(self.app_settings["image_cache_mb"]) << 20)
+        # one decode per file for gallery thumbnails and the viewer
+        self.image_service = ImageSourceService(self.image_cache, int(self.app_settings["large_image_memory_mb"]) << 20)
+        self.image_loader = ImageLoader(self.window, self.load_image_by_exiforient, self.on_image_loaded, cache=self.image_cache)
+        self.original_img: Optional[Image.Image] = None # full image, JPEG draft or bounded proxy in large-image mode
+        self.original_img_complete = True # False: a draft that can be decoded again with more detail
+        self.detail_pending = False # a decode with more detail of the current image is running
+        self.preview_img: Optional[Image.Image] = None # gallery thumbnail shown while original_img decodes
+        self.preview_path: Optional[str] = None
+        self._last_navigation_time = 0.0
+        self._last_navigation_path: Optional[str] = None
+        self.display_is_draft = False
+        self._display_refine_id: Optional[str] = None
+        self._navigation_settle_id: Optional[str] = None
+        self.source_size: tuple[int, int] = (0, 0) # oriented size of the source file (image space)
         self.original_img_file_size: int = 0
         self.display_img = None # image to display in window
         self.tk_img: Optional[ImageTk.PhotoImage] = None
+        self.tk_img_dark: Optional[ImageTk.PhotoImage] = None # "image" mask renderer: darkened copy of tk_img
+        self.crop_window_tk: Optional[tk.PhotoImage] = None # "image" mask renderer: part of tk_img inside the crop
+        self.image_pos = (0, 0) # canvas position of tk_img
         self.image_id = None
         self.image_paths = []
         self.current_image_path: str = ""
@@ -263,6 +352,11 @@ class CropperApp:
         self.scale: float = 1.0
         self.img_off: tuple[int, int] = (0, 0)
         self.disp_size: tuple[int, int] = (0, 0)
+        self.deep_zoom: float = 1.0 # > 1: zoomed beyond the fit scale, only the viewport is rendered
+        self.view_center: Optional[tuple[float, float]] = None # image space point at the canvas centre while deep zoomed
+        self.viewport_renderer = ViewportRenderer()
+        self.filter_stage = FilterStageCache() # Edge/Smooth/Sharpen result of the shown image
+        self._pan_anchor: Optional[tuple[int, int, tuple[float, float]]] = None
         self.target_size: tuple[int, int] = (0, 0)
         self.ratio: float = 0
         self.rect_w: int = 0
@@ -287,9 +381,16 @@ class CropperApp:
             return
 
         self.window.focus_set()
-        self.load_folder()
 
-    def load_folder(self, openNew=True) -> None:
+        # resume at the image shown when the app was closed, without asking for a folder
+        last_folder = self.app_settings["last_folder"]
+        if self.app_settings["resume_session"] and last_folder and os.path.isdir(last_folder):
+            self.picture_input_folder = last_folder
+            self.load_folder(False, resume_image=self.app_settings["last_image"])
+        else:
+            self.load_folder()
+
+    def load_folder(self, openNew=True, resume_image: Optional[str] = None) -> None:
         """
         Load images from given folder.
         Called once on app start or when changing or reloading folder.
@@ -297,6 +398,7 @@ class CropperApp:
         :param self: instance
         :param openNew: open new folder or reload
         :type openNew: bool
+        :param resume_image: file name of the image to open instead of the first one
         """
         # Get images in folder with case-insensitive extension matching.
         # Keep current image list until a new valid folder has been confirmed.
@@ -326,8 +428,15 @@ class CropperApp:
                     found_paths.append(os.path.normpath(os.path.join(scan_folder, name)))
 
             if found_paths:
+                if self.metadata_cache is None or self.metadata_cache.folder != scan_folder:
+                    self.save_metadata_cache()
+                    self.metadata_cache = MetadataCache(scan_folder)
                 self.picture_input_folder = scan_folder
                 self.img_idx = 0
+                if resume_image:
+                    resume_path = os.path.normpath(os.path.join(scan_folder, resume_image))
+                    if resume_path in found_paths:
+                        self.img_idx = found_paths.index(resume_path)
                 self.image_paths = found_paths
                 break
 
@@ -354,39 +463,218 @@ class CropperApp:
                 show_portrait=self.app_settings.get("gallery_show_portrait", True),
                 show_unprocessed=self.app_settings.get("gallery_show_unprocessed", False),
                 on_filter_change=lambda ls, pt, up: self.app_settings.update({"gallery_show_landscape": ls, "gallery_show_portrait": pt, "gallery_show_unprocessed": up}),
+                metadata_cache=self.metadata_cache,
+                image_service=self.image_service,
+                thumbnail_cache=self.thumbnail_cache,
             )
             self.gallery.pack(fill=tk.X, padx=LABEL_PADDINGS[0], pady=LABEL_PADDINGS[1])
         else:
+            self.gallery.metadata_cache = self.metadata_cache
             self.gallery.set_images(self.image_paths)
 
         self.window.update() # after creating the buttons above
         self.width, self.height = self.window.winfo_width(), self.window.winfo_height()
 
+        if self.img_idx and self.gallery is not None:
+            # resumed image: scroll to it, loaded once below; filtered out → nearest shown one
+            nearest = self.gallery.nearest_filtered_index(self.img_idx)
+            if nearest is not None:
+                self.img_idx = nearest
+                self.gallery.select_index(self.img_idx, notify=False)
+
         self.load_image()
 
     def load_image(self) -> None:
-        self.current_image_path = self.image_paths[self.img_idx]
+        """
+        Shows the current image. Navigation events arriving faster than
+        NAVIGATION_SETTLE_MS apart (key repeat, rapid gallery clicks) only update the
+        counter and a thumbnail placeholder; the image is loaded once input settles.
+        Another call for the image just navigated to is not a new navigation event:
+        its load is already running or waiting for input to settle.
+        """
+        path = self.image_paths[self.img_idx]
+        now = time.monotonic()
+        rapid = (now - self._last_navigation_time) * 1000 < NAVIGATION_SETTLE_MS
+        if rapid and path == self._last_navigation_path:
+            return
+        self._last_navigation_time = now
+        self._last_navigation_path = path
+
+        if self._navigation_settle_id is not None:
+            self.window.after_cancel(self._navigation_settle_id)
+            self._navigation_settle_id = None
+
+        if rapid:
+            # drop the load of the image we are passing through
+            self.image_loader.cancel()
+            self.detail_pending = False
+            self.original_img = None
+            self.preview_img = None
+            self.preview_path = None
+            self.show_navigation_placeholder()
+            self._navigation_settle_id = self.window.after(NAVIGATION_SETTLE_MS, self._on_navigation_settled)
+            return
 
-        if self.text_overlay is not None:
-            self.text_overlay.reset_for_new_image(self.current_image_path)
+        self.request_current_image()
 
-        # Load saved preferences BEFORE loading the image
-        pref_loaded = self.load_image_preferences_or_defaults(self.current_image_path)
+    def _on_navigation_settled(self) -> None:
+        self._navigation_settle_id = None
+        self.request_current_image()
 
-        try:
+    def show_navigation_placeholder(self) -> None:
+        """Counter, path and the bare gallery thumbnail; no sidecar, sliders or crop."""
+        path = self.image_paths[self.img_idx]
+        self.update_image_counter()
+        self.update_status_label(path)
+        self.canvas.itemconfigure("crop_layer", state="hidden")
+
+        thumb = self.gallery.thumbnail_image(self.img_idx) if self.gallery is not None else None
+        if thumb is None:
+            self.canvas.delete("image_layer")
             self.image_id = None
-            self.original_img = self.load_image_by_exiforient(self.current_image_path) # EXIF auto-rotate
-            self.original_img_file_size = os.stat(self.current_image_path).st_size
-            self.display_img = self.original_img.copy()
-        except Exception as e:
+            return
+
+        cw, ch = self.canvas_size()
+        _, size = fit_display_size(thumb.size, (cw, ch), self.app_settings["canvas_zoom"])
+        placeholder = thumb.resize(size, Image.Resampling.BILINEAR)
+        if self.tk_img is not None and (self.tk_img.width(), self.tk_img.height()) == size:
+            # key repeat: reuse the Tk image, like update_image_in_canvas()
+            self.tk_img.paste(placeholder)
+        else:
+            self.tk_img = ImageTk.PhotoImage(placeholder)
+        offset = ((cw - size[0]) // 2, (ch - size[1]) // 2)
+        if self.image_id is None:
+            self.image_id = self.canvas.create_image(offset[0], offset[1], anchor="nw", image=self.tk_img, tags="image_layer")
+            self.canvas.tag_lower("image_layer")
+        else:
+            self.canvas.itemconfig(self.image_id, image=self.tk_img)
+            self.canvas.coords(self.image_id, offset[0], offset[1])
+
+    def request_current_image(self) -> None:
+        """
+        Requests the current image from the image loader. Decoding and the display
+        resize run on its worker; the previous image stays on screen until
+        on_image_loaded() takes over on the Tk thread.
+        """
+        path = self.image_paths[self.img_idx]
+
+        # Drop the previous original before decoding so two originals are never alive at once.
+        # The display image stays on screen until the new one (or its preview) arrives.
+        self.original_img = None
+        self.preview_img = None
+        self.preview_path = None
+        self.detail_pending = False
+        self.image_service.set_display(self.canvas_size(), self.app_settings["canvas_zoom"])
+        self.image_service.set_wanted([path])
+        self.image_loader.request(path, self.canvas_size(), self.app_settings["canvas_zoom"])
+
+        self.show_preview(path)
+        self.update_status_label(f"Loading {path}…")
+
+    def show_preview(self, path: str) -> None:
+        """
+        Shows the gallery thumbnail upscaled while the image decodes, with sidecar
+        state and crop rectangle already applied. Crop coordinates live in image
+        space, so the rectangle can be moved before the full image arrives.
+        Skipped for cached images, which arrive within a tick anyway.
+        """
+        if self.gallery is None or self.image_cache.get(path) is not None:
+            return
+
+        thumb = self.gallery.thumbnail_image(self.img_idx)
+        if thumb is None:
+            return
+
+        try:
+            source_size = read_oriented_size(path)
+        except Exception:
+            return
+
+        self.preview_img = thumb
+        self.preview_path = path
+        self.setup_image(path, source_size)
+
+    def on_image_loaded(self, result: LoadedImage) -> None:
+        preview_path = self.preview_path
+        self.preview_img = None
+        self.preview_path = None
+        more_detail = self.detail_pending and self.original_img is not None and result.path == self.current_image_path
+        self.detail_pending = False
+
+        if result.image is None and more_detail:
+            print(f"[WARN] Unable to decode more detail of {result.path}: {result.error}")
+            self.original_img_complete = True
+            return
+
+        if result.image is None:
+            self.current_image_path = result.path
+            e = result.error
+            self.display_img = None
             if len(self.image_paths) == 1:
                 messagebox.showwarning("Image error", f"Unable to open:\n{self.current_image_path}\n{e}\nAs it is the only image there's nothing more to do. App will quit now.")
                 self.window.after(50, self.window.destroy) #quit)
             else:
                 messagebox.showwarning("Image error", f"Unable to open:\n{self.current_image_path}\n{e}\nWe move on to the next one.")
                 self.next_image()
-            
+
+            return
+
+        self.original_img = result.image # EXIF auto-rotated
+        self.original_img_complete = result.complete
+        self.original_img_file_size = result.file_size
+
+        if (preview_path == result.path or more_detail) and self.source_size == result.source_size:
+            # refine the preview or draft: preferences, sliders and the crop (maybe moved meanwhile) stay
+            self.viewport_renderer.clear()
+            x1i, y1i, x2i, y2i = self.rect_in_image_coords_raw()
+            self.resize_image_and_center_in_window(result.display_image)
+            self.update_image_in_canvas()
+            self.calculate_display_coordiantes(x1i, y1i, x2i, y2i)
+            self.clamp_crop_rectangle_to_canvas()
+            self.draw_crop_marker_grid()
+            self.update_status_label()
+        else:
+            self.setup_image(result.path, result.source_size, result.display_image)
+
+        self.request_more_detail()
+        self.window.after_idle(self.prefetch_neighbours)
+
+    def request_more_detail(self) -> None:
+        """
+        Decodes the current image again if it is a draft that no longer covers the
+        display (larger window, deep zoom). The draft stays on screen meanwhile.
+        """
+        if self.original_img is None or self.original_img_complete or self.detail_pending:
             return
+        if decoded_rgb_bytes(self.source_size) > (int(self.app_settings["large_image_memory_mb"]) << 20):
+            return # large-image mode: the viewer never gets more than the proxy
+        if covers_display(self.original_img.size, self.source_size, self.disp_size):
+            return
+
+        self.detail_pending = True
+        self.image_loader.request(self.current_image_path, self.canvas_size(), self.app_settings["canvas_zoom"], self.deep_zoom)
+
+    def setup_image(self, path: str, source_size: tuple[int, int], prepared_display: Optional[Image.Image] = None) -> None:
+        """
+        Applies sidecar state, orientation, crop rectangle and controls for an image
+        and shows it, from original_img or (while it decodes) from preview_img.
+        """
+        self.current_image_path = path
+
+        if self.text_overlay is not None:
+            self.text_overlay.reset_for_new_image(self.current_image_path)
+
+        # Load saved preferences BEFORE setting up the image
+        pref_loaded = self.load_image_preferences_or_defaults(self.current_image_path)
+
+        self.canvas.delete("image_layer")
+        self.image_id = None
+        self.source_size = source_size
+        self.deep_zoom = 1.0
+        self.view_center = None
+        self.viewport_renderer.clear()
+        self.filter_stage.clear()
+        self._draft_source = self._draft_proxy = None
 
         if self.image_preferences.get("orientation") not in available_option["ORIENTATION"]:
             self.image_preferences["orientation"] = self.app_settings["orientation"]
@@ -394,10 +682,9 @@ class CropperApp:
 
         if not self.image_sidecar_has_orientation:
             inferred_orientation = None
-            if self.original_img is not None:
-                iw, ih = self.original_img.size
-                if iw > 0 and ih > 0:
-                    inferred_orientation = "portrait" if ih > iw else "landscape"
+            iw, ih = self.source_size
+            if iw > 0 and ih > 0:
+                inferred_orientation = "portrait" if ih > iw else "landscape"
 
             self.image_preferences["orientation"] = (
                 inferred_orientation
@@ -409,12 +696,24 @@ class CropperApp:
         # Update target_size and ratio after final orientation has been resolved.
         self.update_targetsize_and_ratio()
 
-        self.resize_image_and_center_in_window()
+        self.resize_image_and_center_in_window(prepared_display)
+        self.image_stats = self.get_image_stats()
 
         # restore state if exists; otherwise initial pane
         if not pref_loaded or not self.apply_saved_state():
             self.init_crop_rectangle()
 
+        self.update_image_counter()
+
+        self.create_image_enhancer_sliders() # create image options sliders
+        self.create_image_enhancer_checkboxes()
+        self.create_app_settings_checkboxes()
+
+        self.update_image_in_canvas()
+        self.update_status_label()
+        self.draw_crop_marker_grid()
+
+    def update_image_counter(self) -> None:
         total_img = len(self.image_paths)
         if self.gallery is not None and self.gallery.filtered_count() < total_img:
             filtered_pos = (self.gallery._filtered_pos_by_source.get(self.img_idx) or 0) + 1
@@ -425,22 +724,99 @@ class CropperApp:
         counter_length = max(4, 3 * len(str(count_img)))
         self.status_count.config(text=f"[{filtered_pos}/{count_img}]", width=counter_length)
 
-        self.create_image_enhancer_sliders() # create image options sliders
-        self.create_image_enhancer_checkboxes()
-        self.create_app_settings_checkboxes()
-
-        self.update_image_in_canvas()
-        self.update_status_label()
-        self.draw_crop_marker_grid()
+    def prefetch_neighbours(self) -> None:
+        """
+        Warms the decoded-image cache with the next and previous PREFETCH_NEIGHBOURS
+        images in gallery filter order, nearest first, while the loader is idle.
+        """
+        if self.original_img is None or self.image_loader.is_pending() or len(self.image_paths) < 2:
+            return
 
-    def load_image_by_exiforient(self, path: str):
+        forward: list[int] = []
+        backward: list[int] = []
+        next_idx = prev_idx = self.img_idx
+        for _ in range(PREFETCH_NEIGHBOURS):
+            if self.gallery is not None:
+                next_idx = self.gallery.next_filtered_index(next_idx) if next_idx is not None else None
+                prev_idx = self.gallery.prev_filtered_index(prev_idx) if prev_idx is not None else None
+            else:
+                next_idx = next_idx + 1 if next_idx is not None and next_idx + 1 < len(self.image_paths) else None
+                prev_idx = prev_idx - 1 if prev_idx is not None and prev_idx - 1 >= 0 else None
+            if next_idx is not None:
+                forward.append(next_idx)
+            if prev_idx is not None:
+                backward.append(prev_idx)
+
+        order: list[int] = []
+        for step in range(PREFETCH_NEIGHBOURS):
+            for neighbours in (forward, backward):
+                if step < len(neighbours) and neighbours[step] != self.img_idx and neighbours[step] not in order:
+                    order.append(neighbours[step])
+
+        prefetch_paths = [self.image_paths[i] for i in order]
+        self.image_service.set_wanted([self.current_image_path] + prefetch_paths)
+        self.image_loader.prefetch(prefetch_paths, self.canvas_size(), self.app_settings["canvas_zoom"])
+
+    def load_image_by_exiforient(
+        self,
+        path: str,
+        display_size_for: Optional[Callable[[tuple[int, int]], tuple[int, int]]] = None,
+    ) -> tuple[Image.Image, tuple[int, int]]:
         """
         Loads an image and applies EXIF orientation correction (auto-rotate).
-        Returns an RGB image with correct orientation.
+        Returns an RGB image with correct orientation and the oriented source size.
+
+        Sources above the large_image_memory_mb setting are returned as a bounded
+        proxy (large-image mode); on_confirm then decodes only the crop region.
+        With display_size_for, JPEGs are decoded as a draft covering the display
+        only, and are treated like a proxy on export as well.
+        The decode is shared with the gallery through the image service.
+        """
+        return self.image_service.load_for_display(path, display_size_for)
+
+    def get_image_stats(self) -> Optional[dict[str, Any]]:
+        """
+        Histogram statistics of the current image, from the metadata cache or
+        computed once from the (already downscaled) display image.
         """
-        with Image.open(path) as image:
-            transposed = ImageOps.exif_transpose(image)
-            return transposed.convert("RGB")
+        if self.metadata_cache is not None:
+            cached = self.metadata_cache.get(self.current_image_path, "levels")
+            if cached is not None:
+                return cached
+
+        if self.display_img is None:
+            return None
+
+        stats = compute_image_stats(self.display_img)
+        if self.metadata_cache is not None:
+            self.metadata_cache.set(self.current_image_path, "levels", stats)
+        return stats
+
+    def get_crop_suggestion(self) -> Optional[tuple[float, float]]:
+        """
+        Suggested crop centre (fractions of the image size) for the current ratio.
+        The saliency grid comes from the metadata cache, where the gallery stores it
+        while building thumbnails, or is computed once from the display image.
+        """
+        saliency = None
+        if self.metadata_cache is not None:
+            saliency = self.metadata_cache.get(self.current_image_path, "saliency")
+
+        if saliency is None and self.display_img is not None:
+            saliency = compute_saliency_grid(self.display_img)
+            if self.metadata_cache is not None:
+                self.metadata_cache.set(self.current_image_path, "saliency", saliency)
+
+        if saliency is None:
+            return None
+
+        iw, ih = self.source_size
+        image_aspect = iw / ih if iw > 0 and ih > 0 else None
+        return suggest_crop_center(saliency, self.ratio, DEFAULT_CROP_SIZE, image_aspect)
+
+    def is_large_image_mode(self) -> bool:
+        """True if original_img is smaller than the source (proxy or draft): export decodes the crop region from the file."""
+        return self.original_img is not None and self.original_img.size != self.source_size
 
     # ---------- UI helpers ----------
     def set_theme(self):
@@ -646,6 +1022,7 @@ class CropperApp:
                 slider.bind("<MouseWheel>", lambda e, n=name, r=resolution: self._on_slider_scroll(e, n, r))
                 slider.bind("<Button-4>",   lambda e, n=name, r=resolution: self._on_slider_scroll_linux(e, n, r,  1))
                 slider.bind("<Button-5>",   lambda e, n=name, r=resolution: self._on_slider_scroll_linux(e, n, r, -1))
+                slider.bind("<ButtonRelease-1>", self.finish_slider_update)
 
                 # Bind hover tooltip events if enter_tip exists
                 if "enter_tip" in info:
@@ -653,6 +1030,33 @@ class CropperApp:
 
                 bind_toggle_keys(self.window, info)
 
+            auto_levels_btn = ttk.Button(
+                self.options_frame,
+                text="Auto levels",
+                takefocus=0,
+                command=self.apply_auto_levels,
+            )
+            auto_levels_btn.pack(fill=tk.X, padx=LABEL_PADDINGS[0], pady=(LABEL_PADDINGS[1], 0))
+            Hovertip(auto_levels_btn, "Set brightness, contrast and saturation\nfrom the image histogram (Ctrl+Shift+A)", hover_delay=DEFAULT_TOOLTIP_DELAY)
+
+            auto_tune_btn = ttk.Button(
+                self.options_frame,
+                text="Auto tune",
+                takefocus=0,
+                command=self.apply_auto_tune,
+            )
+            auto_tune_btn.pack(fill=tk.X, padx=LABEL_PADDINGS[0], pady=(LABEL_PADDINGS[1], 0))
+            Hovertip(auto_tune_btn, "Set brightness, contrast and saturation so the\ndithered device output stays closest to the crop (Ctrl+Shift+E)", hover_delay=DEFAULT_TOOLTIP_DELAY)
+
+            variants_btn = ttk.Button(
+                self.options_frame,
+                text="Compare variants",
+                takefocus=0,
+                command=self.show_variant_grid,
+            )
+            variants_btn.pack(fill=tk.X, padx=LABEL_PADDINGS[0], pady=(LABEL_PADDINGS[1], 0))
+            Hovertip(variants_btn, "Show the device output for other devices, fill modes\nand enhancer presets side by side; click one to use it (Ctrl+Shift+V)", hover_delay=DEFAULT_TOOLTIP_DELAY)
+
         # AFTER all sliders exist → update their labels correctly
         for name, slider in self.image_enhancer_sliders.items():
             value = self.image_preferences[name]
@@ -704,6 +1108,55 @@ class CropperApp:
 
         return True
 
+    def apply_auto_levels(self, _e=None) -> None:
+        """Set the enhancer sliders from the cached histogram statistics of the image."""
+        if self.image_stats is None or not self.image_enhancer_sliders:
+            return
+
+        values = auto_levels_from_stats(self.image_stats, self.get_device_enhancer_defaults())
+        for slider_name, value in values.items():
+            self.image_preferences[slider_name] = value
+            if slider_name in self.image_enhancer_sliders:
+                self.image_enhancer_sliders[slider_name][1].set(value)
+            self.update_slider_label(slider_name)
+
+        self.window.after_idle(self.update_image_in_canvas)
+
+    def apply_auto_tune(self, _e=None) -> None:
+        """
+        Set the enhancer sliders to the values whose dithered device rendering of the
+        current crop stays closest to the crop itself. Runs on a small proxy rendered
+        from the display image, so it takes a fraction of a second.
+        """
+        if self.original_img is None or self.display_img is None or not self.image_enhancer_sliders:
+            return
+
+        x1i, y1i, x2i, y2i = self.rect_in_image_coords_raw()
+        if x2i - x1i <= 1 or y2i - y1i <= 1:
+            return
+
+        proxy = self.render_filled_crop((x1i, y1i, x2i, y2i), autotune_proxy_size(self.target_size), preview_source=self.display_img)
+
+        # start from auto levels: usually close, so the search converges within the budget
+        if self.image_stats is not None:
+            start_values = auto_levels_from_stats(self.image_stats, self.get_device_enhancer_defaults())
+        else:
+            start_values = {name: float(self.image_preferences[name]) for name in ("brightness", "contrast", "saturation")}
+
+        try:
+            values = autotune_enhancer_values(proxy, self.image_preferences["target_device"], self.image_preferences, start_values)
+        except KeyError:
+            print(f"[WARN] Auto tune: unknown target device {self.image_preferences['target_device']}")
+            return
+
+        for slider_name, value in values.items():
+            self.image_preferences[slider_name] = value
+            if slider_name in self.image_enhancer_sliders:
+                self.image_enhancer_sliders[slider_name][1].set(value)
+            self.update_slider_label(slider_name)
+
+        self.window.after_idle(self.update_image_in_canvas)
+
     def reset_enhancer_slider(self, slider_name: str) -> None:
         if slider_name not in self.image_enhancer_sliders:
             return
@@ -730,15 +1183,48 @@ class CropperApp:
         return "break"
 
     def schedule_slider_update(self, slider_label, value) -> None:
+        """
+        While a slider moves the preview is a draft (see enhance_draft); the debounce
+        follows the measured draft render time, so updates never pile up. The full
+        quality render follows on release or after SLIDER_SETTLE_MS without moves.
+        """
+        self._slider_pending_value = (slider_label, value)
         if self._slider_update_pending:
             self.window.after_cancel(self._slider_update_pending)
-        self._slider_update_pending = self.window.after(20, lambda: self.update_slider_value_and_label(slider_label, value))
+        debounce_ms = int(min(SLIDER_DEBOUNCE_MAX_MS, max(SLIDER_DEBOUNCE_MIN_MS, self._draft_render_ms)))
+        self._slider_update_pending = self.window.after(debounce_ms, self.apply_pending_slider_update)
+
+        if self._slider_settle_id is not None:
+            self.window.after_cancel(self._slider_settle_id)
+        self._slider_settle_id = self.window.after(SLIDER_SETTLE_MS, self.finish_slider_update)
 
-    def update_slider_value_and_label(self, slider_label, value) -> None:
+    def apply_pending_slider_update(self, draft: bool = True) -> None:
+        self._slider_update_pending = None
+        if self._slider_pending_value is None:
+            return
+        slider_label, value = self._slider_pending_value
+        self._slider_pending_value = None
+        self.update_slider_value_and_label(slider_label, value, draft)
+
+    def finish_slider_update(self, _e=None) -> None:
+        """Full quality render of the latest slider value (slider released or left alone)."""
+        if self._slider_settle_id is not None:
+            self.window.after_cancel(self._slider_settle_id)
+            self._slider_settle_id = None
+        if self._slider_update_pending:
+            self.window.after_cancel(self._slider_update_pending)
+            self._slider_update_pending = None
+
+        if self._slider_pending_value is not None:
+            self.apply_pending_slider_update(draft=False)
+        elif self._draft_shown:
+            self.window.after_idle(self.update_image_in_canvas)
+
+    def update_slider_value_and_label(self, slider_label, value, draft: bool = False) -> None:
         if slider_label in self.enhancer_sliders_def:
             self.image_preferences[slider_label] = float(value)
             self.update_slider_label(slider_label)
-            self.window.after_idle(self.update_image_in_canvas)
+            self.window.after_idle(lambda: self.update_image_in_canvas(draft))
         else:
             print(f"No slider found for '{slider_label}'")
 
@@ -833,6 +1319,8 @@ class CropperApp:
 
             if name == "save_canvas_zoom":
                 pass  # canvas_zoom is already live in self.app_settings["canvas_zoom"]
+            elif name == "device_preview":
+                self.update_device_preview_window()
             
             self.window.after_idle(self.update_image_in_canvas)
         else:
@@ -844,7 +1332,9 @@ class CropperApp:
         else:
             if self.original_img is None:
                 return
-            source_dims = f"{self.original_img.size[0]}x{self.original_img.size[1]}"
+            source_dims = f"{self.source_size[0]}x{self.source_size[1]}"
+            if self.is_large_image_mode():
+                source_dims += " (proxy)"
             target_size = f"{self.target_size[0]}x{self.target_size[1]}"
             source_file_size = f"{'{:,}'.format(self.original_img_file_size >> 10).replace(',','.')} kB"
             self.status_label.config(text=f"{self.current_image_path} | {source_dims} => {target_size} | {source_file_size}")
@@ -854,35 +1344,146 @@ class CropperApp:
         # Return REAL canvas size (never force minimum)
         return (self.canvas.winfo_width(), self.canvas.winfo_height())
 
-    def resize_image_and_center_in_window(self) -> None:
-        assert self.original_img is not None
+    def resize_image_and_center_in_window(self, prepared_display: Optional[Image.Image] = None, fast: bool = False) -> None:
+        """
+        :param prepared_display: display image resized by the image loader; used if
+            the canvas still has the size it was prepared for
+        :param fast: resample with BILINEAR (continuous resize/zoom); the caller
+            schedules refine_display_image() for the LANCZOS version
+        """
         cw, ch = self.canvas_size()
-        iw, ih = self.original_img.size
-        fit_scale = min(cw / iw, ch / ih)
-        self.scale = fit_scale * self.app_settings["canvas_zoom"]
-        disp_w = max(1, int(iw * self.scale))
-        disp_h = max(1, int(ih * self.scale))
+        self.scale, (disp_w, disp_h) = fit_display_size(self.source_size, (cw, ch), self.app_settings["canvas_zoom"])
         self.disp_size = (disp_w, disp_h)
-        self.display_img = self.original_img.resize((disp_w, disp_h), Image.Resampling.LANCZOS)
+        self.filter_stage.clear()
+        self.display_is_draft = False
+        if prepared_display is not None and prepared_display.size == self.disp_size:
+            self.display_img = prepared_display
+        elif self.original_img is not None:
+            entry = self.image_cache.get(self.current_image_path)
+            if entry is not None and entry.image is not self.original_img:
+                entry = None
+
+            if entry is not None and self.disp_size in entry.views:
+                self.display_img = entry.views[self.disp_size]
+            elif entry is not None:
+                # resample from the nearest larger pyramid level instead of the full source
+                source = self.image_cache.pyramid_level(self.current_image_path, entry, self.disp_size)
+                if fast:
+                    self.display_img = source.resize(self.disp_size, Image.Resampling.BILINEAR)
+                    self.display_is_draft = True
+                else:
+                    self.display_img = source.resize(self.disp_size, Image.Resampling.LANCZOS)
+                    self.image_cache.add_view(self.current_image_path, entry, self.display_img)
+            else:
+                resample = Image.Resampling.BILINEAR if fast else Image.Resampling.LANCZOS
+                self.display_img = self.original_img.resize(self.disp_size, resample)
+                self.display_is_draft = fast
+        else:
+            # preview while decoding: the thumbnail upscaled, cheap filter
+            assert self.preview_img is not None
+            self.display_img = self.preview_img.resize((disp_w, disp_h), Image.Resampling.BILINEAR)
         self.img_off = ((cw - disp_w) // 2, (ch - disp_h) // 2)
 
-    def update_image_in_canvas(self) -> None:
-        """Apply all enhancements and update the image display."""
-        # Initial image
-        img = self.enhance_image(self.display_img)
-        self.tk_img = ImageTk.PhotoImage(img)
+        if self.deep_zoom > 1.0:
+            self.update_deep_zoom_geometry()
+
+    def update_deep_zoom_geometry(self) -> None:
+        """
+        Scale, virtual display size and offset while deep zoomed. display_img stays
+        the whole image at the fit scale (stats, auto tune); the canvas shows only the
+        viewport around view_center, which is kept inside the image.
+        """
+        cw, ch = self.canvas_size()
+        iw, ih = self.source_size
+        fit_scale, _ = fit_display_size(self.source_size, (cw, ch), self.app_settings["canvas_zoom"])
+        self.scale = fit_scale * self.deep_zoom
+        self.disp_size = (max(1, int(iw * self.scale)), max(1, int(ih * self.scale)))
+
+        if self.view_center is None:
+            x1i, y1i, x2i, y2i = self.rect_in_image_coords_raw()
+            self.view_center = ((x1i + x2i) / 2, (y1i + y2i) / 2)
+
+        # an axis that fits into the canvas is centred, otherwise the viewport may not leave the image
+        half_w, half_h = cw / 2 / self.scale, ch / 2 / self.scale
+        vx, vy = self.view_center
+        vx = iw / 2 if 2 * half_w >= iw else min(max(vx, half_w), iw - half_w)
+        vy = ih / 2 if 2 * half_h >= ih else min(max(vy, half_h), ih - half_h)
+        self.view_center = (vx, vy)
+        self.img_off = (int(round(cw / 2 - vx * self.scale)), int(round(ch / 2 - vy * self.scale)))
+
+    def refine_display_image(self) -> None:
+        """Redoes a fast (BILINEAR) display image with LANCZOS once resize/zoom has settled."""
+        self._display_refine_id = None
+        if self.original_img is None or not self.display_is_draft:
+            return
+
+        self.resize_image_and_center_in_window()
+        self.update_image_in_canvas()
+
+    def update_image_in_canvas(self, draft: bool = False) -> None:
+        """
+        Apply all enhancements and update the image display.
+
+        :param draft: enhance a reduced copy (slider moving), see enhance_draft()
+        """
+        if self.display_img is None:
+            return
+        started = time.perf_counter()
+        pos = self.img_off
+        reference = None
+        base = self.display_img
+        if self.deep_zoom > 1.0 and self.original_img is not None:
+            # only the visible part, resampled tile by tile from the source
+            entry = self.image_cache.get(self.current_image_path)
+            if entry is not None and entry.image is self.original_img:
+                source = self.image_cache.pyramid_level(self.current_image_path, entry, self.disp_size)
+            else:
+                source = self.original_img
+            viewport = self.viewport_renderer.render(
+                (self.current_image_path, source.size), source, self.disp_size, self.img_off, self.canvas_size()
+            )
+            if viewport is None:
+                return
+            # contrast blends towards the mean of the whole image, not of the viewport
+            base, pos = viewport
+            reference = self.display_img
+
+        img = self.enhance_draft(base, reference) if draft else self.enhance_image(base, reference)
+        if self.tk_img is not None and (self.tk_img.width(), self.tk_img.height()) == img.size:
+            # same size: update the Tk image in place instead of allocating a new one
+            self.tk_img.paste(img)
+        else:
+            self.tk_img = ImageTk.PhotoImage(img)
+        self.image_pos = pos
+
+        shown_img = self.tk_img
+        image_mask = self.app_settings["mask_renderer"] == "image"
+        if image_mask:
+            # the canvas shows a darkened copy; update_crop_window() puts the bright crop on top
+            dark = img.point(MASK_DIM_LUT * len(img.getbands()))
+            if self.tk_img_dark is not None and (self.tk_img_dark.width(), self.tk_img_dark.height()) == dark.size:
+                self.tk_img_dark.paste(dark)
+            else:
+                self.tk_img_dark = ImageTk.PhotoImage(dark)
+            shown_img = self.tk_img_dark
 
         # Draw or update image on canvas
         if self.image_id is None:
-            self.image_id = self.canvas.create_image(self.img_off[0], self.img_off[1], anchor="nw", image=self.tk_img, tags="image_layer")
+            self.image_id = self.canvas.create_image(pos[0], pos[1], anchor="nw", image=shown_img, tags="image_layer")
             self.canvas.tag_lower("image_layer")
             #print("UPDATE CREATE")
         else: # Update the existing canvas
-            self.canvas.itemconfig(self.image_id, image=self.tk_img)#, tags="image_layer")
-            self.canvas.coords(self.image_id, self.img_off[0], self.img_off[1])
+            self.canvas.itemconfig(self.image_id, image=shown_img)#, tags="image_layer")
+            self.canvas.coords(self.image_id, pos[0], pos[1])
             #print("UPDATE ITEMCONFIG")
+        if image_mask:
+            self.update_crop_window()
 
-        self._slider_update_pending = None
+        self.schedule_device_preview()
+        self._draft_shown = draft
+        if draft:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._draft_render_ms = 0.7 * self._draft_render_ms + 0.3 * elapsed_ms
 
     def init_crop_rectangle(self) -> None:
         """
@@ -897,8 +1498,17 @@ class CropperApp:
             rw = int(rh * self.ratio)
 
         self.rect_w, self.rect_h = max(20, rw), max(20, rh)
-        cx = self.img_off[0] + dw // 2
-        cy = self.img_off[1] + dh // 2
+
+        # place the rectangle on the most salient area, centred if there is no suggestion
+        center = self.get_crop_suggestion()
+        fx, fy = center if center is not None else (0.5, 0.5)
+        cx = self.img_off[0] + int(round(dw * fx))
+        cy = self.img_off[1] + int(round(dh * fy))
+        # a suggestion never moves a rectangle that fits the photo past its edges
+        if self.rect_w <= dw:
+            cx = min(max(cx, self.img_off[0] + self.rect_w // 2), self.img_off[0] + dw - self.rect_w // 2)
+        if self.rect_h <= dh:
+            cy = min(max(cy, self.img_off[1] + self.rect_h // 2), self.img_off[1] + dh - self.rect_h // 2)
         self.rect_center = (cx, cy)
         self.clamp_crop_rectangle_to_canvas()
         self.sync_rect_image_coords_from_display()
@@ -923,6 +1533,9 @@ class CropperApp:
 
     def clamp_crop_rectangle_to_canvas(self) -> None:
         # Keep the rectangle within the edges of the canvas (it can go outside the PHOTO)
+        if self.deep_zoom > 1.0:
+            return # zoomed in, the rectangle may be larger than the canvas or panned out of view
+
         x1, y1, x2, y2 = self.rect_coords()
         cw, ch = self.canvas_size()
         dx = dy = 0
@@ -939,12 +1552,76 @@ class CropperApp:
         self.rect_h = int(self.rect_w / self.ratio)
 
     # create crop marker
+    def schedule_redraw(self, image: bool = False) -> None:
+        """
+        Redraws the crop overlay (and with image=True the image) once the pending
+        input events are handled, so a burst of drag, key repeat or wheel events
+        costs one redraw instead of one per event.
+        """
+        self._redraw_image = self._redraw_image or image
+        if self._redraw_pending is None:
+            self._redraw_pending = self.window.after_idle(self._redraw)
+
+    def _redraw(self) -> None:
+        self._redraw_pending = None
+        if self._redraw_image:
+            self._redraw_image = False
+            self.update_image_in_canvas()
+        self.draw_crop_marker_grid()
+
+    def create_crop_marker_items(self) -> list[int]:
+        """Creates the crop overlay items (positions are set by draw_crop_marker_grid)."""
+        self.canvas.delete("crop_layer")
+        grid_color = self.app_settings["grid_color"]
+        dash_pat = (3, 3)
+        if self.crop_window_tk is None:
+            self.crop_window_tk = tk.PhotoImage(master=self.canvas)
+        window = self.canvas.create_image(0, 0, anchor="nw", image=self.crop_window_tk, tags=("crop_layer", "crop_window"))
+        # right above the image
+        self.canvas.tag_lower("crop_window")
+        self.canvas.tag_lower("image_layer")
+        masks = [
+            self.canvas.create_rectangle(0, 0, 0, 0, fill=MASK_COLOR, stipple=MASK_STIPPLE, width=0, tags=("crop_layer", "crop_mask"))
+            for _ in range(4)
+        ]
+        edge = self.canvas.create_rectangle(0, 0, 0, 0, outline=grid_color, width=1, tags=("crop_layer",))
+        lines = [
+            self.canvas.create_line(0, 0, 0, 0, fill=grid_color, dash=dash_pat, width=1, capstyle="butt", joinstyle="miter", tags=("crop_layer",))
+            for _ in range(4)
+        ]
+        return [window] + masks + [edge] + lines
+
+    def update_crop_window(self) -> None:
+        """
+        "image" mask renderer: copies the part of the bright image inside the crop
+        rectangle into the crop window item, over the darkened image. The copy is a
+        Tk photo-to-photo blit, so a drag never converts pixels from PIL.
+        """
+        if not self.crop_item_ids or self.tk_img is None or self.crop_window_tk is None:
+            return
+
+        x1, y1, x2, y2 = (int(round(v)) for v in self.rect_coords())
+        px, py = self.image_pos
+        # crop rectangle clipped to the image, in image pixels
+        ix1, iy1 = max(0, x1 - px), max(0, y1 - py)
+        ix2, iy2 = min(self.tk_img.width(), x2 - px), min(self.tk_img.height(), y2 - py)
+
+        window = self.crop_item_ids[0]
+        if ix2 <= ix1 or iy2 <= iy1:
+            self.crop_window_tk.blank()
+            return
+
+        self.canvas.tk.call(str(self.crop_window_tk), "copy", str(self.tk_img), "-from", ix1, iy1, ix2, iy2, "-to", 0, 0, "-shrink")
+        self.canvas.coords(window, px + ix1, py + iy1)
+
     def draw_crop_marker_grid(self) -> None:
         # snap to have straight lines (no sub-pixels)
         def snap(v): return int(round(v))
 
-        # clear the crop overlay layer
-        self.canvas.delete("crop_layer")
+        # the items are created once; later calls only move them
+        if not self.crop_item_ids or not self.canvas.type(self.crop_item_ids[0]):
+            self.crop_item_ids = self.create_crop_marker_items()
+        _, mask_top, mask_bottom, mask_left, mask_right, edge, grid_v1, grid_v2, grid_h1, grid_h2 = self.crop_item_ids
 
         # crop rectangle
         x1f, y1f, x2f, y2f = self.rect_coords()
@@ -954,34 +1631,41 @@ class CropperApp:
         y2: int = snap(y2f)
 
         # off-crop mask
-        cw, ch = self.canvas_size()
-        self.canvas.create_rectangle(0, 0, cw, y1, fill=MASK_COLOR, stipple=MASK_STIPPLE, width=0, tags=("crop_layer",))
-        self.canvas.create_rectangle(0, y2, cw, ch, fill=MASK_COLOR, stipple=MASK_STIPPLE, width=0, tags=("crop_layer",))
-        self.canvas.create_rectangle(0, y1, x1, y2, fill=MASK_COLOR, stipple=MASK_STIPPLE, width=0, tags=("crop_layer",))
-        self.canvas.create_rectangle(x2, y1, cw, y2, fill=MASK_COLOR, stipple=MASK_STIPPLE, width=0, tags=("crop_layer",))
+        image_mask = self.app_settings["mask_renderer"] == "image"
+        if image_mask:
+            self.update_crop_window()
+        else:
+            cw, ch = self.canvas_size()
+            self.canvas.coords(mask_top, 0, 0, cw, y1)
+            self.canvas.coords(mask_bottom, 0, y2, cw, ch)
+            self.canvas.coords(mask_left, 0, y1, x1, y2)
+            self.canvas.coords(mask_right, x2, y1, cw, y2)
 
         # crop edge
-        self.canvas.create_rectangle(x1, y1, x2, y2, outline=self.app_settings["grid_color"], width=1, tags=("crop_layer",))
+        self.canvas.coords(edge, x1, y1, x2, y2)
 
         # grid (thirds) with straight lines
         v1 = snap(x1 + (x2 - x1) / 3.0)
         v2 = snap(x1 + 2 * (x2 - x1) / 3.0)
         h1 = snap(y1 + (y2 - y1) / 3.0)
         h2 = snap(y1 + 2 * (y2 - y1) / 3.0)
-        dash_pat = (3, 3)
-        self.canvas.create_line(v1, y1, v1, y2, fill=self.app_settings["grid_color"], dash=dash_pat, width=1, capstyle="butt", joinstyle="miter", tags=("crop_layer",))
-        self.canvas.create_line(v2, y1, v2, y2, fill=self.app_settings["grid_color"], dash=dash_pat, width=1, capstyle="butt", joinstyle="miter", tags=("crop_layer",))
-        self.canvas.create_line(x1, h1, x2, h1, fill=self.app_settings["grid_color"], dash=dash_pat, width=1, capstyle="butt", joinstyle="miter", tags=("crop_layer",))
-        self.canvas.create_line(x1, h2, x2, h2, fill=self.app_settings["grid_color"], dash=dash_pat, width=1, capstyle="butt", joinstyle="miter", tags=("crop_layer",))
+        self.canvas.coords(grid_v1, v1, y1, v1, y2)
+        self.canvas.coords(grid_v2, v2, y1, v2, y2)
+        self.canvas.coords(grid_h1, x1, h1, x2, h1)
+        self.canvas.coords(grid_h2, x1, h2, x2, h2)
+        self.canvas.itemconfigure("crop_layer", state="normal")
+        self.canvas.itemconfigure("crop_mask" if image_mask else "crop_window", state="hidden")
 
         # update text overlay when crop marker grid changes
         self.update_text_overlay()
+        self.schedule_device_preview()
 
     def callback_text_overlay(self, state = None):
         if state is not None:
             # print("Overlay state changed:", state)
             self.image_preferences["text_overlay"] = state
             self.update_text_overlay()
+            self.schedule_device_preview()
 
     def update_text_overlay(self):
         # set new data for text_overlay
@@ -1024,7 +1708,7 @@ class CropperApp:
         self.rect_center = (e.x - self.drag_offset[0], e.y - self.drag_offset[1])
         self.clamp_crop_rectangle_to_canvas()
         self.sync_rect_image_coords_from_display()
-        self.draw_crop_marker_grid()
+        self.schedule_redraw()
 
     def on_release(self, _e) -> None:
         self.dragging = False
@@ -1036,7 +1720,7 @@ class CropperApp:
         # Ctrl+wheel zooms the canvas image while keeping crop coordinates stable.
         # Ctrl+Shift remains reserved for precision crop resizing.
         if ctrl_pressed and not shift_pressed:
-            self.zoom_canvas_with_wheel(1 if e.delta > 0 else -1)
+            self.zoom_canvas_with_wheel(1 if e.delta > 0 else -1, (e.x, e.y))
             return
 
         self.resize_rect_mouse(1 if e.delta > 0 else -1, e.state)
@@ -1046,13 +1730,22 @@ class CropperApp:
         ctrl_pressed = bool(e.state & 0x0004)
 
         if ctrl_pressed and not shift_pressed:
-            self.zoom_canvas_with_wheel(1 if e.num == 4 else -1)
+            self.zoom_canvas_with_wheel(1 if e.num == 4 else -1, (e.x, e.y))
             return
 
         self.resize_rect_mouse(1 if e.num == 4 else -1, e.state)
 
-    def zoom_canvas_with_wheel(self, direction: int) -> None:
-        if self.original_img is None:
+    def zoom_canvas_with_wheel(self, direction: int, anchor: Optional[tuple[int, int]] = None) -> None:
+        if self.original_img is None and self.preview_img is None:
+            return
+
+        # beyond the fit scale: deep zoom (needs the decoded image, not the preview)
+        if self.original_img is not None and (self.deep_zoom > 1.0 or (direction > 0 and self.app_settings["canvas_zoom"] >= 1.0)):
+            if self._zoom_pending is not None:
+                # deep zoom works from the current geometry: apply the pending zoom first
+                self.window.after_cancel(self._zoom_pending)
+                self._apply_zoom()
+            self.zoom_deep(direction, anchor)
             return
 
         if direction > 0:
@@ -1064,7 +1757,67 @@ class CropperApp:
             return
 
         self.app_settings["canvas_zoom"] = round(new_zoom, 4)
-        self._apply_window_resize()
+        # wheel bursts: one resize for all steps handled before the next idle
+        if self._zoom_pending is None:
+            self._zoom_pending = self.window.after_idle(self._apply_zoom)
+
+    def _apply_zoom(self) -> None:
+        self._zoom_pending = None
+        self._apply_window_resize(fast=True)
+
+    def zoom_deep(self, direction: int, anchor: Optional[tuple[int, int]] = None) -> None:
+        """
+        Zooms beyond the fit scale, keeping the image point under anchor (canvas
+        coordinates, default: canvas centre) in place. The crop rectangle keeps its
+        exact image space coordinates.
+        """
+        if direction > 0:
+            new_zoom = min(DEEP_ZOOM_MAX, self.deep_zoom * CANVAS_ZOOM_STEP)
+        else:
+            new_zoom = self.deep_zoom / CANVAS_ZOOM_STEP
+        if new_zoom < 1.0 + 1e-3:
+            new_zoom = 1.0
+
+        if abs(new_zoom - self.deep_zoom) < 1e-9:
+            return
+
+        cw, ch = self.canvas_size()
+        ax, ay = anchor if anchor is not None else (cw // 2, ch // 2)
+        px = (ax - self.img_off[0]) / self.scale
+        py = (ay - self.img_off[1]) / self.scale
+        new_scale = self.scale / self.deep_zoom * new_zoom
+
+        self.deep_zoom = new_zoom
+        if new_zoom == 1.0:
+            self.view_center = None
+            self.viewport_renderer.clear()
+            self._apply_window_resize()
+            return
+
+        self.view_center = (px + (cw / 2 - ax) / new_scale, py + (ch / 2 - ay) / new_scale)
+        self.apply_view_change()
+        self.request_more_detail()
+
+    def apply_view_change(self) -> None:
+        """Updates the geometry after deep zoom or panning; image and crop rectangle are redrawn when idle."""
+        x1i, y1i, x2i, y2i = self.rect_in_image_coords_raw()
+        self.update_deep_zoom_geometry()
+        self.calculate_display_coordiantes(x1i, y1i, x2i, y2i)
+        self.schedule_redraw(image=True)
+
+    def on_pan_start(self, e) -> None:
+        if self.deep_zoom <= 1.0 or self.view_center is None:
+            self._pan_anchor = None
+            return
+        self._pan_anchor = (e.x, e.y, self.view_center)
+
+    def on_pan(self, e) -> None:
+        if self._pan_anchor is None or self.deep_zoom <= 1.0:
+            return
+
+        x0, y0, (vx, vy) = self._pan_anchor
+        self.view_center = (vx - (e.x - x0) / self.scale, vy - (e.y - y0) / self.scale)
+        self.apply_view_change()
 
     def resize_factor_from_state(self, state: int, direction: int) -> float:
         shift_pressed = bool(state & 0x0001)
@@ -1095,7 +1848,7 @@ class CropperApp:
         self.rect_center = (self.rect_center[0] + dx*step, self.rect_center[1] + dy*step)
         self.clamp_crop_rectangle_to_canvas()
         self.sync_rect_image_coords_from_display()
-        self.draw_crop_marker_grid()
+        self.schedule_redraw()
 
     def show_help(self, _e=None) -> str:
         """Show a small help window with keyboard shortcuts."""
@@ -1139,7 +1892,8 @@ class CropperApp:
             "  Ctrl+A                Maximize and center\n"
             "\n"
             "Canvas\n"
-            "  Ctrl + Scroll         Canvas zoom in/out\n"
+            "  Ctrl + Scroll         Canvas zoom in/out (beyond 100%: deep zoom)\n"
+            "  Middle/Right drag     Pan while deep zoomed\n"
             "\n"
             "Actions\n"
             "  Enter / Ctrl+S        Crop, convert and load next image\n"
@@ -1147,6 +1901,10 @@ class CropperApp:
             "  Ctrl+F                Toggle fill mode\n"
             "  Ctrl+D                Toggle target device\n"
             "  Ctrl+1/2/3            Edge / Smooth / Sharpen\n"
+            "  Ctrl+Shift+A          Auto levels\n"
+            "  Ctrl+Shift+E          Auto tune for the device palette\n"
+            "  Ctrl+Shift+P          Toggle device preview\n"
+            "  Ctrl+Shift+V          Compare variants\n"
             "  Ctrl+Shift+L          Change folder\n"
             "  Ctrl+Shift+R          Reload folder\n"
             "\n"
@@ -1202,6 +1960,8 @@ class CropperApp:
 
     def apply_resize_factor(self, factor) -> None:
         cw, ch = self.canvas_size()
+        if self.deep_zoom > 1.0:
+            cw, ch = self.disp_size # zoomed in: limited by the image, not the canvas
         max_w = min(cw, int(ch * self.ratio))
         new_w = int(self.rect_w * factor)
         new_w = max(64, min(new_w, max_w))
@@ -1209,7 +1969,7 @@ class CropperApp:
         self.rect_h = int(self.rect_w / self.ratio)
         self.clamp_crop_rectangle_to_canvas()
         self.sync_rect_image_coords_from_display()
-        self.draw_crop_marker_grid()
+        self.schedule_redraw()
 
     def on_window_resize(self, event) -> None:
         """
@@ -1217,7 +1977,7 @@ class CropperApp:
         
         :param self: instance
         """
-        if self.original_img is None:
+        if self.original_img is None and self.preview_img is None:
             return
 
         if self._resize_pending:
@@ -1233,10 +1993,10 @@ class CropperApp:
                 self.app_settings["last_window_size"] = (int(self.width), int(self.height))
                 self.image_id = None
                 self.canvas.delete("image_layer")
-                self.window.after(30, self._apply_window_resize)
+                self.window.after(30, lambda: self._apply_window_resize(fast=True))
 
     def on_gallery_layout_change(self) -> None:
-        if self.original_img is None:
+        if self.original_img is None and self.preview_img is None:
             return
 
         # Apply synchronously after Tk has processed scrollbar geometry.
@@ -1244,25 +2004,33 @@ class CropperApp:
         self.width, self.height = self.window.winfo_width(), self.window.winfo_height()
         self._apply_window_resize()
 
-    def _apply_window_resize(self) -> None:
+    def _apply_window_resize(self, fast: bool = False) -> None:
         """
         Apply window resize
         
         :param self: instance
+        :param fast: continuous resize/zoom; use a fast filter and refine when it settles
         """
 
-        if self.original_img is None:
+        if self.original_img is None and self.preview_img is None:
             return
         
         #print("APPLY WINDOW RESIZE")
         rect_img_raw = self.rect_in_image_coords_raw()
-        self.resize_image_and_center_in_window()
+        self.resize_image_and_center_in_window(fast=fast)
         self.update_image_in_canvas()
         x1i, y1i, x2i, y2i = rect_img_raw
         self.calculate_display_coordiantes(x1i, y1i, x2i, y2i)
         self.clamp_crop_rectangle_to_canvas()
         self.draw_crop_marker_grid()
         self._resize_pending = False
+        self.request_more_detail()
+
+        if self._display_refine_id is not None:
+            self.window.after_cancel(self._display_refine_id)
+            self._display_refine_id = None
+        if self.display_is_draft:
+            self._display_refine_id = self.window.after(DISPLAY_REFINE_MS, self.refine_display_image)
 
     def calculate_display_coordiantes(self, x1i, y1i, x2i, y2i) -> tuple[int,  int, int, int]:
         self.rect_img_raw = (float(x1i), float(y1i), float(x2i), float(y2i))
@@ -1358,6 +2126,7 @@ class CropperApp:
 
         self.image_preferences["fill_mode"] = fill_mode
         self.update_button_text("fill_mode", self.image_preferences["fill_mode"])
+        self.schedule_device_preview()
 
     def set_fill_mode(self, field: str) -> None:
         self._set_option_from_field(field, self._apply_fill_mode)
@@ -1386,6 +2155,7 @@ class CropperApp:
         else:
             for slider_name in self.enhancer_sliders_def:
                 self.update_slider_label(slider_name)
+        self.schedule_device_preview()
 
     # ---------- Coordinate helpers ----------
     def update_targetsize_and_ratio(self) -> None:
@@ -1408,6 +2178,10 @@ class CropperApp:
 
     # ---------- Crop & Save ----------
     def on_confirm(self, _e=None) -> None:
+        # a pending decode with more detail is not needed: the export reads the crop from the file
+        if self.original_img is None or (self.image_loader.is_pending() and not self.detail_pending):
+            return
+
         # 1) raw coordinates (may go outside the borders)
         x1i, y1i, x2i, y2i = self.rect_in_image_coords_raw()
         if x2i <= x1i or y2i <= y1i:
@@ -1420,103 +2194,301 @@ class CropperApp:
             messagebox.showerror("Invalid selection", "Selection too small.")
             return
 
-        # 2) intersection with the original image
-        assert self.original_img is not None
-        iw, ih = self.original_img.size
-        ix1 = max(0, math.floor(x1i))
-        iy1 = max(0, math.floor(y1i))
-        ix2 = min(iw, math.ceil(x2i))
-        iy2 = min(ih, math.ceil(y2i))
+        # 2) - 7) snapshot the job; crop, fill, enhance, text and conversion run on the
+        # conversion worker while the next image is already shown
+        job = self.snapshot_conversion_job((x1i, y1i, x2i, y2i))
+        if self.gallery is not None:
+            self.gallery.set_conversion_failed(self.img_idx, False)
+        self.conversion_queue.submit(job)
+        self.update_conversion_status()
 
-        # 3) scala orig->target
-        sx = self.target_size[0] / sel_w_orig
-        sy = self.target_size[1] / sel_h_orig
+        # 8) save image preferences (txt) next to the source
+        self.save_image_preferences(x1i, y1i, x2i, y2i)
 
-        # 4) background base (white or blur) + paste sharp part if intersection exists
-        if ix2 <= ix1 or iy2 <= iy1:
-            out_img = self.background_only(None)
-        else:
-            int_w_orig = ix2 - ix1
-            int_h_orig = iy2 - iy1
-            int_w_tgt = max(1, int(round(int_w_orig * sx)))
-            int_h_tgt = max(1, int(round(int_h_orig * sy)))
-            region_scaled = self.original_img.crop((ix1, iy1, ix2, iy2)).resize((int_w_tgt, int_h_tgt), Image.Resampling.LANCZOS)
-            out_img = self.background_only(region_scaled)
+        # 9) next image
+        self.next_image()
 
-            dx_tgt = int(round((ix1 - x1i) * sx))
-            dy_tgt = int(round((iy1 - y1i) * sy))
+    def snapshot_conversion_job(self, rect: tuple[float, float, float, float]) -> ConversionJob:
+        """Everything the conversion (or the device preview) of the current image needs, frozen now."""
+        assert self.original_img is not None
+        assert self.text_overlay is not None
+        return ConversionJob(
+            source_path=self.current_image_path,
+            source_image=self.original_img,
+            source_size=self.source_size,
+            large_image=self.is_large_image_mode(),
+            memory_cap_bytes=self.image_service.memory_cap_bytes,
+            rect=rect,
+            target_size=self.target_size,
+            preferences=snapshot_mapping(self.image_preferences),
+            text_overlay=snapshot_mapping(self.text_overlay.snapshot_render_state()),
+            export_folder=self.export_folder_with_orientation(),
+            pic_folder_on_device=self.app_settings["pic_folder_on_device"],
+            dither_method=DITHER_METHOD,
+        )
 
-            src_x1 = max(0, -dx_tgt)
-            src_y1 = max(0, -dy_tgt)
-            dst_x1 = max(0, dx_tgt)
-            dst_y1 = max(0, dy_tgt)
+    # ---------- Device preview ----------
+    def schedule_device_preview(self) -> None:
+        """
+        Renders the device preview (and the variant grid, if open) once crop and
+        settings were left alone for DEVICE_PREVIEW_DEBOUNCE_MS.
+        """
+        if not self.app_settings["device_preview"] and not self.is_variant_grid_open():
+            return
+        if self._device_preview_id is not None:
+            self.window.after_cancel(self._device_preview_id)
+        self._device_preview_id = self.window.after(DEVICE_PREVIEW_DEBOUNCE_MS, self.request_device_preview)
 
-            width  = min(self.target_size[0] - dst_x1, region_scaled.width  - src_x1)
-            height = min(self.target_size[1] - dst_y1, region_scaled.height - src_y1)
+    def request_device_preview(self) -> None:
+        self._device_preview_id = None
+        if self.original_img is None or self.text_overlay is None:
+            return
 
-            if width > 0 and height > 0:
-                sub = region_scaled.crop((src_x1, src_y1, src_x1 + width, src_y1 + height))
-                out_img.paste(sub, (dst_x1, dst_y1))
+        x1i, y1i, x2i, y2i = self.rect_in_image_coords_raw()
+        if x2i - x1i <= 1 or y2i - y1i <= 1:
+            return
+        # the last preview stays on screen until this one lands; rendered from memory
+        job = preview_job(self.snapshot_conversion_job((x1i, y1i, x2i, y2i)))
+        if self.app_settings["device_preview"]:
+            self.device_preview.request(job)
+        if self.is_variant_grid_open():
+            self.request_variant_grid(job)
+
+    def on_device_preview_ready(self, preview: Image.Image) -> None:
+        if not self.app_settings["device_preview"]:
+            return
 
-        # 5) enhance image by given values
-        out_img = self.enhance_image(out_img)
+        label = self.show_device_preview_window()
+        if self._device_preview_tk is not None and (self._device_preview_tk.width(), self._device_preview_tk.height()) == preview.size:
+            self._device_preview_tk.paste(preview)
+        else:
+            self._device_preview_tk = ImageTk.PhotoImage(preview)
+            label.configure(image=self._device_preview_tk)
+
+    def update_device_preview_window(self) -> None:
+        """Opens or closes the device preview window according to the device_preview setting."""
+        if self.app_settings["device_preview"]:
+            self.show_device_preview_window()
+            self.schedule_device_preview()
+            return
 
-        # 6) render text on image if enabled
-        assert self.text_overlay is not None
-        out_img = self.text_overlay.render_text_overlay_on_image(out_img)
+        self.device_preview.cancel()
+        if self._device_preview_id is not None:
+            self.window.after_cancel(self._device_preview_id)
+            self._device_preview_id = None
+        if self._device_preview_window is not None and self._device_preview_window.winfo_exists():
+            self._device_preview_window.destroy()
+        self._device_preview_window = None
+        self._device_preview_label = None
+        self._device_preview_tk = None
+
+    def show_device_preview_window(self) -> ttk.Label:
+        """Window showing the device output at target resolution (1:1), created on first use."""
+        if self._device_preview_window is not None and self._device_preview_window.winfo_exists():
+            assert self._device_preview_label is not None
+            return self._device_preview_label
 
-        # 7) convert and save final device image only
-        self.convert_to_bmp(out_img)
+        win = tk.Toplevel(self.window)
+        win.title(f"{APP_TITLE} v{APP_VERSION} – Device preview")
+        win.resizable(False, False)
+        win.transient(self.window)
+        # closing the window switches the setting off (and the checkbox with it)
+        win.protocol("WM_DELETE_WINDOW", lambda: self.update_app_settings_checkbox("device_preview"))
+
+        label = ttk.Label(win, text="Rendering…", anchor=tk.CENTER)
+        label.pack()
+        self._device_preview_window = win
+        self._device_preview_label = label
+        self._device_preview_tk = None
+        return label
+
+    # ---------- Variant grid ----------
+    def build_variants(self) -> list[Variant]:
+        """
+        The current settings followed by the alternatives worth comparing: the other
+        devices (with their enhancer defaults if the sliders are at the current
+        device's defaults, like switching the device does), the other fill modes
+        and the enhancer presets.
+        """
+        prefs = self.image_preferences
+        at_defaults = self.are_enhancer_values_at_device_defaults()
+        variants = [Variant("Current", {})]
+
+        for target_device in available_option["TARGET_DEVICE"]:
+            if target_device != prefs["target_device"]:
+                changes: dict[str, Any] = {"target_device": target_device}
+                if at_defaults:
+                    changes.update(self.get_device_enhancer_defaults(target_device))
+                variants.append(Variant(f"Device: {target_device}", changes))
+
+        for fill_mode in available_option["FILL_MODE"]:
+            if fill_mode != prefs["fill_mode"]:
+                variants.append(Variant(f"Fill: {fill_mode}", {"fill_mode": fill_mode}))
+
+        if not at_defaults:
+            variants.append(Variant("Device defaults", self.get_device_enhancer_defaults()))
+        if self.image_stats is not None:
+            variants.append(Variant("Auto levels", auto_levels_from_stats(self.image_stats, self.get_device_enhancer_defaults())))
+        sharpen = bool(prefs["enhancer_sharpen"])
+        variants.append(Variant("No sharpening" if sharpen else "Sharpen", {"enhancer_sharpen": not sharpen}))
+
+        return variants[:VARIANT_GRID_MAX]
+
+    def is_variant_grid_open(self) -> bool:
+        return self._variant_grid_window is not None and self._variant_grid_window.winfo_exists()
+
+    def show_variant_grid(self, _e=None) -> None:
+        """Opens the variant grid window (or brings it to the front) and renders it."""
+        if self.original_img is None:
+            return
 
-        # 8) save image preferences (txt) next to the source
-        self.save_image_preferences(x1i, y1i, x2i, y2i)
+        if not self.is_variant_grid_open():
+            win = tk.Toplevel(self.window)
+            win.title(f"{APP_TITLE} v{APP_VERSION} – Compare variants")
+            win.transient(self.window)
+            win.protocol("WM_DELETE_WINDOW", self.close_variant_grid)
+            win.bind("<Escape>", lambda e: self.close_variant_grid())
+            self._variant_grid_window = win
+            self._variants = []
+        else:
+            assert self._variant_grid_window is not None
+            self._variant_grid_window.lift()
+
+        self.request_device_preview()
+
+    def close_variant_grid(self) -> None:
+        self.variant_grid.cancel()
+        if self.is_variant_grid_open():
+            assert self._variant_grid_window is not None
+            self._variant_grid_window.destroy()
+        self._variant_grid_window = None
+        self._variant_tiles = []
+        self._variant_tk = []
+        self._variants = []
+
+    def request_variant_grid(self, job: ConversionJob) -> None:
+        variants = self.build_variants()
+        if [v.label for v in variants] != [v.label for v in self._variants]:
+            self.create_variant_tiles(variants)
+        # the tiles keep their last rendering until the new one lands
+        self._variants = variants
+        self.variant_grid.request(job, variants)
+
+    def create_variant_tiles(self, variants: list[Variant]) -> None:
+        assert self._variant_grid_window is not None
+        for tile in self._variant_tiles:
+            tile.destroy()
+
+        columns = 3 if len(variants) > 4 else 2
+        self._variant_tiles = []
+        self._variant_tk = [None] * len(variants)
+        for index, variant in enumerate(variants):
+            tile = ttk.Label(self._variant_grid_window, text=f"{variant.label}\nRendering…", compound=tk.TOP, anchor=tk.CENTER, cursor="hand2")
+            tile.grid(row=index // columns, column=index % columns, padx=4, pady=4)
+            tile.bind("<Button-1>", lambda e, i=index: self.adopt_variant(i))
+            self._variant_tiles.append(tile)
+
+    def variant_tile_size(self) -> tuple[int, int]:
+        """Display size of a tile: target size, scaled down so the grid fits on the screen."""
+        columns = 3 if len(self._variants) > 4 else 2
+        rows = -(-len(self._variants) // columns)
+        tw, th = self.target_size
+        scale = min(
+            1.0,
+            self.window.winfo_screenwidth() * 0.9 / (columns * tw),
+            self.window.winfo_screenheight() * 0.8 / (rows * (th + 40)),  # 40 px for the caption
+        )
+        return max(1, int(tw * scale)), max(1, int(th * scale))
 
-        # 9) next image
-        self.next_image()
+    def on_variant_ready(self, index: int, preview: Image.Image) -> None:
+        if not self.is_variant_grid_open() or index >= len(self._variant_tiles):
+            return
 
-    def enhance_image(self, img) -> Image.Image:
-        enhanced_image = img
+        tile_size = self.variant_tile_size()
+        if preview.size != tile_size:
+            # box filter: the average of the dither pattern is what the eye sees at a distance
+            preview = preview.resize(tile_size, Image.Resampling.BOX)
 
-        # Add edge enhancement
-        if (self.image_preferences["enhancer_edge"]):
-            enhanced_image = enhanced_image.filter(ImageFilter.EDGE_ENHANCE)
+        photo = self._variant_tk[index]
+        if photo is not None and (photo.width(), photo.height()) == preview.size:
+            photo.paste(preview)
+        else:
+            photo = ImageTk.PhotoImage(preview)
+            self._variant_tk[index] = photo
+        self._variant_tiles[index].configure(image=photo, text=self._variants[index].label)
 
-        # Add noise reduction
-        if (self.image_preferences["enhancer_smooth"]):
-            enhanced_image = enhanced_image.filter(ImageFilter.SMOOTH)
+    def adopt_variant(self, index: int) -> None:
+        """Takes over the settings of a variant into image_preferences and closes the grid."""
+        if index >= len(self._variants):
+            return
 
-        # Add sharpening for better detail visibility
-        if (self.image_preferences["enhancer_sharpen"]):
-            enhanced_image = enhanced_image.filter(ImageFilter.SHARPEN)
+        changes = dict(self._variants[index].changes)
+        self.close_variant_grid()
 
-        if (
-            float(self.image_preferences["brightness"]) == float(BRIGHTNESS) and
-            float(self.image_preferences["contrast"]) == float(CONTRAST) and
-            float(self.image_preferences["saturation"]) == float(SATURATION)
-        ):
-            return enhanced_image
+        if "fill_mode" in changes:
+            self._apply_fill_mode(changes.pop("fill_mode"))
+        if "target_device" in changes:
+            self._apply_target_device(changes.pop("target_device"))
 
-        # Add brightness enhancement
-        enhancer = ImageEnhance.Brightness(enhanced_image)
-        enhanced_image = enhancer.enhance(float(self.image_preferences["brightness"]))
+        for name, value in changes.items():
+            self.image_preferences[name] = value
+            if name in self.image_enhancer_sliders:
+                self.image_enhancer_sliders[name][1].set(value)
+                self.update_slider_label(name)
+            if name in self.image_enhancer_checkbox_vars:
+                self.image_enhancer_checkbox_vars[name].set(value)
 
-        # Add contrast enhancement
-        enhancer = ImageEnhance.Contrast(enhanced_image)
-        enhanced_image = enhancer.enhance(float(self.image_preferences["contrast"]))
+        self.window.after_idle(self.update_image_in_canvas)
 
-        # Add saturation enhancement
-        enhancer = ImageEnhance.Color(enhanced_image)
-        enhanced_image = enhancer.enhance(float(self.image_preferences["saturation"]))
+    def render_filled_crop(self, rect: tuple[float, float, float, float], out_size: tuple[int, int], preview_source: Optional[Image.Image] = None) -> Image.Image:
+        """
+        Crops the rectangle (image space, may exceed the image) of the current image
+        to out_size and fills the uncovered area according to fill_mode.
 
-        return enhanced_image
+        :param rect: crop rectangle (x1, y1, x2, y2) in image space
+        :param out_size: output size
+        :param preview_source: optional downscaled copy of the whole source (e.g. the
+            display image) to render small previews from instead of the full source
+        """
+        assert self.original_img is not None
+        if preview_source is not None:
+            source, region_loader, resample = preview_source, None, Image.Resampling.BILINEAR
+        elif self.is_large_image_mode():
+            # only the region is decoded from the file, so memory follows the crop, not the source
+            region_loader = partial(load_source_region, self.current_image_path, memory_cap_bytes=self.image_service.memory_cap_bytes)
+            source, resample = self.original_img, Image.Resampling.LANCZOS
+        else:
+            source, region_loader, resample = self.original_img, None, Image.Resampling.LANCZOS
+
+        return render_filled_crop(
+            source,
+            self.source_size,
+            rect,
+            out_size,
+            self.image_preferences["fill_mode"],
+            self.target_size[0],
+            region_loader=region_loader,
+            resample=resample,
+        )
+
+    def enhance_image(self, img, reference: Optional[Image.Image] = None) -> Image.Image:
+        # the filter stage is cached: slider moves only re-run the colour stage
+        return apply_color(self.filter_stage.filtered(img, self.image_preferences), self.image_preferences, reference)
+
+    def enhance_draft(self, img, reference: Optional[Image.Image] = None) -> Image.Image:
+        """
+        Preview while a slider moves: the colour stage runs on a reduced copy of the
+        filtered image, which is scaled back up to the size of img.
+        """
+        filtered = self.filter_stage.filtered(img, self.image_preferences)
+        if self._draft_source is not filtered:
+            self._draft_source = filtered
+            self._draft_proxy = filtered.reduce(SLIDER_DRAFT_REDUCE)
+        assert self._draft_proxy is not None
+        enhanced = apply_color(self._draft_proxy, self.image_preferences, reference)
+        # pixel doubling: a smooth filter would cost more than the colour stage saved
+        return enhanced.resize(img.size, Image.Resampling.NEAREST)
 
-    def background_only(self, region_scaled_or_none):
-        if self.image_preferences["fill_mode"] == "blur":
-            base = region_scaled_or_none.resize(self.target_size, Image.Resampling.LANCZOS)
-            return base.filter(ImageFilter.GaussianBlur(radius=25))
-        else: # white, black
-            return Image.new("RGB", self.target_size, self.image_preferences["fill_mode"])
-    
     # ---------- Path helpers ----------
     def export_folder_with_orientation(self, orientation: str | None = None) -> str:
         if not orientation:
@@ -1561,6 +2533,14 @@ class CropperApp:
             settings["gallery_show_landscape"]=defaults["GALLERY_SHOW_LANDSCAPE"]
             settings["gallery_show_portrait"]=defaults["GALLERY_SHOW_PORTRAIT"]
             settings["gallery_show_unprocessed"]=defaults["GALLERY_SHOW_UNPROCESSED"]
+            settings["large_image_memory_mb"]=defaults["LARGE_IMAGE_MEMORY_MB"]
+            settings["image_cache_mb"]=defaults["IMAGE_CACHE_MB"]
+            settings["thumbnail_cache_mb"]=defaults["THUMBNAIL_CACHE_MB"]
+            settings["device_preview"]=defaults["DEVICE_PREVIEW"]
+            settings["mask_renderer"]=defaults["MASK_RENDERER"]
+            settings["resume_session"]=defaults["RESUME_SESSION"]
+            settings["last_folder"]=defaults["LAST_FOLDER"]
+            settings["last_image"]=defaults["LAST_IMAGE"]
 
             #print("APP Settings from DEFAULTS", settings)
             return settings
@@ -1578,7 +2558,9 @@ class CropperApp:
                     v_str = v.strip()
 
                     # convert values to their real counterparts (bool, int, float, size)
-                    if v_str in ("True", "False"):
+                    if k in TEXT_SETTINGS:
+                        v = v_str
+                    elif v_str in ("True", "False"):
                         v = v_str == "True"
                     elif v_str.isdigit():
                         v = int(v_str)
@@ -1624,6 +2606,24 @@ class CropperApp:
             settings["gallery_show_portrait"] = defaults["GALLERY_SHOW_PORTRAIT"]
         if not isinstance(settings.get("gallery_show_unprocessed"), bool):
             settings["gallery_show_unprocessed"] = defaults["GALLERY_SHOW_UNPROCESSED"]
+
+        if not isinstance(settings.get("large_image_memory_mb"), int) or settings["large_image_memory_mb"] <= 0:
+            settings["large_image_memory_mb"] = defaults["LARGE_IMAGE_MEMORY_MB"]
+        if not isinstance(settings.get("image_cache_mb"), int) or settings["image_cache_mb"] < 0:
+            settings["image_cache_mb"] = defaults["IMAGE_CACHE_MB"]
+        if not isinstance(settings.get("thumbnail_cache_mb"), int) or settings["thumbnail_cache_mb"] < 0:
+            settings["thumbnail_cache_mb"] = defaults["THUMBNAIL_CACHE_MB"]
+        if not isinstance(settings.get("device_preview"), bool):
+            settings["device_preview"] = defaults["DEVICE_PREVIEW"]
+        if settings.get("mask_renderer") not in MASK_RENDERERS:
+            settings["mask_renderer"] = defaults["MASK_RENDERER"]
+        if not isinstance(settings.get("resume_session"), bool):
+            settings["resume_session"] = defaults["RESUME_SESSION"]
+        # any other value (e.g. a name read as a number) just opens the folder prompt
+        if not isinstance(settings.get("last_folder"), str):
+            settings["last_folder"] = defaults["LAST_FOLDER"]
+        if not isinstance(settings.get("last_image"), str):
+            settings["last_image"] = defaults["LAST_IMAGE"]
         
         #print("Loaded APP Settings from file:", settings)
         return settings
@@ -1633,6 +2633,11 @@ class CropperApp:
 
         self.app_settings["canvas_zoom"] = round(self.app_settings["canvas_zoom"], 2) if self.app_settings["save_canvas_zoom"] else defaults["CANVAS_ZOOM"]
 
+        # session resume: folder and image shown at exit
+        if self.picture_input_folder and self.image_paths:
+            self.app_settings["last_folder"] = self.picture_input_folder
+            self.app_settings["last_image"] = os.path.basename(self.image_paths[self.img_idx])
+
         # convert tuples to strings
         # window_min, last_window_size and image_target_size needs to be in format: 1024x768 (2-4 digits each)
         needs_tuple = ("window_min", "last_window_size", "last_window_position", "image_target_size")
@@ -1771,7 +2776,7 @@ class CropperApp:
         self.image_preferences["text_overlay"] = text_overlay_state
 
         assert self.original_img is not None
-        iw, ih = self.original_img.size
+        iw, ih = self.source_size
         nx1 = x1i / iw
         ny1 = y1i / ih
         nx2 = x2i / iw
@@ -1843,8 +2848,7 @@ class CropperApp:
         keyvalues = self.image_preferences
 
         # prefer absolute coordinates if the dimensions match
-        assert self.original_img is not None
-        iw, ih = self.original_img.size
+        iw, ih = self.source_size
 
         try:
             saved_w = int(keyvalues.get("image_w", iw))
@@ -1892,6 +2896,14 @@ class CropperApp:
         except Exception:
             return (None, None, None, None)
 
+    def save_metadata_cache(self) -> None:
+        if self.metadata_cache is not None:
+            self.metadata_cache.save()
+
+    def save_thumbnail_cache(self) -> None:
+        if self.thumbnail_cache is not None:
+            self.thumbnail_cache.save()
+
     def save_file_list(self) -> None:
         if not self.picture_input_folder:
             return
@@ -1917,6 +2929,8 @@ class CropperApp:
 
     # ---------- File list progress ----------
     def set_image_index(self, index: int) -> None:
+        if index == self.img_idx:
+            return # gallery re-selected the shown image (click on it, filter rebuild)
         if index >= 0 and index < len(self.image_paths):
             self.img_idx = index
             self.load_image()
@@ -1940,7 +2954,7 @@ class CropperApp:
 
             self.img_idx = next_idx
             if self.gallery is not None:
-                self.gallery.select_index(self.img_idx)
+                self.gallery.select_index(self.img_idx, notify=False)
             self.load_image()
         elif navigable == 1 and self.app_settings["exit_after_last_image"]:
             on_closing("showinfo", "Done", "All images have been processed. App closes now.")
@@ -1960,7 +2974,7 @@ class CropperApp:
 
             self.img_idx = prev_idx
             if self.gallery is not None:
-                self.gallery.select_index(self.img_idx)
+                self.gallery.select_index(self.img_idx, notify=False)
             self.load_image()
 
     def on_skip(self, _e=None) -> None:
@@ -1969,36 +2983,41 @@ class CropperApp:
             self.next_image()
 
     # ---------- Call converter ----------
-    def convert_to_bmp(self, out_img: Image.Image) -> None:
-        def progress(step, msg):
-            self.update_status_label(f"[{step}/4] {msg}")
+    def on_conversion_update(self, job: ConversionJob, state: str, detail: Optional[str]) -> None:
+        """Status of a queued conversion, called on the Tk thread."""
+        name = os.path.basename(job.source_path)
+        if state == "running":
+            self.last_conversion_status = f"Converting {name}…"
+        elif state == "done":
+            self.last_conversion_status = f"Done: {name}"
+        else:
+            self.last_conversion_status = f"Conversion failed: {name}"
+            if self.gallery is not None and job.source_path in self.image_paths:
+                self.gallery.set_conversion_failed(self.image_paths.index(job.source_path), True)
+        self.update_conversion_status()
+
+    def update_conversion_status(self) -> None:
+        pending = self.conversion_queue.pending()
+        parts = [f"Queue: {pending}"] if pending else []
+        if self.last_conversion_status:
+            parts.append(self.last_conversion_status)
+        self.status_queue.config(text=" | ".join(parts))
+
+    def flush_conversion_queue(self) -> None:
+        """Waits for all queued conversions, e.g. before fileList.txt is written."""
+        if self.conversion_queue.pending():
+            self.status_queue.config(text=f"Finishing {self.conversion_queue.pending()} conversion(s)…")
             self.window.update_idletasks()
-
-        self.update_status_label("Starting conversion…")
-        self.window.update_idletasks() # force GUI update before blocking
-
-        converter = Converter()
-
-        try:
-            converter.convert(
-                source_image=out_img,
-                source_path=self.current_image_path,
-                target_device=self.image_preferences["target_device"],
-                export_folder=self.export_folder_with_orientation(),
-                dither_method=DITHER_METHOD,
-                pic_folder_on_device=self.app_settings["pic_folder_on_device"],
-                progress_callback=progress,
-            )
-            #self.flash_status(f"Done: {os.path.basename(device_path)}")
-        except Exception as e:
-            self.update_status_label(f"Conversion failed: {e}")
-            raise
+        self.conversion_queue.flush()
 
 # ---------- Exit handling ----------
 def on_closing(type="askokcancel", headline="Quit", body="Do you really want to quit?") -> None:
     def close():
+        app.flush_conversion_queue()
         app.save_app_settings()
         app.save_file_list()
+        app.save_metadata_cache()
+        app.save_thumbnail_cache()
         window.destroy()
 
     if type == "askokcancel":
@@ -0,0 +1,87 @@
+import math
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from PIL import Image
+
+DEEP_ZOOM_TILE_SIZE = 256   # px on the canvas
+DEEP_ZOOM_MAX_TILES = 96    # ~18 MB of RGB tiles
+
+
+class ViewportRenderer:
+    """
+    Renders only the visible part of an image shown larger than the canvas.
+
+    The virtual display image (source scaled to disp_size) is split into square
+    tiles; each visible tile is resampled straight from its source box and kept in
+    an LRU, so panning only renders tiles that scroll into view. Memory stays at
+    the canvas size plus DEEP_ZOOM_MAX_TILES tiles, whatever the zoom level.
+    """
+
+    def __init__(self, tile_size: int = DEEP_ZOOM_TILE_SIZE, max_tiles: int = DEEP_ZOOM_MAX_TILES):
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self._tiles: OrderedDict[tuple, Image.Image] = OrderedDict()
+        self._last: Optional[tuple[tuple, tuple[Image.Image, tuple[int, int]]]] = None
+
+    def clear(self) -> None:
+        self._tiles.clear()
+        self._last = None
+
+    def render(
+        self,
+        key: Hashable,
+        source: Image.Image,
+        disp_size: tuple[int, int],
+        img_off: tuple[int, int],
+        canvas_size: tuple[int, int],
+    ) -> Optional[tuple[Image.Image, tuple[int, int]]]:
+        """
+        Returns the visible part of the virtual display image and its canvas position,
+        or None if the image is not visible at all.
+
+        :param key: identifies source and zoom level; tiles are reused while it is unchanged
+        :param source: image the tiles are resampled from (full image or pyramid level)
+        :param disp_size: size of the virtual display image
+        :param img_off: canvas position of the virtual display image (may be negative)
+        :param canvas_size: canvas size
+        """
+        # unchanged view (e.g. a slider moved): the same image object, so later stages can cache on it
+        request = (key, disp_size, img_off, canvas_size)
+        if self._last is not None and self._last[0] == request:
+            return self._last[1]
+
+        dw, dh = disp_size
+        ox, oy = img_off
+        cw, ch = canvas_size
+
+        # visible region in display coordinates
+        vx0, vy0 = max(0, -ox), max(0, -oy)
+        vx1, vy1 = min(dw, cw - ox), min(dh, ch - oy)
+        if vx1 <= vx0 or vy1 <= vy0:
+            return None
+
+        ts = self.tile_size
+        sx = source.width / dw
+        sy = source.height / dh
+        viewport = Image.new("RGB", (vx1 - vx0, vy1 - vy0))
+
+        for ty in range(vy0 // ts, math.ceil(vy1 / ts)):
+            for tx in range(vx0 // ts, math.ceil(vx1 / ts)):
+                tile_key = (key, disp_size, tx, ty)
+                tile = self._tiles.get(tile_key)
+                if tile is None:
+                    x0, y0 = tx * ts, ty * ts
+                    x1, y1 = min(dw, x0 + ts), min(dh, y0 + ts)
+                    box = (x0 * sx, y0 * sy, x1 * sx, y1 * sy)
+                    tile = source.resize((x1 - x0, y1 - y0), Image.Resampling.BICUBIC, box=box)
+                    self._tiles[tile_key] = tile
+                    while len(self._tiles) > self.max_tiles:
+                        self._tiles.popitem(last=False)
+                else:
+                    self._tiles.move_to_end(tile_key)
+
+                viewport.paste(tile, (tx * ts - vx0, ty * ts - vy0))
+
+        self._last = (request, (viewport, (ox + vx0, oy + vy0)))
+        return self._last[1]
@@ -0,0 +1,82 @@
+import queue
+import threading
+from typing import Callable, Optional
+
+from PIL import Image
+
+from utils.conversion_queue import ConversionJob, render_job_output
+from utils.converter import quantize_to_device
+
+DEVICE_PREVIEW_DEBOUNCE_MS = 200   # quiet time after a crop/setting change before the preview is rendered
+DEVICE_PREVIEW_POLL_MS = 50
+
+
+class DevicePreviewRenderer:
+    """
+    Renders what the panel will show for a ConversionJob (crop, fill, enhancements,
+    text and dithering in the calibrated device colors) on a worker thread.
+
+    Only the newest request is rendered: request() replaces a request that has not
+    started yet, and a render that became stale is abandoned between its steps and
+    never delivered. Finished previews are handed back to Tk through the event loop
+    and passed to on_ready(image) on the Tk thread.
+    """
+
+    def __init__(self, widget, on_ready: Callable[[Image.Image], None]):
+        self.widget = widget
+        self.on_ready = on_ready
+
+        self._generation = 0
+        self._latest: Optional[tuple[int, ConversionJob]] = None
+        self._wakeup = threading.Condition()
+        self._results: queue.Queue = queue.Queue()
+
+        threading.Thread(target=self._worker, daemon=True).start()
+        self.widget.after(DEVICE_PREVIEW_POLL_MS, self._drain_results)
+
+    def request(self, job: ConversionJob) -> None:
+        with self._wakeup:
+            self._generation += 1
+            self._latest = (self._generation, job)
+            self._wakeup.notify()
+
+    def cancel(self) -> None:
+        with self._wakeup:
+            self._generation += 1
+            self._latest = None
+
+    def _is_stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _worker(self) -> None:
+        while True:
+            with self._wakeup:
+                while self._latest is None:
+                    self._wakeup.wait()
+                generation, job = self._latest
+                self._latest = None
+
+            try:
+                out_img = render_job_output(job)
+                if self._is_stale(generation):
+                    continue
+                preview = quantize_to_device(out_img, job.preferences["target_device"], job.dither_method)
+            except Exception as e:
+                print(f"[WARN] Device preview of {job.source_path} failed: {e}")
+                continue
+
+            if not self._is_stale(generation):
+                self._results.put((generation, preview))
+
+    def _drain_results(self) -> None:
+        while True:
+            try:
+                generation, preview = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if not self._is_stale(generation):
+                self.on_ready(preview)
+
+        if self.widget.winfo_exists():
+            self.widget.after(DEVICE_PREVIEW_POLL_MS, self._drain_results)
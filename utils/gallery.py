@@ -1,18 +1,27 @@
 import os
 import queue
 import sys
-import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk
 from typing import Callable, Optional, List
 
-from PIL import Image, ImageOps, ImageTk
+from PIL import Image, ImageTk
+
+from utils.image_service import ImageSourceService, make_thumbnail
+from utils.image_source import load_oriented_rgb, load_thumbnail_source, read_oriented_size
+from utils.image_stats import compute_image_stats
+from utils.crop_suggest import compute_saliency_grid
+from utils.metadata_cache import MetadataCache
+from utils.thumbnail_cache import ThumbnailCache
 
 THUMB_SIZE = 80
 PADDING = 12
-
-_EXIF_ORIENTATION_TAG = 0x0112
-_EXIF_SWAP_ORIENTATIONS = frozenset({5, 6, 7, 8})
+FAILED_OUTLINE_COLOR = "#e04040"
+THUMB_PHOTO_POOL_MAX = 64   # released thumbnail PhotoImages kept to paste into instead of reallocating
+THUMB_DRAIN_MAX_RENDERS = 24    # thumbnails drawn per drain tick
+THUMB_DRAIN_MAX_ITEMS = 1024    # queue items per drain tick (thumbnails out of view are only stored)
+THUMB_WORKERS = 3               # the folder pass plus on-demand thumbnails (filter changes, viewer decodes)
 
 
 class AsyncThumbnailGallery(tk.Frame):
@@ -31,6 +40,9 @@ class AsyncThumbnailGallery(tk.Frame):
         show_portrait: bool = True,
         show_unprocessed: bool = False,
         on_filter_change: Optional[Callable[[bool, bool, bool], None]] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        image_service: Optional[ImageSourceService] = None,
+        thumbnail_cache: Optional[ThumbnailCache] = None,
     ):
         """
         Single-row, horizontally scrollable, async-loading thumbnail gallery.
@@ -46,6 +58,13 @@ class AsyncThumbnailGallery(tk.Frame):
         self.selected_bg = selected_bg
         self.on_select = on_select
         self.on_layout_change = on_layout_change
+        self.metadata_cache = metadata_cache
+        self.image_service = image_service
+        self.thumbnail_cache = thumbnail_cache
+        self._thumb_pool = ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix="gallery-thumbs")
+        if image_service is not None:
+            # images decoded for the viewer: thumbnail from the same decode
+            image_service.on_decoded = self._on_source_decoded
 
         self._load_generation = 0
         self._thumb_queue: queue.Queue = queue.Queue()
@@ -60,11 +79,14 @@ class AsyncThumbnailGallery(tk.Frame):
 
         self._thumb_pil: dict[int, Image.Image] = {}
         self._thumb_tk: dict[int, ImageTk.PhotoImage] = {}
+        self._thumb_tk_pool: dict[tuple[int, int], list[ImageTk.PhotoImage]] = {}
         self._visible_items: dict[int, tuple[int, Optional[int], int]] = {}
         self._sidecar_exists: List[bool] = []
+        self._conversion_failed: set[int] = set()
         self._is_landscape: List[Optional[bool]] = []
         self._filtered_indices: List[int] = []
         self._filtered_pos_by_source: dict[int, int] = {}
+        self._index_by_path: dict[str, int] = {}
 
         self._show_landscape: bool = show_landscape
         self._show_portrait: bool = show_portrait
@@ -136,9 +158,15 @@ class AsyncThumbnailGallery(tk.Frame):
         self._prepare_image_flags()
         self._rebuild_filtered_indices(None)
 
-        threading.Thread(target=self._load_thumbnails_async, daemon=True).start()
+        self._thumb_pool.submit(self._load_thumbnails_async)
         self.after(10, self._drain_thumbnail_queue)
 
+    def destroy(self) -> None:
+        # pool threads are joined at interpreter exit: stop the running passes first
+        self._load_generation += 1
+        self._thumb_pool.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
     def set_images(self, image_paths: List[str]) -> None:
         """
         Replace gallery contents without recreating the widget.
@@ -149,6 +177,7 @@ class AsyncThumbnailGallery(tk.Frame):
         self._clear_visible_items()
         self._thumb_pil.clear()
         self._thumb_tk.clear()
+        self._conversion_failed.clear()
 
         self.image_paths = image_paths
         self._prepare_image_flags()
@@ -159,7 +188,7 @@ class AsyncThumbnailGallery(tk.Frame):
         self._update_scrollbar()
         self._render_visible_thumbnails()
 
-        threading.Thread(target=self._load_thumbnails_async, args=(gen,), daemon=True).start()
+        self._thumb_pool.submit(self._load_thumbnails_async, gen)
 
     # ============================================================
     # Thumbnail loading
@@ -171,15 +200,8 @@ class AsyncThumbnailGallery(tk.Frame):
         Uses PIL lazy loading and the raw EXIF orientation tag.
         """
         try:
-            with Image.open(path) as img:
-                w, h = img.size
-                try:
-                    tag = img.getexif().get(_EXIF_ORIENTATION_TAG, 1)
-                    if tag in _EXIF_SWAP_ORIENTATIONS:
-                        w, h = h, w
-                except Exception:
-                    pass
-                return w >= h
+            w, h = read_oriented_size(path)
+            return w >= h
         except Exception:
             return None
 
@@ -187,15 +209,38 @@ class AsyncThumbnailGallery(tk.Frame):
         if generation is None:
             generation = self._load_generation
 
+        # Pass 0: thumbnails of unchanged files from the disk cache, read in one
+        # sequential pass before anything is decoded.
+        snapshot = list(self._is_landscape)
+        orientations: dict[int, Optional[bool]] = {}
+        cached: set[int] = set()
+        if self.thumbnail_cache is not None:
+            thumbs = self.thumbnail_cache.get_many(self.image_paths, self._thumb_inner_size())
+            for index, path in enumerate(self.image_paths):
+                if generation != self._load_generation:
+                    return
+                thumb_image = thumbs.get(path)
+                if thumb_image is not None:
+                    cached.add(index)
+                    orientations[index] = thumb_image.width >= thumb_image.height
+                    self._thumb_queue.put((generation, index, thumb_image, orientations[index]))
+
         # Pass 1: header-only reads — populates orientation for the filter immediately.
         # PIL lazy-loads, so Image.open() + .size + .getexif() read only the file header.
-        orientations: dict[int, Optional[bool]] = {}
+        # Orientations cached for unchanged files need no read; only differences to the
+        # snapshot shown at start (_prepare_image_flags) are sent to the Tk thread.
         for index, path in enumerate(self.image_paths):
             if generation != self._load_generation:
                 return
-            is_landscape = self._read_oriented_is_landscape(path)
+            if index in cached:
+                continue
+            is_landscape = self.metadata_cache.get(path, "landscape") if self.metadata_cache is not None else None
+            if is_landscape is None:
+                is_landscape = self._read_oriented_is_landscape(path)
+                if is_landscape is not None and self.metadata_cache is not None:
+                    self.metadata_cache.set(path, "landscape", is_landscape)
             orientations[index] = is_landscape
-            if is_landscape is not None:
+            if index < len(snapshot) and is_landscape != snapshot[index]:
                 self._thumb_queue.put((generation, index, None, is_landscape))
 
         # Pass 2: full pixel load + thumbnail generation.
@@ -204,16 +249,16 @@ class AsyncThumbnailGallery(tk.Frame):
         for index, path in enumerate(self.image_paths):
             if generation != self._load_generation:
                 return
-            if index in self._thumb_pil:
+            if index in self._thumb_pil or index in cached:
                 continue
             is_landscape = orientations.get(index)
             if is_landscape is not None:
                 if not ((is_landscape and self._show_landscape) or (not is_landscape and self._show_portrait)):
                     continue
             try:
-                img = self.load_image_by_exiforient(path)
-                is_landscape = img.width >= img.height
-                thumb_image = self._create_thumbnail_image(img)
+                thumb_image = self._load_thumbnail(path)
+                is_landscape = thumb_image.width >= thumb_image.height
+                self._record_image_stats(path, thumb_image)
             except Exception as exc:
                 print(f"Thumbnail load failed for '{path}': {exc}")
                 thumb_image = Image.new("RGBA", (self.thumb_size, self.thumb_size), self.default_bg)
@@ -221,12 +266,11 @@ class AsyncThumbnailGallery(tk.Frame):
             self._thumb_queue.put((generation, index, thumb_image, is_landscape))
 
     def _drain_thumbnail_queue(self) -> None:
-        processed = 0
-        max_per_tick = 24
+        received = 0
         orientation_changed = False
         needs_render: list[int] = []
 
-        while processed < max_per_tick:
+        while received < THUMB_DRAIN_MAX_ITEMS and len(needs_render) < THUMB_DRAIN_MAX_RENDERS:
             try:
                 generation, index, thumb_image, is_landscape = self._thumb_queue.get_nowait()
             except queue.Empty:
@@ -242,9 +286,11 @@ class AsyncThumbnailGallery(tk.Frame):
 
                 if thumb_image is not None:
                     self._thumb_pil[index] = thumb_image
-                    needs_render.append(index)
+                    self._release_thumb_photo(index) # shown again with the new thumbnail
+                    if index in self._visible_items:
+                        needs_render.append(index)
 
-            processed += 1
+            received += 1
 
         # One filter rebuild per tick (not one per item) to avoid redundant work.
         if orientation_changed:
@@ -260,20 +306,47 @@ class AsyncThumbnailGallery(tk.Frame):
         if self.winfo_exists():
             self.after(10, self._drain_thumbnail_queue)
 
-    def _create_thumbnail_image(self, img: Image.Image) -> Image.Image:
+    def _thumb_inner_size(self) -> int:
         # Leave 1 px on each side so the rectangle fill remains visible.
-        inner = self.thumb_size - 2
-        img.thumbnail((inner, inner), Image.Resampling.LANCZOS)
-        return img.convert("RGB")
+        return self.thumb_size - 2
+
+    def _load_thumbnail(self, path: str) -> Image.Image:
+        inner = self._thumb_inner_size()
+        if self.image_service is not None:
+            thumb_image = self.image_service.load_for_thumbnail(path, inner)
+        else:
+            source = load_thumbnail_source(path, inner) or self.load_image_by_exiforient(path)
+            thumb_image = make_thumbnail(source, inner)
+        if self.thumbnail_cache is not None:
+            self.thumbnail_cache.put(path, thumb_image, inner)
+        return thumb_image
+
+    def _on_source_decoded(self, path: str) -> None:
+        # called on the viewer's worker thread; the thumbnail is made from the shared decode
+        index = self._index_by_path.get(path)
+        if index is not None and index not in self._thumb_pil:
+            try:
+                self._thumb_pool.submit(self._load_specific_thumbnails_async, self._load_generation, [(index, path)])
+            except RuntimeError:
+                pass # gallery destroyed while the viewer was decoding
+
+    def _record_image_stats(self, path: str, thumb_image: Image.Image) -> None:
+        # The thumbnail is a ready-made proxy: collect the histogram statistics and
+        # the saliency grid while it is at hand, so auto levels and the crop
+        # suggestion never need another decode.
+        if self.metadata_cache is None:
+            return
+        if self.metadata_cache.get(path, "levels") is None:
+            self.metadata_cache.set(path, "levels", compute_image_stats(thumb_image))
+        if self.metadata_cache.get(path, "saliency") is None:
+            self.metadata_cache.set(path, "saliency", compute_saliency_grid(thumb_image))
 
     def load_image_by_exiforient(self, path: str):
         """
         Loads an image and applies EXIF orientation correction (auto-rotate).
-        Returns an RGB image with correct orientation.
+        Returns an RGB image with correct orientation, colour managed like the main view.
         """
-        with Image.open(path) as image:
-            transposed = ImageOps.exif_transpose(image)
-            return transposed.convert("RGB")
+        return load_oriented_rgb(path)
 
     def _start_fill_thread_if_needed(self) -> None:
         gen = self._load_generation
@@ -283,11 +356,7 @@ class AsyncThumbnailGallery(tk.Frame):
             if idx not in self._thumb_pil and idx < len(self.image_paths)
         ]
         if missing:
-            threading.Thread(
-                target=self._load_specific_thumbnails_async,
-                args=(gen, missing),
-                daemon=True,
-            ).start()
+            self._thumb_pool.submit(self._load_specific_thumbnails_async, gen, missing)
 
     def _load_specific_thumbnails_async(self, generation: int, items: list[tuple[int, str]]) -> None:
         for index, path in items:
@@ -296,9 +365,9 @@ class AsyncThumbnailGallery(tk.Frame):
             if index in self._thumb_pil:
                 continue
             try:
-                img = self.load_image_by_exiforient(path)
-                is_landscape = img.width >= img.height
-                thumb_image = self._create_thumbnail_image(img)
+                thumb_image = self._load_thumbnail(path)
+                is_landscape = thumb_image.width >= thumb_image.height
+                self._record_image_stats(path, thumb_image)
             except Exception as exc:
                 print(f"Thumbnail load failed for '{path}': {exc}")
                 thumb_image = Image.new("RGBA", (self.thumb_size, self.thumb_size), self.default_bg)
@@ -313,11 +382,25 @@ class AsyncThumbnailGallery(tk.Frame):
         return self._row_height + PADDING
 
     def _prepare_image_flags(self) -> None:
-        self._sidecar_exists = []
-        self._is_landscape = [None] * len(self.image_paths)
-        for img_path in self.image_paths:
-            sidecar = f"{os.path.splitext(img_path)[0]}_ppcrop.txt"
-            self._sidecar_exists.append(os.path.exists(sidecar))
+        # one directory listing per folder instead of a stat per sidecar
+        listed: set[str] = set()
+        for folder in {os.path.dirname(img_path) for img_path in self.image_paths}:
+            try:
+                listed.update(os.path.normcase(os.path.join(folder, name)) for name in os.listdir(folder))
+            except OSError:
+                pass
+        self._sidecar_exists = [
+            os.path.normcase(f"{os.path.splitext(img_path)[0]}_ppcrop.txt") in listed
+            for img_path in self.image_paths
+        ]
+        self._index_by_path = {img_path: index for index, img_path in enumerate(self.image_paths)}
+
+        # orientations known from the last session, so the filter is right before any
+        # header is read; _load_thumbnails_async revalidates them in the background
+        if self.metadata_cache is not None:
+            self._is_landscape = [self.metadata_cache.peek(img_path, "landscape") for img_path in self.image_paths]
+        else:
+            self._is_landscape = [None] * len(self.image_paths)
 
     def _rebuild_filtered_indices(self, anchor_source_index: Optional[int], notify: bool = False) -> None:
         show_landscape = bool(self.show_landscape_var.get())
@@ -338,10 +421,12 @@ class AsyncThumbnailGallery(tk.Frame):
 
         self._filtered_pos_by_source = {src: pos for pos, src in enumerate(self._filtered_indices)}
 
+        previous_selected = self.selected_index
         next_selected = self._choose_nearest_filtered(anchor_source_index)
         self.selected_index = next_selected
 
-        if notify and next_selected is not None and self.on_select is not None:
+        # only a selection moved by the filter is reported, not every rebuild
+        if notify and next_selected is not None and next_selected != previous_selected and self.on_select is not None:
             self.on_select(next_selected)
 
     def _choose_nearest_filtered(self, anchor_source_index: Optional[int]) -> Optional[int]:
@@ -417,7 +502,8 @@ class AsyncThumbnailGallery(tk.Frame):
             if overlay_id is not None:
                 self.canvas.delete(overlay_id)
         self._visible_items.clear()
-        self._thumb_tk.clear()
+        for index in list(self._thumb_tk):
+            self._release_thumb_photo(index)
 
     def _render_visible_thumbnails(self) -> None:
         start, end = self._visible_index_range()
@@ -430,12 +516,38 @@ class AsyncThumbnailGallery(tk.Frame):
                 self.canvas.delete(img_id)
                 if overlay_id is not None:
                     self.canvas.delete(overlay_id)
-                self._thumb_tk.pop(index, None)
+                self._release_thumb_photo(index)
 
         for pos in range(start, end):
             source_index = self._filtered_indices[pos]
             self._render_thumbnail(source_index, pos)
 
+    def _thumb_photo(self, index: int) -> Optional[ImageTk.PhotoImage]:
+        """
+        PhotoImage of a thumbnail. A released PhotoImage of the same size is pasted
+        into if there is one, so scrolling does not allocate Tk images.
+        """
+        thumb_pil = self._thumb_pil.get(index)
+        thumb_tk = self._thumb_tk.get(index)
+        if thumb_pil is None or thumb_tk is not None:
+            return thumb_tk
+
+        pool = self._thumb_tk_pool.get(thumb_pil.size)
+        if pool:
+            thumb_tk = pool.pop()
+            thumb_tk.paste(thumb_pil)
+        else:
+            thumb_tk = ImageTk.PhotoImage(thumb_pil)
+        self._thumb_tk[index] = thumb_tk
+        return thumb_tk
+
+    def _release_thumb_photo(self, index: int) -> None:
+        thumb_tk = self._thumb_tk.pop(index, None)
+        if thumb_tk is None:
+            return
+        if sum(len(pool) for pool in self._thumb_tk_pool.values()) < THUMB_PHOTO_POOL_MAX:
+            self._thumb_tk_pool.setdefault((thumb_tk.width(), thumb_tk.height()), []).append(thumb_tk)
+
     def _render_thumbnail(self, index: int, filtered_pos: int) -> None:
         if index < 0 or index >= len(self.image_paths):
             return
@@ -449,13 +561,12 @@ class AsyncThumbnailGallery(tk.Frame):
         fill_color = self.image_bg
         outline_color = self.selected_bg if index == self.selected_index else ""
         outline_width = 1 if index == self.selected_index else 0
+        if index in self._conversion_failed:
+            outline_color = FAILED_OUTLINE_COLOR
+            outline_width = 2
         tag = f"thumb-{index}"
 
-        thumb_pil = self._thumb_pil.get(index)
-        thumb_tk = self._thumb_tk.get(index)
-        if thumb_pil is not None and thumb_tk is None:
-            thumb_tk = ImageTk.PhotoImage(thumb_pil)
-            self._thumb_tk[index] = thumb_tk
+        thumb_tk = self._thumb_photo(index)
 
         has_overlay = (
             self.sidecar_icon is not None
@@ -510,10 +621,29 @@ class AsyncThumbnailGallery(tk.Frame):
 
             self._visible_items[index] = (bg_id, overlay_id, img_id)
 
+    def set_conversion_failed(self, index: int, failed: bool) -> None:
+        """Flags (or clears) a failed background conversion on the thumbnail."""
+        if failed:
+            self._conversion_failed.add(index)
+        else:
+            self._conversion_failed.discard(index)
+
+        pos = self._filtered_pos_by_source.get(index)
+        if index in self._visible_items and pos is not None:
+            self._render_thumbnail(index, pos)
+
+    def thumbnail_image(self, index: int) -> Optional[Image.Image]:
+        """The loaded thumbnail (oriented RGB) of a source index, or None if it is not loaded yet."""
+        return self._thumb_pil.get(index)
+
     # ============================================================
     # Selection
     # ============================================================
 
+    def nearest_filtered_index(self, source_index: int) -> Optional[int]:
+        """Return source_index if it passes the filter, else the nearest source index that does (None if none)."""
+        return self._choose_nearest_filtered(source_index)
+
     def next_filtered_index(self, current_source_index: int) -> Optional[int]:
         """Return the next source index after current in the filtered list, or None if already at the end."""
         if not self._filtered_indices:
@@ -541,7 +671,7 @@ class AsyncThumbnailGallery(tk.Frame):
     def filtered_count(self) -> int:
         return len(self._filtered_indices)
 
-    def select_index(self, index: int, scroll: bool = True) -> None:
+    def select_index(self, index: int, scroll: bool = True, notify: bool = True) -> None:
         if index < 0 or index >= len(self.image_paths):
             return
 
@@ -555,7 +685,7 @@ class AsyncThumbnailGallery(tk.Frame):
         else:
             self._render_visible_thumbnails()
 
-        if self.on_select:
+        if notify and self.on_select:
             self.on_select(index)
 
     def _scroll_index_into_view(self, index) -> None:
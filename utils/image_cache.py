@@ -0,0 +1,146 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from PIL import Image
+
+from utils.image_source import decoded_rgb_bytes
+
+IMAGE_CACHE_MAX_VIEWS = 2   # display sizes kept per image (e.g. before and after a window resize)
+PYRAMID_MIN_SIDE = 128      # no pyramid levels with a shorter side than this
+
+
+class CachedImage:
+    """
+    A decoded source image (or large-image proxy) plus display-sized copies made
+    from it, keyed by size, so revisiting an image needs neither decode nor resize.
+    levels is the mipmap pyramid (1/2, 1/4, ...) of the image, built on demand by
+    DecodedImageCache.pyramid_level(). complete is False for a reduced draft decode
+    that a larger display could still replace with more detail.
+    """
+
+    def __init__(self, image: Image.Image, source_size: tuple[int, int], complete: bool = True):
+        self.image = image
+        self.source_size = source_size
+        self.complete = complete
+        self.views: dict[tuple[int, int], Image.Image] = {}
+        self.levels: list[Image.Image] = []
+
+    def nbytes(self) -> int:
+        return (
+            decoded_rgb_bytes(self.image.size)
+            + sum(decoded_rgb_bytes(size) for size in self.views)
+            + sum(decoded_rgb_bytes(level.size) for level in self.levels)
+        )
+
+
+class DecodedImageCache:
+    """
+    LRU of decoded images keyed by path, mtime and file size, evicted under a byte
+    budget. A changed file is never served: its entry no longer matches the key.
+    Access is thread-safe; the image loader fills it from its worker thread.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[tuple[int, int], CachedImage]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[CachedImage]:
+        signature = self._signature(path)
+        with self._lock:
+            item = self._entries.get(path)
+            if item is None:
+                return None
+            if item[0] != signature:
+                self._drop(path)
+                return None
+            self._entries.move_to_end(path)
+            return item[1]
+
+    def put(self, path: str, image: Image.Image, source_size: tuple[int, int], complete: bool = True) -> CachedImage:
+        entry = CachedImage(image, source_size, complete)
+        signature = self._signature(path)
+        if signature is None:
+            return entry
+
+        with self._lock:
+            if path in self._entries:
+                self._drop(path)
+            self._entries[path] = (signature, entry)
+            self._bytes += entry.nbytes()
+            self._evict()
+        return entry
+
+    def add_view(self, path: str, entry: CachedImage, view: Image.Image) -> None:
+        """Keeps a display-sized copy with its cache entry (counted against the budget)."""
+        with self._lock:
+            if view.size in entry.views:
+                return
+            item = self._entries.get(path)
+            cached = item is not None and item[1] is entry
+
+            while len(entry.views) >= IMAGE_CACHE_MAX_VIEWS:
+                old_size = next(iter(entry.views))
+                del entry.views[old_size]
+                if cached:
+                    self._bytes -= decoded_rgb_bytes(old_size)
+
+            entry.views[view.size] = view
+            if cached:
+                self._bytes += decoded_rgb_bytes(view.size)
+                self._entries.move_to_end(path)
+                self._evict()
+
+    def pyramid_level(self, path: str, entry: CachedImage, size: tuple[int, int]) -> Image.Image:
+        """
+        Smallest pyramid level of the entry that is at least size in both dimensions,
+        so any display size is resampled from a source at most twice as large.
+        Missing levels are built by halving (box filter) and kept with the entry.
+        """
+        level = entry.image
+        index = 0
+        while (
+            level.width // 2 >= max(size[0], 1)
+            and level.height // 2 >= max(size[1], 1)
+            and min(level.size) // 2 >= PYRAMID_MIN_SIDE
+        ):
+            if index < len(entry.levels):
+                level = entry.levels[index]
+            else:
+                # built outside the lock; another thread may have added it meanwhile
+                next_level = level.reduce(2)
+                with self._lock:
+                    if index == len(entry.levels):
+                        entry.levels.append(next_level)
+                        item = self._entries.get(path)
+                        if item is not None and item[1] is entry:
+                            self._bytes += decoded_rgb_bytes(next_level.size)
+                            self._evict()
+                    level = entry.levels[index]
+            index += 1
+        return level
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self) -> None:
+        # never evict the most recent entry: it is the one being shown
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            path = next(iter(self._entries))
+            self._drop(path)
+
+    def _drop(self, path: str) -> None:
+        _, entry = self._entries.pop(path)
+        self._bytes -= entry.nbytes()
+
+    def _signature(self, path: str) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
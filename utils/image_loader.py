@@ -0,0 +1,196 @@
+import os
+import queue
+import threading
+from typing import Callable, NamedTuple, Optional
+
+from PIL import Image
+
+from utils.image_cache import CachedImage, DecodedImageCache
+
+IMAGE_LOADER_POLL_MS = 10
+
+_LOAD = "load"
+_PREFETCH = "prefetch"
+
+
+class LoadedImage(NamedTuple):
+    """Result of one ImageLoader request; image is None if decoding failed."""
+    generation: int
+    path: str
+    image: Optional[Image.Image]
+    source_size: tuple[int, int]
+    display_image: Optional[Image.Image]
+    file_size: int
+    error: Optional[Exception]
+    complete: bool = True
+
+
+def fit_display_size(source_size: tuple[int, int], canvas_size: tuple[int, int], zoom: float) -> tuple[float, tuple[int, int]]:
+    """
+    Scale and display size of an image fitted into the canvas, times the canvas zoom.
+    Shared by the loader (display image prepared on the worker) and the window resize.
+    """
+    cw, ch = canvas_size
+    iw, ih = source_size
+    scale = min(cw / iw, ch / ih) * zoom
+    return scale, (max(1, int(iw * scale)), max(1, int(ih * scale)))
+
+
+def covers_display(image_size: tuple[int, int], source_size: tuple[int, int], display_size: tuple[int, int]) -> bool:
+    """True if an image of image_size (a copy of the source) has enough pixels for display_size."""
+    return (
+        image_size[0] >= min(display_size[0], source_size[0])
+        and image_size[1] >= min(display_size[1], source_size[1])
+    )
+
+
+class ImageLoader:
+    """
+    Decodes images for the main view on a worker thread.
+
+    Every request() bumps a generation counter, like the gallery's _load_generation;
+    the worker skips requests that are already stale before decoding and drops
+    results that became stale while decoding, so holding PageDown only decodes the
+    image the user stops at. Finished images, including the display-sized copy for
+    the canvas, are handed back to Tk through the event loop and passed to
+    on_loaded(result) on the Tk thread.
+
+    With a cache, decoded images and their display copies are kept, and
+    prefetch() warms it with neighbouring images while no request is waiting.
+
+    decode(path, display_size_for) may return a reduced draft that only covers the
+    display size display_size_for(source_size); a cached draft is decoded again when
+    a later request needs more pixels (larger window, deep zoom).
+    """
+
+    def __init__(
+        self,
+        widget,
+        decode: Callable[[str, Callable[[tuple[int, int]], tuple[int, int]]], tuple[Image.Image, tuple[int, int]]],
+        on_loaded: Callable[[LoadedImage], None],
+        cache: Optional[DecodedImageCache] = None,
+    ):
+        self.widget = widget
+        self.decode = decode
+        self.on_loaded = on_loaded
+        self.cache = cache
+
+        self._generation = 0
+        self._delivered_generation = 0
+        self._requests: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+
+        threading.Thread(target=self._worker, daemon=True).start()
+        self.widget.after(IMAGE_LOADER_POLL_MS, self._drain_results)
+
+    def request(self, path: str, canvas_size: tuple[int, int], zoom: float, detail: float = 1.0) -> int:
+        """
+        Requests an image; any earlier request still running becomes stale.
+
+        :param path: image file
+        :param canvas_size: canvas size the display image is fitted into
+        :param zoom: canvas zoom factor
+        :param detail: the decoded image must cover the display at zoom * detail (deep zoom)
+        """
+        self._generation += 1
+        self._requests.put((_LOAD, self._generation, [path], canvas_size, zoom, detail))
+        return self._generation
+
+    def prefetch(self, paths: list[str], canvas_size: tuple[int, int], zoom: float) -> None:
+        """
+        Decodes the given images into the cache, in order, while no request is waiting.
+        A later request or prefetch interrupts it.
+        """
+        if self.cache is None or not paths:
+            return
+        self._requests.put((_PREFETCH, self._generation, list(paths), canvas_size, zoom, 1.0))
+
+    def cancel(self) -> None:
+        """Makes every outstanding request stale."""
+        self._generation += 1
+        self._delivered_generation = self._generation
+
+    def is_pending(self) -> bool:
+        """True while the latest request has not been delivered yet."""
+        return self._delivered_generation != self._generation
+
+    def _worker(self) -> None:
+        while True:
+            kind, generation, paths, canvas_size, zoom, detail = self._requests.get()
+            if kind == _PREFETCH:
+                for path in paths:
+                    # anything newer in the queue wins over warming the cache
+                    if not self._requests.empty() or generation != self._generation:
+                        break
+                    try:
+                        self._load_entry(path, canvas_size, zoom, detail)
+                    except Exception:
+                        pass # reported when the image is actually requested
+                continue
+
+            if generation != self._generation:
+                continue
+
+            path = paths[0]
+            try:
+                entry, display_image = self._load_entry(path, canvas_size, zoom, detail, lambda: generation != self._generation)
+                file_size = os.stat(path).st_size
+            except Exception as e:
+                self._results.put(LoadedImage(generation, path, None, (0, 0), None, 0, e))
+                continue
+
+            if generation != self._generation:
+                continue
+
+            self._results.put(LoadedImage(generation, path, entry.image, entry.source_size, display_image, file_size, None, entry.complete))
+
+    def _load_entry(
+        self,
+        path: str,
+        canvas_size: tuple[int, int],
+        zoom: float,
+        detail: float = 1.0,
+        is_stale: Callable[[], bool] = lambda: False,
+    ) -> tuple[CachedImage, Optional[Image.Image]]:
+        def needed_size(source_size: tuple[int, int]) -> tuple[int, int]:
+            return fit_display_size(source_size, canvas_size, zoom * detail)[1]
+
+        entry = self.cache.get(path) if self.cache is not None else None
+        if entry is not None and not entry.complete and not covers_display(entry.image.size, entry.source_size, needed_size(entry.source_size)):
+            entry = None # draft too small for this display: decode more detail
+
+        if entry is None:
+            image, source_size = self.decode(path, needed_size)
+            # a reduced image that does not cover the request is the best there is (large-image proxy)
+            complete = image.size == source_size or not covers_display(image.size, source_size, needed_size(source_size))
+            if self.cache is not None:
+                entry = self.cache.put(path, image, source_size, complete)
+            else:
+                entry = CachedImage(image, source_size, complete)
+
+        if is_stale() or canvas_size[0] < 5 or canvas_size[1] < 5:
+            return entry, None
+
+        _, display_size = fit_display_size(entry.source_size, canvas_size, zoom)
+        display_image = entry.views.get(display_size)
+        if display_image is None:
+            if self.cache is not None:
+                display_image = self.cache.pyramid_level(path, entry, display_size).resize(display_size, Image.Resampling.LANCZOS)
+                self.cache.add_view(path, entry, display_image)
+            else:
+                display_image = entry.image.resize(display_size, Image.Resampling.LANCZOS)
+        return entry, display_image
+
+    def _drain_results(self) -> None:
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if result.generation == self._generation:
+                self._delivered_generation = result.generation
+                self.on_loaded(result)
+
+        if self.widget.winfo_exists():
+            self.widget.after(IMAGE_LOADER_POLL_MS, self._drain_results)
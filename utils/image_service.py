@@ -0,0 +1,197 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from PIL import Image
+
+from utils.image_cache import DecodedImageCache
+from utils.image_loader import covers_display, fit_display_size
+from utils.image_source import decoded_rgb_bytes, load_source_for_display, load_thumbnail_source
+
+IMAGE_SERVICE_RECENT = 2   # last decodes remembered for the other consumer (weakly, images are shared)
+
+
+def make_thumbnail(image: Image.Image, max_side: int) -> Image.Image:
+    """RGB copy of image fitted into max_side x max_side; the image itself is not modified."""
+    scale = min(1.0, max_side / image.width, max_side / image.height)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    thumb = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0) if size != image.size else image.copy()
+    return thumb if thumb.mode == "RGB" else thumb.convert("RGB")
+
+
+class ImageSourceService:
+    """
+    Decodes image files once for both the gallery and the main viewer.
+
+    Both go through load_source_for_display(), so a decode (JPEG draft covering the
+    display, full image or large-image proxy) serves either one:
+
+    - a file already being decoded by the other side is not decoded again; the
+      caller waits for that decode and shares the result
+    - the last IMAGE_SERVICE_RECENT decodes are remembered by weak reference, so the
+      gallery can make the thumbnail of an image the viewer just decoded
+      (on_decoded(path) tells it); they stay available only while the viewer or
+      the decoded-image cache holds them, so the service never keeps an image
+      alive outside the cache budget
+    - the gallery takes thumbnails of cached images from their pyramid levels, and
+      puts its decodes of images the viewer is about to show (set_wanted()) into
+      the decoded-image cache
+    - thumbnails of other images come from embedded thumbnails or a JPEG draft
+      (load_thumbnail_source()) and only fall back to a full decode
+
+    Thread-safe; decodes run on the calling (worker) thread.
+    """
+
+    def __init__(self, cache: Optional[DecodedImageCache], memory_cap_bytes: int):
+        """
+        :param cache: decoded-image cache of the viewer
+        :param memory_cap_bytes: decoded size above which the large-image proxy is used
+        """
+        self.cache = cache
+        self.memory_cap_bytes = memory_cap_bytes
+        self.on_decoded: Optional[Callable[[str], None]] = None
+
+        self._lock = threading.Lock()
+        self._decoding: dict[str, Future] = {}
+        # path -> (file signature, weak reference to the image, oriented source size)
+        self._recent: OrderedDict[str, tuple[Optional[tuple[int, int]], weakref.ref, tuple[int, int]]] = OrderedDict()
+        self._wanted: frozenset[str] = frozenset()
+        self._display: tuple[tuple[int, int], float] = ((1, 1), 1.0)
+
+    def set_display(self, canvas_size: tuple[int, int], zoom: float) -> None:
+        """Canvas of the viewer; decodes started by the gallery cover it, so the viewer can use them."""
+        self._display = (canvas_size, zoom)
+
+    def set_wanted(self, paths: list[str]) -> None:
+        """Images the viewer shows or prefetches next; gallery decodes of them are cached."""
+        self._wanted = frozenset(paths)
+
+    def display_size_for(self, source_size: tuple[int, int]) -> tuple[int, int]:
+        canvas_size, zoom = self._display
+        return fit_display_size(source_size, canvas_size, zoom)[1]
+
+    def load_for_display(
+        self,
+        path: str,
+        display_size_for: Optional[Callable[[tuple[int, int]], tuple[int, int]]] = None,
+    ) -> tuple[Image.Image, tuple[int, int]]:
+        """
+        Image for the viewer and the oriented source size, see load_source_for_display().
+
+        :param display_size_for: display size needed for a source size (default: the
+            canvas given to set_display()); a shared decode that does not cover it is
+            decoded again
+        """
+        needed = display_size_for or self.display_size_for
+        image, source_size = self._shared_decode(path, needed)
+        if decoded_rgb_bytes(source_size) <= self.memory_cap_bytes and not covers_display(image.size, source_size, needed(source_size)):
+            # shared draft made for a smaller display (e.g. before a deep zoom)
+            image, source_size = load_source_for_display(path, self.memory_cap_bytes, needed)
+            self._remember(path, (image, source_size))
+
+        if self.on_decoded is not None:
+            self.on_decoded(path)
+        return image, source_size
+
+    def load_for_thumbnail(self, path: str, max_side: int) -> Image.Image:
+        """Thumbnail of the oriented image fitted into max_side x max_side."""
+        entry = self.cache.get(path) if self.cache is not None else None
+        if entry is not None:
+            return make_thumbnail(self.cache.pyramid_level(path, entry, (max_side, max_side)), max_side)
+
+        shared = self._shared_result(path)
+        if shared is None and path not in self._wanted:
+            source = load_thumbnail_source(path, max_side)
+            if source is not None:
+                return make_thumbnail(source, max_side)
+
+        image, source_size = shared or self._shared_decode(path, self.display_size_for)
+        if self.cache is not None and path in self._wanted and self.cache.get(path) is None:
+            # the viewer shows or prefetches it next: spare it the decode
+            complete = image.size == source_size or not covers_display(image.size, source_size, self.display_size_for(source_size))
+            self.cache.put(path, image, source_size, complete)
+        return make_thumbnail(image, max_side)
+
+    def _shared_result(self, path: str) -> Optional[tuple[Image.Image, tuple[int, int]]]:
+        """A recent decode of path or, after waiting for it, the one that is running."""
+        signature = _signature(path)
+        with self._lock:
+            recent = self._recent_locked(path, signature)
+            if recent is not None:
+                return recent
+            future = self._decoding.get(path)
+
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def _shared_decode(
+        self,
+        path: str,
+        display_size_for: Callable[[tuple[int, int]], tuple[int, int]],
+    ) -> tuple[Image.Image, tuple[int, int]]:
+        """Decodes path, or shares a recent or running decode of it."""
+        signature = _signature(path)
+        with self._lock:
+            recent = self._recent_locked(path, signature)
+            if recent is not None:
+                return recent
+            future = self._decoding.get(path)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._decoding[path] = future
+
+        if not owner:
+            return future.result() # raises the error of the shared decode
+
+        try:
+            result = load_source_for_display(path, self.memory_cap_bytes, display_size_for)
+        except Exception as e:
+            with self._lock:
+                self._decoding.pop(path, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._decoding.pop(path, None)
+            self._remember_locked(path, result)
+        future.set_result(result)
+        return result
+
+    def _remember(self, path: str, result: tuple[Image.Image, tuple[int, int]]) -> None:
+        with self._lock:
+            self._remember_locked(path, result)
+
+    def _recent_locked(self, path: str, signature: Optional[tuple[int, int]]) -> Optional[tuple[Image.Image, tuple[int, int]]]:
+        """A remembered decode of the unchanged file that is still alive, or None."""
+        recent = self._recent.get(path)
+        if recent is None:
+            return None
+        image = recent[1]()
+        if image is None or recent[0] != signature:
+            del self._recent[path]
+            return None
+        self._recent.move_to_end(path)
+        return image, recent[2]
+
+    def _remember_locked(self, path: str, result: tuple[Image.Image, tuple[int, int]]) -> None:
+        image, source_size = result
+        self._recent[path] = (_signature(path), weakref.ref(image), source_size)
+        self._recent.move_to_end(path)
+        while len(self._recent) > IMAGE_SERVICE_RECENT:
+            self._recent.popitem(last=False)
+
+
+def _signature(path: str) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,493 @@
+import io
+import math
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from PIL import ExifTags, Image, ImageFile
+
+from utils.color_management import convert_to_srgb
+
+EXIF_ORIENTATION_TAG = 0x0112
+EXIF_SWAP_ORIENTATIONS = frozenset({5, 6, 7, 8})
+EXIF_TRANSPOSE_METHODS = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+LARGE_IMAGE_PROXY_MAX_SIDE = 4096   # longest side of the viewer proxy in large-image mode
+LARGE_IMAGE_BAND_ROWS = 256         # source rows decoded at once while building a proxy
+EMBEDDED_THUMBNAIL_ASPECT_TOLERANCE = 0.02  # embedded thumbnails with another aspect ratio are letterboxed
+LARGE_IMAGE_DECODE_LIMIT_FACTOR = 4 # full decodes are allowed up to this many times the memory cap (decoded RGB)
+
+# bytes per pixel of uncompressed raw tiles that can be decoded region by region
+_RAW_BYTES_PER_PIXEL = {
+    "L": 1,
+    "RGB": 3,
+    "RGBX": 4,
+    "RGBA": 4,
+    "CMYK": 4,
+}
+
+# Pillow's decompression-bomb limit is only lifted while open_unchecked() parses a
+# header, a TIFF allocates its buffer or a raw region is decoded; full decodes are
+# checked against _full_decode_limit() instead
+_BOMB_LIMIT_LOCK = threading.Lock()
+
+
+def decoded_rgb_bytes(size: tuple[int, int]) -> int:
+    """Memory needed to hold an image of the given size as decoded RGB."""
+    return int(size[0]) * int(size[1]) * 3
+
+
+def load_oriented_rgb(path: str, memory_cap_bytes: int = 0) -> Image.Image:
+    """
+    Loads an image and applies EXIF orientation correction (auto-rotate).
+    Returns an RGB image with correct orientation.
+
+    Every step replaces the previous buffer instead of copying it: the decoded
+    image is only converted if it is not RGB already, and the orientation is
+    applied afterwards, so at most one full-resolution buffer outlives each step.
+    Embedded ICC profiles are converted to sRGB.
+
+    :param memory_cap_bytes: large-image memory cap, raises the decompression-bomb
+        limit (see _full_decode_limit)
+    :type memory_cap_bytes: int
+    """
+    image = open_unchecked(path)
+    try:
+        _prepare_full_decode(image, memory_cap_bytes)
+        image.load()
+        # read the tag after loading (TIFF applies and drops it while loading)
+        # but before converting (converted TIFFs lose their tag directory)
+        orientation = image.getexif().get(EXIF_ORIENTATION_TAG, 1)
+        return _to_oriented_rgb(image, orientation, image.info.get("icc_profile"))
+    except Exception:
+        image.close()
+        raise
+
+
+def load_source_for_display(
+    path: str,
+    memory_cap_bytes: int,
+    display_size_for: Optional[Callable[[tuple[int, int]], tuple[int, int]]] = None,
+) -> tuple[Image.Image, tuple[int, int]]:
+    """
+    Loads the image used by the viewer and returns it with the oriented size of the source.
+
+    Sources whose decoded RGB size stays within memory_cap_bytes are loaded at full
+    resolution. Larger ones switch to large-image mode: only a proxy with a longest
+    side of LARGE_IMAGE_PROXY_MAX_SIDE is returned and the export later decodes the
+    crop region via load_source_region().
+
+    With display_size_for, JPEGs are decoded at the smallest draft scale that still
+    covers the display size it returns for the source size. Like the proxy, the draft
+    is smaller than the source, so the export decodes the crop region from the file.
+
+    Formats that have to be decoded in full (PNG, compressed TIFF) are refused with
+    DecompressionBombError above LARGE_IMAGE_DECODE_LIMIT_FACTOR x memory_cap_bytes
+    of decoded RGB, or Pillow's own limit if that is higher.
+
+    :param path: image path
+    :type path: str
+    :param memory_cap_bytes: decoded size above which the proxy is used; also sizes
+        the decompression-bomb limit
+    :type memory_cap_bytes: int
+    :param display_size_for: maps the oriented source size to the size the viewer needs
+    :type display_size_for: Callable[[tuple[int, int]], tuple[int, int]] | None
+    """
+    source_size = read_oriented_size(path)
+    if decoded_rgb_bytes(source_size) <= memory_cap_bytes:
+        if display_size_for is not None:
+            draft = _load_draft(path, display_size_for(source_size), memory_cap_bytes)
+            if draft is not None:
+                return draft, source_size
+        image = load_oriented_rgb(path, memory_cap_bytes)
+        return image, image.size
+
+    return _load_proxy(path, LARGE_IMAGE_PROXY_MAX_SIDE, memory_cap_bytes), source_size
+
+
+def load_thumbnail_source(path: str, min_side: int) -> Optional[Image.Image]:
+    """
+    Small oriented RGB image to make a gallery thumbnail from, without a full decode:
+    the embedded EXIF (JPEG) or HEIF thumbnail if it has the aspect ratio of the
+    image and a longer side of at least min_side, else a JPEG draft at the smallest
+    DCT scale (down to 1/8) covering min_side x min_side.
+    Returns None for other formats, which need a full decode.
+    """
+    image = _open_raw(path)
+    try:
+        orientation = image.info["ppc_orientation"]
+        icc_profile = image.info.get("icc_profile")
+
+        embedded = _embedded_thumbnail(image, min_side)
+        if embedded is not None:
+            image.close()
+            return _to_oriented_rgb(embedded, orientation, icc_profile)
+
+        if image.format != "JPEG":
+            image.close()
+            return None
+        image.draft("RGB", (min_side, min_side))
+        _check_full_decode(image.size)
+        image.load()
+        return _to_oriented_rgb(image, orientation, icc_profile)
+    except Exception:
+        image.close()
+        raise
+
+
+def read_oriented_size(path: str) -> tuple[int, int]:
+    """Size of the image after EXIF orientation, read from the file header only."""
+    with open_unchecked(path) as image:
+        orientation, raw_size = _read_orientation_and_raw_size(image)
+    return _oriented_size(raw_size, orientation)
+
+
+def open_unchecked(path: str) -> ImageFile.ImageFile:
+    """
+    Image.open() without Pillow's decompression-bomb check, for header reads and the
+    large-image paths that never decode the whole image (JPEG drafts, raw regions).
+    The limit is lifted while the header is parsed only and stays in place for every
+    other decode; callers that end up decoding the whole image check the size with
+    _check_full_decode() or _prepare_full_decode() first.
+    """
+    with _bomb_limit_lifted():
+        return Image.open(path)
+
+
+def load_source_region(
+    path: str,
+    box: tuple[int, int, int, int],
+    size: tuple[int, int],
+    memory_cap_bytes: int = 0,
+) -> Image.Image:
+    """
+    Decodes only the given region of the source and returns it resized to size.
+
+    The box is given in oriented (displayed) source coordinates. Uncompressed TIFF
+    strips and tiles are read for the box only, JPEGs are decoded at the smallest
+    draft scale that still covers the requested size. Other formats fall back to a
+    full decode.
+
+    :param path: image path
+    :type path: str
+    :param box: region (x1, y1, x2, y2) in oriented source coordinates
+    :type box: tuple[int, int, int, int]
+    :param size: size of the returned region
+    :type size: tuple[int, int]
+    :param memory_cap_bytes: large-image memory cap, sizes the decompression-bomb
+        limit of the full decode fallback
+    :type memory_cap_bytes: int
+    """
+    image = _open_raw(path)
+    try:
+        orientation = image.info["ppc_orientation"]
+        raw_box = _oriented_box_to_raw(box, orientation, image.size)
+        raw_target = (size[1], size[0]) if orientation in EXIF_SWAP_ORIENTATIONS else size
+
+        if image.format == "JPEG":
+            box_w = raw_box[2] - raw_box[0]
+            box_h = raw_box[3] - raw_box[1]
+            reduction = min(box_w / raw_target[0], box_h / raw_target[1])
+            full_w, full_h = image.size
+            if reduction >= 2:
+                image.draft("RGB", (math.ceil(full_w / reduction), math.ceil(full_h / reduction)))
+            _check_full_decode(image.size, memory_cap_bytes)
+            sx = image.size[0] / full_w
+            sy = image.size[1] / full_h
+            raw_box = (raw_box[0] * sx, raw_box[1] * sy, raw_box[2] * sx, raw_box[3] * sy)
+        elif _supports_raw_regions(image):
+            x1, y1, x2, y2 = raw_box
+            _decode_raw_region(image, (math.floor(x1), math.floor(y1), math.ceil(x2), math.ceil(y2)))
+            raw_box = (x1 - math.floor(x1), y1 - math.floor(y1), x2 - math.floor(x1), y2 - math.floor(y1))
+        else:
+            _prepare_full_decode(image, memory_cap_bytes)
+
+        icc_profile = image.info.get("icc_profile")
+        rgb = image if image.mode in ("RGB", "CMYK", "L") else image.convert("RGB")
+        region = rgb.resize(raw_target, Image.Resampling.LANCZOS, box=raw_box)
+        return _to_oriented_rgb(region, orientation, icc_profile)
+    finally:
+        image.close()
+
+
+# -----------------------
+# internals
+# -----------------------
+def _read_orientation_and_raw_size(image: Image.Image) -> tuple[int, tuple[int, int]]:
+    orientation = image.getexif().get(EXIF_ORIENTATION_TAG, 1)
+    # TIFF reports the already oriented size and keeps the stored size separately
+    raw_size = getattr(image, "_tile_size", None) or image.size
+    return orientation, (int(raw_size[0]), int(raw_size[1]))
+
+
+def _oriented_size(raw_size: tuple[int, int], orientation: int) -> tuple[int, int]:
+    if orientation in EXIF_SWAP_ORIENTATIONS:
+        return (raw_size[1], raw_size[0])
+    return raw_size
+
+
+@contextmanager
+def _bomb_limit_lifted() -> Iterator[None]:
+    with _BOMB_LIMIT_LOCK:
+        limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+        try:
+            yield
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+
+
+def _full_decode_limit(memory_cap_bytes: int) -> Optional[int]:
+    """
+    Largest image (in pixels) that is decoded in full: Pillow's decompression-bomb
+    limit, raised to LARGE_IMAGE_DECODE_LIMIT_FACTOR x the memory cap of decoded RGB,
+    so large_image_memory_mb decides which scans open. None if Pillow's is disabled.
+    """
+    if Image.MAX_IMAGE_PIXELS is None:
+        return None
+    return max(2 * Image.MAX_IMAGE_PIXELS, LARGE_IMAGE_DECODE_LIMIT_FACTOR * memory_cap_bytes // 3)
+
+
+def _check_full_decode(size: tuple[int, int], memory_cap_bytes: int = 0) -> None:
+    """Decompression-bomb check for an image opened with open_unchecked()."""
+    limit = _full_decode_limit(memory_cap_bytes)
+    pixels = size[0] * size[1]
+    if limit is None or pixels <= limit:
+        return
+    raise Image.DecompressionBombError(
+        f"Image size ({pixels} pixels) exceeds the limit of {limit} pixels for a full decode. "
+        f"Raise large_image_memory_mb in settings.ini to open it "
+        f"(the limit is {LARGE_IMAGE_DECODE_LIMIT_FACTOR}x that size as decoded RGB)."
+    )
+
+
+def _prepare_full_decode(image: ImageFile.ImageFile, memory_cap_bytes: int) -> None:
+    """
+    Checks an image opened with open_unchecked() before it is decoded in full.
+    TIFF repeats Pillow's check when it allocates its buffer on load, so the buffer
+    is allocated here with the limit lifted; the decode itself runs outside the lock.
+    """
+    _check_full_decode(image.size, memory_cap_bytes)
+    if image.format == "TIFF":
+        with _bomb_limit_lifted():
+            image.load_prepare()
+
+
+def _embedded_thumbnail(image: ImageFile.ImageFile, min_side: int) -> Optional[Image.Image]:
+    """Embedded preview of a JPEG (EXIF IFD1) or HEIF file in stored geometry, or None."""
+    thumb: Optional[Image.Image] = None
+    try:
+        if image.format == "JPEG" and "exif" in image.info:
+            data = image.info["exif"]
+            if data.startswith(b"Exif\x00\x00"):
+                data = data[6:]
+            exif = Image.Exif()
+            exif.load(data)
+            ifd1 = exif.get_ifd(ExifTags.IFD.IFD1)
+            offset, length = ifd1.get(0x0201), ifd1.get(0x0202) # JPEGInterchangeFormat(Length)
+            if offset and length and offset + length <= len(data):
+                thumb = Image.open(io.BytesIO(data[offset:offset + length]))
+                thumb.load()
+        elif image.format == "HEIF":
+            from pillow_heif import thumbnail as heif_thumbnail
+            candidate = heif_thumbnail(image, min_box=min_side)
+            if candidate is not image:
+                thumb = candidate
+                thumb.load()
+    except Exception:
+        return None
+
+    if thumb is None:
+        return None
+    raw_aspect = image.size[0] / image.size[1]
+    thumb_aspect = thumb.size[0] / thumb.size[1]
+    if max(thumb.size) < min_side or abs(thumb_aspect - raw_aspect) > EMBEDDED_THUMBNAIL_ASPECT_TOLERANCE * raw_aspect:
+        thumb.close()
+        return None
+    return thumb
+
+
+def _open_raw(path: str) -> ImageFile.ImageFile:
+    """
+    Opens the image in stored (raw) geometry, with orientation left to the caller.
+    The orientation is moved to info["ppc_orientation"] and removed from the tag
+    directory, so format plugins (TIFF) do not rotate partially decoded data.
+    Opened with open_unchecked(): callers decoding the whole image check its size.
+    """
+    image = open_unchecked(path)
+    orientation, raw_size = _read_orientation_and_raw_size(image)
+    image.info["ppc_orientation"] = orientation
+
+    exif = image.getexif()
+    if EXIF_ORIENTATION_TAG in exif:
+        del exif[EXIF_ORIENTATION_TAG]
+    tag_v2 = getattr(image, "tag_v2", None)
+    if tag_v2 is not None and EXIF_ORIENTATION_TAG in tag_v2:
+        del tag_v2[EXIF_ORIENTATION_TAG]
+    image._size = raw_size
+    return image
+
+
+def _to_oriented_rgb(image: Image.Image, orientation: int, icc_profile: Optional[bytes] = None) -> Image.Image:
+    if image.mode != "RGB" or icc_profile:
+        converted = convert_to_srgb(image, icc_profile)
+        if converted is not image:
+            image.close()
+            image = converted
+
+    transpose_method = EXIF_TRANSPOSE_METHODS.get(orientation)
+    if transpose_method is not None:
+        transposed = image.transpose(transpose_method)
+        image.close()
+        image = transposed
+
+    return image
+
+
+def _oriented_box_to_raw(box, orientation: int, raw_size: tuple[int, int]) -> tuple[float, float, float, float]:
+    """Maps a box in oriented coordinates back onto the stored image."""
+    w, h = raw_size
+    x1, y1, x2, y2 = box
+    mapping = {
+        1: lambda x, y: (x, y),
+        2: lambda x, y: (w - x, y),
+        3: lambda x, y: (w - x, h - y),
+        4: lambda x, y: (x, h - y),
+        5: lambda x, y: (y, x),
+        6: lambda x, y: (y, h - x),
+        7: lambda x, y: (w - y, h - x),
+        8: lambda x, y: (w - y, x),
+    }.get(orientation, lambda x, y: (x, y))
+
+    ax, ay = mapping(x1, y1)
+    bx, by = mapping(x2, y2)
+    return (min(ax, bx), min(ay, by), max(ax, bx), max(ay, by))
+
+
+def _raw_tile_args(tile) -> Optional[tuple[str, int, int]]:
+    # tiles are read by index: plain tuples before Pillow 11.1, named tuples since
+    if len(tile) < 4 or tile[0] != "raw":
+        return None
+    args = tile[3]
+    if isinstance(args, str):
+        args = (args, 0, 1)
+    if not isinstance(args, tuple) or len(args) < 3 or args[0] not in _RAW_BYTES_PER_PIXEL or args[2] != 1:
+        return None
+    return (args[0], int(args[1]), 1)
+
+
+def _supports_raw_regions(image: Image.Image) -> bool:
+    tiles = getattr(image, "tile", None)
+    if not tiles or getattr(image, "use_load_libtiff", False) or not hasattr(image, "_size"):
+        return False
+    return all(_raw_tile_args(tile) is not None for tile in tiles)
+
+
+def _decode_raw_region(image: ImageFile.ImageFile, box: tuple[int, int, int, int]) -> Image.Image:
+    """
+    Restricts the tile list of an unopened raw image to the box and decodes it.
+    Every tile is clipped to the box by moving its file offset and keeping the
+    stored row stride, so only the bytes inside the box are read.
+    """
+    x1, y1, x2, y2 = box
+    tiles = []
+    for tile in image.tile:
+        raw_args = _raw_tile_args(tile)
+        assert raw_args is not None
+        rawmode, stride, _ystep = raw_args
+        bpp = _RAW_BYTES_PER_PIXEL[rawmode]
+        tx1, ty1, tx2, ty2 = tile[1]
+        stride = stride or (tx2 - tx1) * bpp
+
+        ix1, iy1 = max(tx1, x1), max(ty1, y1)
+        ix2, iy2 = min(tx2, x2), min(ty2, y2)
+        if ix1 >= ix2 or iy1 >= iy2:
+            continue
+
+        offset = tile[2] + (iy1 - ty1) * stride + (ix1 - tx1) * bpp
+        tiles.append(_make_tile("raw", (ix1 - x1, iy1 - y1, ix2 - x1, iy2 - y1), offset, (rawmode, stride, 1)))
+
+    image.tile = tiles
+    image._size = (x2 - x1, y2 - y1)
+    if hasattr(image, "_tile_size"):
+        image._tile_size = image._size
+    with _bomb_limit_lifted(): # only the region is allocated (TIFF checks it on load)
+        image.load()
+    return image
+
+
+def _make_tile(codec_name: str, extents: tuple[int, int, int, int], offset: int, args: tuple):
+    # Pillow >= 11.1 reads tile fields by name while loading, older versions expect tuples
+    tile_type = getattr(ImageFile, "_Tile", None)
+    if tile_type is None:
+        return (codec_name, extents, offset, args)
+    return tile_type(codec_name, extents, offset, args)
+
+
+def _load_draft(path: str, size: tuple[int, int], memory_cap_bytes: int = 0) -> Optional[Image.Image]:
+    """
+    Decodes a JPEG at the smallest DCT scale (1/1 ... 1/8) that covers size (oriented).
+    Returns None for other formats, which have no reduced decoding.
+    """
+    image = _open_raw(path)
+    try:
+        if image.format != "JPEG":
+            image.close()
+            return None
+        orientation = image.info["ppc_orientation"]
+        raw_target = (size[1], size[0]) if orientation in EXIF_SWAP_ORIENTATIONS else size
+        image.draft("RGB", (max(1, raw_target[0]), max(1, raw_target[1])))
+        _check_full_decode(image.size, memory_cap_bytes)
+        image.load()
+        return _to_oriented_rgb(image, orientation, image.info.get("icc_profile"))
+    except Exception:
+        image.close()
+        raise
+
+
+def _load_proxy(path: str, max_side: int, memory_cap_bytes: int = 0) -> Image.Image:
+    """
+    Builds the bounded viewer proxy of an oversized source.
+    JPEGs are decoded at a reduced draft scale, uncompressed TIFFs are decoded in
+    bands of LARGE_IMAGE_BAND_ROWS rows that are reduced right away. Other formats
+    have to be decoded once at full size (up to _full_decode_limit()), but only the
+    proxy is kept.
+    """
+    image = _open_raw(path)
+    try:
+        orientation = image.info["ppc_orientation"]
+        raw_w, raw_h = image.size
+        scale = min(1.0, max_side / max(raw_w, raw_h))
+        proxy_size = (max(1, round(raw_w * scale)), max(1, round(raw_h * scale)))
+
+        if image.format != "JPEG" and _supports_raw_regions(image):
+            factor = max(1, int(1 / scale))
+            band_rows = max(1, LARGE_IMAGE_BAND_ROWS // factor) * factor
+            reduced_mode = image.mode if image.mode in ("RGB", "CMYK", "L") else "RGB"
+            reduced = Image.new(reduced_mode, (math.ceil(raw_w / factor), math.ceil(raw_h / factor)))
+            for y in range(0, raw_h, band_rows):
+                with _open_raw(path) as band_source:
+                    band = _decode_raw_region(band_source, (0, y, raw_w, min(raw_h, y + band_rows)))
+                    band_reduced = band if band.mode == reduced_mode else band.convert(reduced_mode)
+                    reduced.paste(band_reduced.reduce(factor), (0, y // factor))
+            proxy = reduced.resize(proxy_size, Image.Resampling.LANCZOS)
+            reduced.close()
+        else:
+            if image.format == "JPEG":
+                # thumbnail() alone asks for twice the size and often skips the draft
+                image.draft("RGB", proxy_size)
+            _prepare_full_decode(image, memory_cap_bytes)
+            image.thumbnail(proxy_size, Image.Resampling.LANCZOS)
+            proxy = image.copy()
+
+        return _to_oriented_rgb(proxy, orientation, image.info.get("icc_profile"))
+    finally:
+        image.close()
@@ -0,0 +1,112 @@
+from typing import Any
+
+from PIL import Image, ImageStat
+
+LEVELS_PROXY_SIZE = 256         # longest side of the image the statistics are computed on
+LEVELS_HISTOGRAM_BINS = 64      # bins kept per histogram (4 levels each)
+LEVELS_CLIP_FRACTION = 0.01     # share of darkest/brightest pixels ignored for the black/white point
+
+# auto levels targets, applied as corrections on top of the device defaults
+AUTO_LEVELS_TARGET_MEAN = 118.0         # mean luminance
+AUTO_LEVELS_TARGET_SPREAD = 230.0       # distance between black and white point
+AUTO_LEVELS_TARGET_SATURATION = 90.0    # mean HSV saturation (0..255)
+AUTO_LEVELS_LIMITS = {
+    "brightness": (0.75, 1.5),
+    "contrast": (0.8, 1.6),
+    "saturation": (0.8, 1.5),
+}
+AUTO_LEVELS_VALUE_RANGE = (0.1, 2.0)    # sidecar values outside 0..2 are reset on load
+AUTO_LEVELS_STEP = 0.05                 # slider resolution
+
+
+def compute_image_stats(image: Image.Image) -> dict[str, Any]:
+    """
+    Computes luminance and channel histograms plus mean saturation of an image.
+    Works on a proxy of at most LEVELS_PROXY_SIZE px, so any already downscaled
+    image (display image, thumbnail) is a fine input and no decode is needed.
+    The result is JSON-serializable for the metadata cache.
+    """
+    scale = min(1.0, LEVELS_PROXY_SIZE / max(image.size))
+    proxy_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    proxy = image if proxy_size == image.size else image.resize(proxy_size, Image.Resampling.BILINEAR)
+    if proxy.mode != "RGB":
+        proxy = proxy.convert("RGB")
+
+    channel_hist = proxy.histogram()
+    saturation = ImageStat.Stat(proxy.convert("HSV").getchannel("S")).mean[0]
+
+    return {
+        "pixels": proxy.width * proxy.height,
+        "luma": _rebin(proxy.convert("L").histogram()),
+        "rgb": [_rebin(channel_hist[band * 256:(band + 1) * 256]) for band in range(3)],
+        "saturation": round(saturation, 2),
+    }
+
+
+def histogram_level(hist: list[int], fraction: float) -> float:
+    """Level (0..255) below which the given fraction of the histogram lies."""
+    total = sum(hist)
+    if total <= 0:
+        return 0.0
+
+    bin_width = 256 / len(hist)
+    threshold = fraction * total
+    accumulated = 0
+    for index, count in enumerate(hist):
+        if count and accumulated + count >= threshold:
+            inside = (threshold - accumulated) / count
+            return (index + inside) * bin_width
+        accumulated += count
+    return 255.0
+
+
+def histogram_mean(hist: list[int]) -> float:
+    total = sum(hist)
+    if total <= 0:
+        return 0.0
+
+    bin_width = 256 / len(hist)
+    return sum((index + 0.5) * bin_width * count for index, count in enumerate(hist)) / total
+
+
+def auto_levels_from_stats(stats: dict[str, Any], device_defaults: dict[str, float]) -> dict[str, float]:
+    """
+    Derives brightness, contrast and saturation from cached image statistics.
+
+    The device defaults stay the baseline (they compensate the panel), and the
+    image only contributes a bounded correction: brightness moves the mean
+    luminance towards AUTO_LEVELS_TARGET_MEAN, contrast stretches the 1%..99%
+    range towards AUTO_LEVELS_TARGET_SPREAD and saturation moves the mean
+    saturation towards AUTO_LEVELS_TARGET_SATURATION.
+
+    :param stats: result of compute_image_stats()
+    :param device_defaults: enhancer defaults of the target device
+    """
+    luma = stats["luma"]
+    mean = max(1.0, histogram_mean(luma))
+    black = histogram_level(luma, LEVELS_CLIP_FRACTION)
+    white = histogram_level(luma, 1.0 - LEVELS_CLIP_FRACTION)
+    saturation = max(1.0, float(stats.get("saturation", AUTO_LEVELS_TARGET_SATURATION)))
+
+    brightness_correction = AUTO_LEVELS_TARGET_MEAN / mean
+    # the brightness step scales the range as well, so stretch what is left of it
+    spread = max(1.0, (white - black) * brightness_correction)
+    corrections = {
+        "brightness": brightness_correction,
+        "contrast": AUTO_LEVELS_TARGET_SPREAD / spread,
+        "saturation": AUTO_LEVELS_TARGET_SATURATION / saturation,
+    }
+
+    values = {}
+    for name, correction in corrections.items():
+        low, high = AUTO_LEVELS_LIMITS[name]
+        value = float(device_defaults.get(name, 1.0)) * max(low, min(high, correction))
+        value = max(AUTO_LEVELS_VALUE_RANGE[0], min(AUTO_LEVELS_VALUE_RANGE[1], value))
+        values[name] = round(round(value / AUTO_LEVELS_STEP) * AUTO_LEVELS_STEP, 2)
+
+    return values
+
+
+def _rebin(hist: list[int]) -> list[int]:
+    step = len(hist) // LEVELS_HISTOGRAM_BINS
+    return [sum(hist[i:i + step]) for i in range(0, len(hist), step)]
@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+from typing import Any, Optional
+
+METADATA_CACHE_FILENAME = ".ppcrop_cache.json"
+METADATA_CACHE_VERSION = 1
+
+
+class MetadataCache:
+    """
+    Per-folder store for derived image metadata that is expensive to compute but
+    can always be rebuilt (histogram statistics, crop suggestions, ...).
+
+    Entries are keyed by file name and carry the size and mtime of the image, so
+    they are dropped as soon as the file changes. The cache lives next to the
+    images but is kept apart from the sidecars, which mark an image as processed.
+    Access is thread-safe; worker threads may fill it while the UI reads it.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.path = os.path.join(folder, METADATA_CACHE_FILENAME)
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, image_path: str, key: str, default: Any = None) -> Any:
+        signature = self._signature(image_path)
+        with self._lock:
+            entry = self._entries.get(os.path.basename(image_path))
+            if entry is None or entry.get("signature") != signature:
+                return default
+            return entry.get("data", {}).get(key, default)
+
+    def peek(self, image_path: str, key: str, default: Any = None) -> Any:
+        """
+        Like get(), but without checking that the file is unchanged (no stat), for
+        showing the state of the last session right away. Revalidate with get().
+        """
+        with self._lock:
+            entry = self._entries.get(os.path.basename(image_path))
+            if entry is None:
+                return default
+            return entry.get("data", {}).get(key, default)
+
+    def set(self, image_path: str, key: str, value: Any) -> None:
+        signature = self._signature(image_path)
+        if signature is None:
+            return
+
+        name = os.path.basename(image_path)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.get("signature") != signature:
+                entry = {"signature": signature, "data": {}}
+                self._entries[name] = entry
+            entry["data"][key] = value
+            self._dirty = True
+
+    def save(self) -> Optional[str]:
+        with self._lock:
+            if not self._dirty:
+                return None
+            payload = {"version": METADATA_CACHE_VERSION, "entries": dict(self._entries)}
+            self._dirty = False
+
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+                json.dump(payload, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+
+            print(f"✔ Metadata cache saved: {self.path}")
+            return self.path
+        except Exception as e:
+            print(f"[WARN] Unable to save metadata cache: {e}")
+            return None
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception as e:
+            print(f"[WARN] Ignoring unreadable metadata cache: {e}")
+            return
+
+        if isinstance(payload, dict) and payload.get("version") == METADATA_CACHE_VERSION and isinstance(payload.get("entries"), dict):
+            self._entries = payload["entries"]
+
+    def _signature(self, image_path: str) -> Optional[list[int]]:
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
@@ -6,6 +6,7 @@ from geopy.geocoders import Nominatim
 from PIL import Image, ExifTags
 from utils.textoverlay_defaults import TEXT_OVERLAY_DEFAULTS, FONT_DIVISOR_MIN, FONT_DIVISOR_MAX
 from utils.control_definitions import build_textoverlay_control_definitions
+from utils.image_source import open_unchecked
 from utils.keybinds import bind_toggle_keys
 from utils.tooltip import Hovertip
 
@@ -67,6 +68,7 @@ class CanvasTextOverlay:
         # Font configuration
         self.font_face = "Segoe UI"
         self.font = font.Font(family=self.font_face, size=10)
+        self._font_pts = 10 # last size given to Tk; reconfiguring the font relayouts the text
 
         # --- Controls ---
         self._create_controls()
@@ -597,7 +599,10 @@ class CanvasTextOverlay:
 
     def set_font_divisor(self, divisor):
         """Set relative divisor: target text px = min(target_w,target_h)/divisor."""
-        self.font_divisor = self._clamp_font_divisor(divisor)
+        divisor = self._clamp_font_divisor(divisor)
+        if divisor == self.font_divisor:
+            return
+        self.font_divisor = divisor
         if hasattr(self, 'slider'):
             self._set_slider_from_divisor(self.font_divisor)
 
@@ -680,7 +685,7 @@ class CanvasTextOverlay:
         has_exif_data = False
 
         try:
-            with Image.open(image_path) as image:
+            with open_unchecked(image_path) as image: # header only
                 exif_data = image.getexif()
                 year = self._get_exif_year(exif_data)
                 has_exif_data = self._has_geolocation_exif(exif_data)
@@ -846,7 +851,9 @@ class CanvasTextOverlay:
             # Convert absolute preview pixel size to font points using system DPI
             pts_float = self.font_preview_height / self.system_dpi_scale
             pts = int(max(self.min_font_size, min(self.max_font_size, round(pts_float))))
-            self.font.configure(size=pts)
+            if pts != self._font_pts:
+                self._font_pts = pts
+                self.font.configure(size=pts)
             # print(f"Canvas font set to: {pts}pt (preview_px {self.font_preview_height:.2f}, sys_dpi {self.system_dpi_scale:.3f})")
 
     def render_text_overlay_on_image(self, image):
@@ -855,81 +862,26 @@ class CanvasTextOverlay:
         All sizes and positions are recalculated exclusively
         from the image dimensions.
         """
+        return render_text_overlay(image, self.snapshot_render_state())
 
-        if not self.show_var.get():
-            return image
-
-        from PIL import ImageDraw, ImageFont
-
-        draw = ImageDraw.Draw(image)
-        img_width, img_height = image.size
-
-        # --------------------------------------------------
-        # Font scaling (image-only): use absolute final image pixel height.
-        # --------------------------------------------------
-        image_font_px = int(max(self.min_font_size, min(self.max_font_size, round(self.font_target_height * self.image_dpi_scale))))
-        print(f"Font scaling: target_px={self.font_target_height:.2f}, final_px={image_font_px}, image_dpi_scale={self.image_dpi_scale:.3f}")
-
-        font = ImageFont.truetype(self.pil_font_path, image_font_px)
-
-        # --------------------------------------------------
-        # Text and colors
-        # --------------------------------------------------
-        text = self.text_var.get()
-        text_color = self.text_color
-        bg_color = self.bg_color
-
-        # --------------------------------------------------
-        # Padding (derived from font size)
-        # --------------------------------------------------
-        padding_x = int(self.padding_x * self.image_dpi_scale)
-        padding_y = int(self.padding_y * self.image_dpi_scale)
-
-        # --------------------------------------------------
-        # Measure text
-        # --------------------------------------------------
-        bbox = draw.textbbox((0, 0), text, font=font)
-
-        left, top, right, bottom = bbox
-        ascent, descent = font.getmetrics()
-
-        text_width  = right - left
-        text_height = ascent + descent
-
-        box_width = text_width + 2 * padding_x
-        box_height = text_height + 2 * padding_y
-
-        # --------------------------------------------------
-        # Bottom-right anchoring (image space)
-        # --------------------------------------------------
-        x1 = img_width
-        y1 = img_height
-        x0 = x1 - box_width
-        y0 = y1 - box_height
-
-        # --------------------------------------------------
-        # Draw background
-        # --------------------------------------------------
-        draw.rectangle((x0, y0, x1, y1), fill=bg_color)
-
-        # --------------------------------------------------
-        # Draw text
-        # --------------------------------------------------
-        text_x = x0 + padding_x - left
-        text_y = y0 + padding_y
-
-        draw.text(
-            (
-                text_x,
-                text_y + ascent
-            ),
-            text,
-            fill=text_color,
-            font=font,
-            anchor="ls"
-        )
-
-        return image
+    def snapshot_render_state(self) -> dict[str, Any]:
+        """
+        Plain copy of everything render_text_overlay() needs, so the overlay can be
+        rendered later on a worker thread while the widgets already show the next image.
+        """
+        return {
+            "show": bool(self.show_var.get()),
+            "text": self.text_var.get(),
+            "text_color": self.text_color,
+            "bg_color": self.bg_color,
+            "font_target_height": self.font_target_height,
+            "image_dpi_scale": self.image_dpi_scale,
+            "min_font_size": self.min_font_size,
+            "max_font_size": self.max_font_size,
+            "padding_x": self.padding_x,
+            "padding_y": self.padding_y,
+            "pil_font_path": self.pil_font_path,
+        }
 
     # ----------------------
     # Callback trigger
@@ -950,3 +902,86 @@ class CanvasTextOverlay:
                 "font_divisor": self.font_divisor,
                 "image_dpi_scale": self.image_dpi_scale,
             })
+
+
+def render_text_overlay(image, state: dict[str, Any]):
+    """
+    Render a text overlay state (see CanvasTextOverlay.snapshot_render_state)
+    onto a PIL Image. All sizes and positions are recalculated exclusively
+    from the image dimensions. Touches no Tk state, so it is thread-safe.
+    """
+
+    if not state["show"]:
+        return image
+
+    from PIL import ImageDraw, ImageFont
+
+    draw = ImageDraw.Draw(image)
+    img_width, img_height = image.size
+
+    # --------------------------------------------------
+    # Font scaling (image-only): use absolute final image pixel height.
+    # --------------------------------------------------
+    image_font_px = int(max(state["min_font_size"], min(state["max_font_size"], round(state["font_target_height"] * state["image_dpi_scale"]))))
+    # print(f"Font scaling: target_px={state['font_target_height']:.2f}, final_px={image_font_px}, image_dpi_scale={state['image_dpi_scale']:.3f}")
+
+    font = ImageFont.truetype(state["pil_font_path"], image_font_px)
+
+    # --------------------------------------------------
+    # Text and colors
+    # --------------------------------------------------
+    text = state["text"]
+    text_color = state["text_color"]
+    bg_color = state["bg_color"]
+
+    # --------------------------------------------------
+    # Padding (derived from font size)
+    # --------------------------------------------------
+    padding_x = int(state["padding_x"] * state["image_dpi_scale"])
+    padding_y = int(state["padding_y"] * state["image_dpi_scale"])
+
+    # --------------------------------------------------
+    # Measure text
+    # --------------------------------------------------
+    bbox = draw.textbbox((0, 0), text, font=font)
+
+    left, top, right, bottom = bbox
+    ascent, descent = font.getmetrics()
+
+    text_width  = right - left
+    text_height = ascent + descent
+
+    box_width = text_width + 2 * padding_x
+    box_height = text_height + 2 * padding_y
+
+    # --------------------------------------------------
+    # Bottom-right anchoring (image space)
+    # --------------------------------------------------
+    x1 = img_width
+    y1 = img_height
+    x0 = x1 - box_width
+    y0 = y1 - box_height
+
+    # --------------------------------------------------
+    # Draw background
+    # --------------------------------------------------
+    draw.rectangle((x0, y0, x1, y1), fill=bg_color)
+
+    # --------------------------------------------------
+    # Draw text
+    # --------------------------------------------------
+    text_x = x0 + padding_x - left
+    text_y = y0 + padding_y
+
+    draw.text(
+        (
+            text_x,
+            text_y + ascent
+        ),
+        text,
+        fill=text_color,
+        font=font,
+        anchor="ls"
+    )
+
+    return image
@@ -0,0 +1,202 @@
+import io
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from PIL import Image
+
+THUMBNAIL_CACHE_PACK = "thumbnails.pack"
+THUMBNAIL_CACHE_INDEX = "thumbnails.idx.json"
+THUMBNAIL_CACHE_VERSION = 1
+THUMBNAIL_CACHE_QUALITY = 90   # JPEG quality of the stored thumbnails (~3 KB each)
+
+
+class ThumbnailCache:
+    """
+    Persistent gallery thumbnails: one pack file of JPEG-encoded thumbnails plus a
+    JSON index of (offset, length) per image.
+
+    Entries are keyed by path and thumbnail size and carry the size and mtime of
+    the image, so a changed file is a miss and its entry is dropped. New
+    thumbnails are appended to the pack; the index is written by save(). Beyond
+    max_bytes, the least recently used entries are dropped from the index, and
+    save() rewrites the pack once more than half of it is unused.
+    Access is thread-safe; the gallery fills it from its worker threads.
+    """
+
+    def __init__(self, folder: str, max_bytes: int):
+        self.pack_path = os.path.join(folder, THUMBNAIL_CACHE_PACK)
+        self.index_path = os.path.join(folder, THUMBNAIL_CACHE_INDEX)
+        self.max_bytes = max_bytes
+
+        # key -> [offset, length, size, mtime_ns, last_used]
+        self._entries: dict[str, list[int]] = {}
+        self._pack_end = 0
+        self._live_bytes = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def get_many(self, paths: list[str], thumb_size: int) -> dict[str, Image.Image]:
+        """
+        Cached thumbnails of the given images that are still valid, read from the pack
+        in one sequential pass (sorted by offset).
+        The pack is read under the lock, so save() cannot compact it meanwhile; the
+        JPEGs are decoded after releasing it.
+        """
+        now = int(time.time())
+        found: list[tuple[str, list[int], bytes]] = []
+        with self._lock:
+            wanted: list[tuple[int, str, list[int]]] = []
+            for path in paths:
+                key = _key(path, thumb_size)
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if _signature(path) != (entry[2], entry[3]):
+                    self._drop(key)
+                    continue
+                entry[4] = now
+                wanted.append((entry[0], path, entry))
+            if not wanted:
+                return {}
+
+            self._dirty = True
+            wanted.sort(key=lambda item: item[0])
+            try:
+                with open(self.pack_path, "rb") as f:
+                    for offset, path, entry in wanted:
+                        f.seek(offset)
+                        found.append((path, entry, f.read(entry[1])))
+            except OSError as e:
+                print(f"[WARN] Unable to read thumbnail cache: {e}")
+
+        thumbs: dict[str, Image.Image] = {}
+        for path, entry, data in found:
+            try:
+                with Image.open(io.BytesIO(data)) as thumb:
+                    thumbs[path] = thumb.convert("RGB")
+            except Exception:
+                key = _key(path, thumb_size)
+                with self._lock:
+                    if self._entries.get(key) is entry: # not replaced meanwhile
+                        self._drop(key)
+        return thumbs
+
+    def put(self, path: str, thumb: Image.Image, thumb_size: int) -> None:
+        signature = _signature(path)
+        if signature is None:
+            return
+
+        buffer = io.BytesIO()
+        thumb.convert("RGB").save(buffer, "JPEG", quality=THUMBNAIL_CACHE_QUALITY)
+        data = buffer.getvalue()
+
+        key = _key(path, thumb_size)
+        with self._lock:
+            try:
+                with open(self.pack_path, "ab") as f:
+                    f.seek(self._pack_end)
+                    f.truncate() # drop bytes of a session whose index was never saved
+                    f.write(data)
+            except OSError as e:
+                print(f"[WARN] Unable to write thumbnail cache: {e}")
+                return
+
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = [self._pack_end, len(data), signature[0], signature[1], int(time.time())]
+            self._pack_end += len(data)
+            self._live_bytes += len(data)
+            self._dirty = True
+            self._evict()
+
+    def save(self) -> Optional[str]:
+        """Writes the index, after compacting the pack if more than half of it is unused."""
+        with self._lock:
+            if not self._dirty:
+                return None
+            try:
+                if self._pack_end > 2 * self._live_bytes:
+                    self._compact()
+                payload = {
+                    "version": THUMBNAIL_CACHE_VERSION,
+                    "pack_size": self._pack_end,
+                    "entries": self._entries,
+                }
+                tmp_path = f"{self.index_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+                    json.dump(payload, f, separators=(",", ":"))
+                os.replace(tmp_path, self.index_path)
+                self._dirty = False
+            except Exception as e:
+                print(f"[WARN] Unable to save thumbnail cache: {e}")
+                return None
+
+        print(f"✔ Thumbnail cache saved: {self.index_path}")
+        return self.index_path
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            pack_size = os.path.getsize(self.pack_path)
+        except Exception as e:
+            print(f"[WARN] Ignoring unreadable thumbnail cache: {e}")
+            return
+
+        if (
+            not isinstance(payload, dict)
+            or payload.get("version") != THUMBNAIL_CACHE_VERSION
+            or not isinstance(payload.get("entries"), dict)
+            or not isinstance(payload.get("pack_size"), int)
+            or payload["pack_size"] > pack_size
+        ):
+            return
+
+        self._entries = payload["entries"]
+        self._pack_end = payload["pack_size"]
+        self._live_bytes = sum(entry[1] for entry in self._entries.values())
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._live_bytes -= entry[1]
+        self._dirty = True
+
+    def _evict(self) -> None:
+        if self._live_bytes <= self.max_bytes:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k][4]):
+            self._drop(key)
+            if self._live_bytes <= self.max_bytes * 0.9:
+                break
+
+    def _compact(self) -> None:
+        """Rewrites the pack with the live entries only. Called with the lock held."""
+        tmp_path = f"{self.pack_path}.tmp"
+        offset = 0
+        with open(self.pack_path, "rb") as src, open(tmp_path, "wb") as dst:
+            for entry in sorted(self._entries.values()):
+                src.seek(entry[0])
+                dst.write(src.read(entry[1]))
+                entry[0] = offset
+                offset += entry[1]
+        os.replace(tmp_path, self.pack_path)
+        self._pack_end = offset
+
+
+def _key(path: str, thumb_size: int) -> str:
+    return f"{thumb_size}|{os.path.normcase(os.path.abspath(path))}"
+
+
+def _signature(path: str) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
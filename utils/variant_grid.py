@@ -0,0 +1,146 @@
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Mapping, NamedTuple, Optional
+
+from PIL import Image
+
+from utils.conversion_queue import ConversionJob, render_job_crop, render_job_output, render_job_region, snapshot_mapping
+from utils.converter import quantize_to_device
+
+VARIANT_GRID_MAX = 9       # tiles in the comparison window (3 x 3)
+VARIANT_GRID_WORKERS = max(2, min(VARIANT_GRID_MAX, os.cpu_count() or 2))
+VARIANT_GRID_POLL_MS = 30
+
+
+class Variant(NamedTuple):
+    """One tile of the variant grid: a caption and the image preferences it changes."""
+    label: str
+    changes: Mapping[str, Any]
+
+
+def variant_job(job: ConversionJob, variant: Variant) -> ConversionJob:
+    """The job with the preference changes of the variant applied."""
+    return job._replace(preferences=snapshot_mapping({**job.preferences, **variant.changes}))
+
+
+class VariantGridRenderer:
+    """
+    Renders the device output of several variants of one ConversionJob concurrently.
+
+    A coordinator thread takes the newest request, resamples its crop region once
+    (variants only change preferences, never the source or crop) and spreads the rest
+    over a thread pool (Pillow releases the GIL in its resampling, filter and quantize
+    loops): the filled crop for every fill mode in use, sharing the region, then
+    enhancements, text and dithering per variant, sharing the crops. Like DevicePreviewRenderer, a newer request or
+    cancel() makes the running one stale; its queued renders are dropped and finished
+    tiles are never delivered. Tiles are passed to on_ready(index, image) on the Tk
+    thread as they finish, so the grid fills in progressively.
+    """
+
+    def __init__(
+        self,
+        widget,
+        on_ready: Callable[[int, Image.Image], None],
+        workers: int = VARIANT_GRID_WORKERS,
+    ):
+        self.widget = widget
+        self.on_ready = on_ready
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="variant-grid")
+        self._generation = 0
+        self._latest: Optional[tuple[int, ConversionJob, list[Variant]]] = None
+        self._wakeup = threading.Condition()
+        self._results: queue.Queue = queue.Queue()
+
+        threading.Thread(target=self._coordinator, daemon=True).start()
+        self.widget.after(VARIANT_GRID_POLL_MS, self._drain_results)
+
+    def request(self, job: ConversionJob, variants: list[Variant]) -> None:
+        with self._wakeup:
+            self._generation += 1
+            self._latest = (self._generation, job, list(variants))
+            self._wakeup.notify()
+
+    def cancel(self) -> None:
+        with self._wakeup:
+            self._generation += 1
+            self._latest = None
+
+    def _is_stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _coordinator(self) -> None:
+        while True:
+            with self._wakeup:
+                while self._latest is None:
+                    self._wakeup.wait()
+                generation, job, variants = self._latest
+                self._latest = None
+
+            try:
+                self._render(generation, job, variants)
+            except Exception as e:
+                print(f"[WARN] Variant grid of {job.source_path} failed: {e}")
+
+    def _render(self, generation: int, job: ConversionJob, variants: list[Variant]) -> None:
+        jobs = [variant_job(job, variant) for variant in variants]
+
+        # one region for all variants, one crop per fill mode shared by the variants using it
+        region = render_job_region(job)
+        if self._is_stale(generation):
+            return
+        crops: dict[str, Future] = {}
+        for vjob in jobs:
+            fill_mode = vjob.preferences["fill_mode"]
+            if fill_mode not in crops:
+                crops[fill_mode] = self._pool.submit(render_job_crop, vjob, region)
+
+        pending: dict[Future, int] = {}
+        for fill_mode, crop_future in crops.items():
+            filled_crop = crop_future.result()
+            if self._is_stale(generation):
+                for future in crops.values():
+                    future.cancel()
+                return
+            for index, vjob in enumerate(jobs):
+                if vjob.preferences["fill_mode"] == fill_mode:
+                    pending[self._pool.submit(self._render_variant, vjob, filled_crop, generation)] = index
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            if self._is_stale(generation):
+                for future in pending:
+                    future.cancel()
+                return
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    preview = future.result()
+                except Exception as e:
+                    print(f"[WARN] Variant '{variants[index].label}' failed: {e}")
+                    continue
+                if preview is not None:
+                    self._results.put((generation, index, preview))
+
+    def _render_variant(self, job: ConversionJob, filled_crop: Image.Image, generation: int) -> Optional[Image.Image]:
+        if self._is_stale(generation):
+            return None
+        out_img = render_job_output(job, filled_crop)
+        if self._is_stale(generation):
+            return None
+        return quantize_to_device(out_img, job.preferences["target_device"], job.dither_method)
+
+    def _drain_results(self) -> None:
+        while True:
+            try:
+                generation, index, preview = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if not self._is_stale(generation):
+                self.on_ready(index, preview)
+
+        if self.widget.winfo_exists():
+            self.widget.after(VARIANT_GRID_POLL_MS, self._drain_results)